@@ -0,0 +1,36 @@
+#!/bin/sh
+# Healthcare Data Processing Pipeline - local sharded cluster bootstrap
+# Initiates the config server and shard replica sets, then registers the
+# shards with the mongos router. Safe to re-run.
+# Author: hhdonglo - OpenClassrooms (DataSoluTech)
+
+set -e
+
+wait_for() {
+  until mongosh --host "$1" --quiet --eval 'db.runCommand({ping: 1}).ok' >/dev/null 2>&1; do
+    echo "Waiting for $1..."
+    sleep 2
+  done
+}
+
+initiate() {
+  host="$1"; set_name="$2"; extra="$3"
+  wait_for "$host"
+  mongosh --host "$host" --quiet --eval "
+    try { rs.status() } catch (e) {
+      rs.initiate({_id: '$set_name', $extra members: [{_id: 0, host: '$host'}]})
+    }"
+}
+
+initiate mongo_config:27019 cfg "configsvr: true,"
+initiate mongo_shard1:27018 shard1 ""
+initiate mongo_shard2:27018 shard2 ""
+
+wait_for mongo_router:27017
+mongosh --host mongo_router:27017 --quiet --eval "
+  const shards = db.adminCommand({listShards: 1}).shards.map(s => s._id);
+  if (!shards.includes('shard1')) sh.addShard('shard1/mongo_shard1:27018');
+  if (!shards.includes('shard2')) sh.addShard('shard2/mongo_shard2:27018');
+  printjson(db.adminCommand({listShards: 1}).shards);"
+
+echo "Sharded cluster ready"
@@ -10,11 +10,12 @@ Author: Hope Donglo - OpenClassrooms (DataSoluTech)
 from pathlib import Path
 import glob
 import pandas as pd
-from IPython.display import display
 from datetime import datetime
 import sys
 
 from csv_containerisation_mongodb.data.load_data import LOAD_DATA
+from csv_containerisation_mongodb.data.normalisation import StringNormaliser
+from csv_containerisation_mongodb.data.linkage import PatientLinker
 from csv_containerisation_mongodb.utils.file_manager import FILE_PATH_MANAGER, OUTPUT_MANAGER
 
 
@@ -49,59 +50,76 @@ class FILE_CLEANING:
         print(f"FILE_CLEANING initialized for: {file_name}")
         print(f"Initial shape: {self.df.shape}\n")
 
+    def _log(self, message=""):
+        """Print a message and buffer it for the cleaning report."""
+        self.output_manager.log(message)
+
     def preview(self):
         """Display first few rows of the dataframe."""
-        print("\n## Preview\n")
-        print("```")
-        print(self.df.head().to_string())
-        print("```\n")
+        self._log("\n## Preview\n")
+        self.output_manager.add_table(self.df.head(), fmt='text')
 
-    def standardising_names(self):
-        """Standardize name columns to title case and remove whitespace."""
-        print("\n## Name Standardization\n")
-        print("Starting name standardization...")
+    def standardising_names(self, compare=False):
+        """
+        Standardize names to title case and strip whitespace from text columns.
+        
+        Transforms run once per unique value (see StringNormaliser).
+        
+        Args:
+            compare: Also time the row-wise path and report the speedup
+        """
+        self._log("\n## Name Standardization\n")
+        self._log("Starting name standardization...")
         
         unique_before = self.df['Name'].nunique()
-        self.df['Name'] = self.df['Name'].str.title().str.strip()
+        normaliser = StringNormaliser()
+        self.df = normaliser.apply(self.df, compare=compare)
         unique_after = self.df['Name'].nunique()
         
-        print("\n### Results\n")
-        print(f"- **Unique names before:** {unique_before}")
-        print(f"- **Unique names after:** {unique_after}\n")
+        self._log("\n### Results\n")
+        self._log(f"- **Unique names before:** {unique_before}")
+        self._log(f"- **Unique names after:** {unique_after}\n")
         
-        print("### Sample of Standardized Names\n")
-        print("```")
-        print(self.df['Name'][:10].to_string())
-        print("```\n")
+        self._log("### Text Columns Normalised\n")
+        summary = normaliser.summary()
+        self.output_manager.add_table(summary)
+        if 'Row-wise (ms)' in summary and summary['Factorized (ms)'].sum() > 0:
+            speedup = summary['Row-wise (ms)'].sum() / summary['Factorized (ms)'].sum()
+            self._log(f"\n- **Speedup over row-wise transforms:** {speedup:.1f}x")
+            if not summary['Identical'].all():
+                self._log("- **WARNING:** factorized and row-wise results differ")
+        
+        self._log("\n### Sample of Standardized Names\n")
+        self.output_manager.add_table(self.df['Name'][:10], fmt='text')
 
     def drop_duplicates(self):
         """Remove duplicate rows, keeping first occurrence."""
-        print("\n## Duplicate Removal\n")
+        self._log("\n## Duplicate Removal\n")
         
         original_shape = self.df.shape
         duplicates_count = self.df.duplicated().sum()
         
-        print("Starting duplicate removal...")
-        print(f"- **Shape before:** {self.df.shape}")
-        print(f"- **Duplicate rows found:** {duplicates_count}")
+        self._log("Starting duplicate removal...")
+        self._log(f"- **Shape before:** {self.df.shape}")
+        self._log(f"- **Duplicate rows found:** {duplicates_count}")
         
         self.df = self.df.drop_duplicates(keep='first').reset_index(drop=True)
         
         rows_removed = original_shape[0] - self.df.shape[0]
         reduction_pct = (rows_removed / original_shape[0] * 100) if original_shape[0] > 0 else 0
         
-        print("\n### Results\n")
-        print(f"- **Shape after:** {self.df.shape}")
-        print(f"- **Rows removed:** {rows_removed}")
-        print(f"- **Reduction:** {reduction_pct:.2f}%\n")
+        self._log("\n### Results\n")
+        self._log(f"- **Shape after:** {self.df.shape}")
+        self._log(f"- **Rows removed:** {rows_removed}")
+        self._log(f"- **Reduction:** {reduction_pct:.2f}%\n")
 
     def data_type_optimisation(self):
         """Optimize dataframe data types for memory efficiency."""
-        print("\n## Data Type Optimization\n")
-        print("Starting data type optimization...")
+        self._log("\n## Data Type Optimization\n")
+        self._log("Starting data type optimization...")
         
         memory_before = self.df.memory_usage(deep=True).sum() / 1024**2
-        print(f"- **Memory before:** {memory_before:.2f} MB")
+        self._log(f"- **Memory before:** {memory_before:.2f} MB")
         
         self.df['Date of Admission'] = pd.to_datetime(self.df['Date of Admission'])
         self.df['Discharge Date'] = pd.to_datetime(self.df['Discharge Date'])
@@ -112,20 +130,50 @@ class FILE_CLEANING:
         memory_after = self.df.memory_usage(deep=True).sum() / 1024**2
         memory_reduction = ((memory_before - memory_after) / memory_before * 100) if memory_before > 0 else 0
         
-        print("\n### Results\n")
-        print(f"- **Memory after:** {memory_after:.2f} MB")
-        print(f"- **Memory reduction:** {memory_reduction:.2f}%\n")
+        self._log("\n### Results\n")
+        self._log(f"- **Memory after:** {memory_after:.2f} MB")
+        self._log(f"- **Memory reduction:** {memory_reduction:.2f}%\n")
         
-        print("### DataFrame Info\n")
-        print("```")
-        print(f"Optimizing column names:")
+        self._log("Optimizing column names:")
         self.df = self.df.rename(columns={'Date of Admission': 'Admission Date'})
 
         from io import StringIO
         buffer = StringIO()
         self.df.info(buf=buffer, memory_usage='deep')
-        print(buffer.getvalue())
-        print("```\n")
+        # The report always gets the info table; quiet mode only silences the console
+        for message in ("### DataFrame Info\n", "```", buffer.getvalue(), "```\n"):
+            self.output_manager.write_to_report(message)
+            if not self.output_manager.quiet:
+                print(message)
+
+    def link_patients(self, threshold=0.85):
+        """
+        Assign a patient cluster id linking admissions of the same patient.
+        
+        Unlike drop_duplicates, names differing in casing, whitespace or small
+        typos are linked when age, gender and blood type agree (see PatientLinker).
+        
+        Args:
+            threshold: Minimum name similarity of a match (0-1)
+        """
+        self._log("\n## Patient Record Linkage\n")
+        self._log("Linking admissions of the same patient...")
+        
+        linker = PatientLinker(threshold=threshold)
+        patient_ids = linker.link(self.df)
+        if 'Patient Id' in self.df:
+            self.df['Patient Id'] = patient_ids
+        else:
+            self.df.insert(self.df.columns.get_loc('Name') + 1, 'Patient Id', patient_ids)
+        
+        stats = linker.stats
+        self._log("\n### Results\n")
+        self._log(f"- **Rows:** {stats['rows']:,} ({stats['profiles']:,} distinct profiles)")
+        self._log(f"- **Candidate pairs compared:** {stats['candidate_pairs']:,} "
+                  f"of {stats['all_pairs']:,} possible, in {stats['blocks']:,} blocks")
+        self._log(f"- **Fuzzy matches:** {stats['matched_pairs']:,}")
+        self._log(f"- **Patients:** {stats['clusters']:,}")
+        self._log(f"- **Time:** {stats['seconds']:.2f}s\n")
 
     def quality_check(self, export_to_csv=True):
         """
@@ -140,8 +188,8 @@ class FILE_CLEANING:
         Returns:
             DataFrame: Quality assessment report
         """
-        print("\n## Quality Check\n")
-        print("Generating quality check report...")
+        self._log("\n## Quality Check\n")
+        self._log("Generating quality check report...")
         
         quality_check = pd.DataFrame({
             'Data Type': self.df.dtypes,
@@ -161,47 +209,44 @@ class FILE_CLEANING:
             'Most Common %': [round((self.df[col].value_counts().iloc[0] / len(self.df)) * 100, 2) if len(self.df[col]) > 0 else 0 for col in self.df.columns],
         })
         
-        print("\n### Summary\n")
-        print(f"- **Total columns:** {len(quality_check)}")
-        print(f"- **Columns with missing values:** {(quality_check['Missing Values'] > 0).sum()}")
-        print(f"- **Total missing values:** {quality_check['Missing Values'].sum()}")
-        print(f"- **High cardinality columns:** {(quality_check['Cardinality'] == 'High').sum()}\n")
+        self._log("\n### Summary\n")
+        self._log(f"- **Total columns:** {len(quality_check)}")
+        self._log(f"- **Columns with missing values:** {(quality_check['Missing Values'] > 0).sum()}")
+        self._log(f"- **Total missing values:** {quality_check['Missing Values'].sum()}")
+        self._log(f"- **High cardinality columns:** {(quality_check['Cardinality'] == 'High').sum()}\n")
         
         if export_to_csv:
             csv_path = self.output_manager.get_output_path('quality_csv')
             
             try:
                 quality_check.to_csv(csv_path)
-                print(f"Quality report CSV saved to: {csv_path.absolute()}")
+                self._log(f"Quality report CSV saved to: {csv_path.absolute()}")
             except Exception as e:
-                print(f"ERROR: Failed to save CSV - {e}")
+                self._log(f"ERROR: Failed to save CSV - {e}")
         
-        print("\n### Detailed Metrics\n")
-        print(quality_check.to_markdown())
-        print("\n```")
-        print(quality_check.to_string())
-        print("```\n")
+        self._log("\n### Detailed Metrics\n")
+        self.output_manager.add_table(quality_check)
         
         return quality_check
 
     def save_cleaned_csv(self):
         """Save the cleaned dataframe to CSV file."""
-        print("\n## Saving Cleaned Data\n")
+        self._log("\n## Saving Cleaned Data\n")
         
         csv_path = self.output_manager.get_output_path('cleaned_csv')
-        print(f"Saving cleaned data to: {csv_path.name}")
+        self._log(f"Saving cleaned data to: {csv_path.name}")
         
         try:
             self.df.to_csv(csv_path, index=False)
             file_size = csv_path.stat().st_size / 1024
-            print(f"[SUCCESS] Cleaned CSV saved successfully")
-            print(f"- **Path:** `{csv_path.absolute()}`")
-            print(f"- **Size:** {file_size:.2f} KB")
-            print(f"- **Rows:** {len(self.df)}")
-            print(f"- **Columns:** {len(self.df.columns)}\n")
+            self._log(f"[SUCCESS] Cleaned CSV saved successfully")
+            self._log(f"- **Path:** `{csv_path.absolute()}`")
+            self._log(f"- **Size:** {file_size:.2f} KB")
+            self._log(f"- **Rows:** {len(self.df)}")
+            self._log(f"- **Columns:** {len(self.df.columns)}\n")
             return True
         except Exception as e:
-            print(f"[ERROR] Failed to save CSV - {e}\n")
+            self._log(f"[ERROR] Failed to save CSV - {e}\n")
             return False
 
     def finalize_report(self):
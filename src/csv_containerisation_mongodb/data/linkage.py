@@ -0,0 +1,256 @@
+"""
+Patient Record Linkage Module
+
+Groups admissions that belong to the same patient even when the name
+differs in casing, whitespace or small typos, and assigns every row a
+patient cluster id.
+
+Comparing every pair of rows is O(n^2), so rows are first reduced to
+distinct patient profiles (normalised name, gender, blood type, birth
+year) and profiles are only compared within blocks sharing a blocking key:
+
+- a phonetic key: Soundex of the surname + first initial;
+- a prefix key:   first two letters of each name token, sorted.
+
+Within a block, names are compared with a vectorised cosine similarity of
+their character bigram vectors, and pairs whose birth years are more than
+a year apart are discarded. Matches are merged with union-find. Blocks
+larger than max_block_size are compared in overlapping windows sorted by
+birth year, so the run time stays near-linear.
+
+Usage:
+    linker = PatientLinker(threshold=0.85)
+    df['Patient Id'] = linker.link(df)
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from functools import lru_cache
+import hashlib
+import time
+
+import numpy as np
+import pandas as pd
+
+
+SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'), **dict.fromkeys('cgjkqsxz', '2'), **dict.fromkeys('dt', '3'),
+    'l': '4', **dict.fromkeys('mn', '5'), 'r': '6',
+}
+
+# Size of the hashed character bigram vectors
+BIGRAM_DIMS = 512
+
+
+@lru_cache(maxsize=None)
+def soundex(word):
+    """
+    Return the American Soundex code of a word ('' for an empty word).
+
+    Args:
+        word: Lowercase word
+    """
+    letters = [char for char in word if char.isalpha()]
+    if not letters:
+        return ''
+
+    code = letters[0].upper()
+    previous = SOUNDEX_CODES.get(letters[0], '')
+    for char in letters[1:]:
+        digit = SOUNDEX_CODES.get(char, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if char not in 'hw':
+            previous = digit
+    return code.ljust(4, '0')
+
+
+def normalise_name(names):
+    """Lowercase names and collapse whitespace (vectorised)."""
+    return names.fillna('').astype(str).str.lower().str.replace(r'[^a-z\s]', '', regex=True) \
+        .str.split().str.join(' ')
+
+
+def _blocking_keys(name):
+    """Return the phonetic and prefix blocking keys of a normalised name."""
+    tokens = name.split()
+    if not tokens:
+        return None, None
+    phonetic = f"{soundex(tokens[-1])}{tokens[0][0]}"
+    prefix = '|'.join(sorted(token[:2] for token in tokens))
+    return phonetic, prefix
+
+
+def _bigram_vectors(names):
+    """
+    Return L2-normalised hashed character bigram counts, one row per name.
+
+    Args:
+        names: Normalised names
+    """
+    rows, columns = [], []
+    for row, name in enumerate(names):
+        padded = f" {name} "
+        for first, second in zip(padded, padded[1:]):
+            rows.append(row)
+            columns.append((ord(first) * 31 + ord(second)) % BIGRAM_DIMS)
+
+    vectors = np.zeros((len(names), BIGRAM_DIMS), dtype=np.float32)
+    np.add.at(vectors, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)), 1.0)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class _UnionFind:
+    """Disjoint sets over profile positions."""
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, item):
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, first, second):
+        first, second = self.find(first), self.find(second)
+        if first != second:
+            self.parent[max(first, second)] = min(first, second)
+
+
+class PatientLinker:
+    """Blocking-indexed fuzzy linkage of patient admissions."""
+
+    def __init__(self, threshold=0.85, max_block_size=500, birth_year_tolerance=1, name_column='Name',
+                 age_column='Age', gender_column='Gender', blood_type_column='Blood Type',
+                 date_column='Admission Date'):
+        """
+        Initialize the linker.
+
+        Args:
+            threshold: Minimum name similarity (cosine of bigram vectors, 0-1)
+            max_block_size: Largest block compared all-pairs; larger blocks are
+                compared in overlapping windows of this size
+            birth_year_tolerance: Largest birth year difference of a match
+            name_column, age_column, gender_column, blood_type_column: Input columns
+            date_column: Admission date column used to derive the birth year
+                (Age alone is used when it is missing)
+        """
+        self.threshold = threshold
+        self.max_block_size = max(2, max_block_size)
+        self.birth_year_tolerance = birth_year_tolerance
+        self.name_column = name_column
+        self.age_column = age_column
+        self.gender_column = gender_column
+        self.blood_type_column = blood_type_column
+        self.date_column = date_column
+        self.stats = {}
+
+    def _profiles(self, df):
+        """
+        Reduce rows to distinct patient profiles.
+
+        Returns:
+            tuple: (profiles DataFrame, profile position of every row)
+        """
+        profiles = pd.DataFrame({
+            'name': normalise_name(df[self.name_column]),
+            'gender': df[self.gender_column].astype(str).str.strip().str.lower(),
+            'blood_type': df[self.blood_type_column].astype(str).str.strip().str.upper(),
+        }, index=df.index)
+
+        age = pd.to_numeric(df[self.age_column], errors='coerce')
+        if self.date_column in df:
+            profiles['birth_year'] = pd.to_datetime(df[self.date_column], errors='coerce').dt.year - age
+        else:
+            profiles['birth_year'] = -age
+
+        positions = profiles.groupby(list(profiles.columns), dropna=False, sort=True).ngroup().to_numpy()
+        unique = profiles.drop_duplicates().assign(position=positions[~profiles.duplicated().to_numpy()])
+        return unique.sort_values('position').reset_index(drop=True), positions
+
+    def _windows(self, members):
+        """Split a block into overlapping windows of at most max_block_size members."""
+        if len(members) <= self.max_block_size:
+            return [members]
+        step = self.max_block_size // 2
+        return [members[start:start + self.max_block_size] for start in range(0, len(members) - step, step)]
+
+    def link(self, df):
+        """
+        Assign a patient cluster id to every row.
+
+        Args:
+            df: DataFrame with the name, age, gender and blood type columns
+
+        Returns:
+            Series: Cluster id (16 hex characters) aligned with df
+        """
+        start = time.perf_counter()
+        profiles, positions = self._profiles(df)
+        names = profiles['name'].tolist()
+        # Profiles repeat names (different ages, genders...): vectorise each name once
+        name_codes, unique_names = pd.factorize(profiles['name'])
+        vectors = _bigram_vectors(unique_names)
+        birth_years = profiles['birth_year'].to_numpy(dtype=float)
+        sets = _UnionFind(len(profiles))
+
+        blocks = {}
+        bases = zip(profiles['gender'].tolist(), profiles['blood_type'].tolist())
+        for position, (name, base) in enumerate(zip(names, bases)):
+            phonetic, prefix = _blocking_keys(name)
+            if phonetic is None:
+                continue
+            blocks.setdefault(base + ('phonetic', phonetic), []).append(position)
+            blocks.setdefault(base + ('prefix', prefix), []).append(position)
+
+        candidates = 0
+        matches = 0
+        for members in blocks.values():
+            if len(members) < 2:
+                continue
+            # Windows of large blocks hold profiles with neighbouring birth years
+            members = sorted(members, key=lambda position: (birth_years[position], names[position]))
+            for window in self._windows(members):
+                window = np.array(window)
+                window_vectors = vectors[name_codes[window]]
+                similarity = window_vectors @ window_vectors.T
+                close = np.abs(birth_years[window][:, None] - birth_years[window][None, :]) \
+                    <= self.birth_year_tolerance
+                upper = np.triu(np.ones_like(close), k=1)
+                candidates += int(upper.sum())
+                first, second = np.nonzero(upper & close & (similarity >= self.threshold))
+                matches += len(first)
+                for left, right in zip(window[first], window[second]):
+                    sets.union(left, right)
+
+        # Ids derive from the smallest profile of each cluster, so they are stable
+        # across runs and files
+        roots = np.array([sets.find(position) for position in range(len(profiles))])
+        labels = pd.DataFrame({
+            'root': roots,
+            'label': profiles['name'] + '|' + profiles['gender'] + '|' + profiles['blood_type'] + '|'
+                     + profiles['birth_year'].astype(str)
+        }).sort_values(['root', 'label']).drop_duplicates('root')
+        cluster_ids = {
+            root: hashlib.blake2b(label.encode('utf-8'), digest_size=8).hexdigest()
+            for root, label in zip(labels['root'].tolist(), labels['label'].tolist())
+        }
+
+        row_roots = roots[positions]
+        self.stats = {
+            'rows': len(df),
+            'profiles': len(profiles),
+            'blocks': sum(1 for members in blocks.values() if len(members) > 1),
+            'candidate_pairs': candidates,
+            'all_pairs': len(profiles) * (len(profiles) - 1) // 2,
+            'matched_pairs': matches,
+            'clusters': len(cluster_ids),
+            'seconds': time.perf_counter() - start,
+        }
+        return pd.Series([cluster_ids[root] for root in row_roots], index=df.index, name='Patient Id')
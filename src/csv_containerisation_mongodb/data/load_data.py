@@ -3,14 +3,155 @@ CSV Data Loader Module
 
 Handles loading and selection of CSV files from specified directories.
 
+Plain CSV files are parsed through a memory map. Compressed extracts
+(.csv.gz, .csv.bz2, .csv.zst) are decompressed by a background thread
+into a pipe the parser reads from, so decompression overlaps parsing and
+nothing is written to disk.
+
 Author: Hope Donglo - OpenClassrooms (DataSoluTech)
 """
 
 from pathlib import Path
 import glob
+import os
+import threading
 import pandas as pd
 
 
+# File suffix -> compression of raw extracts
+COMPRESSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.zst': 'zstd'}
+
+CSV_PATTERNS = ('*.csv',) + tuple(f"*.csv{suffix}" for suffix in COMPRESSIONS)
+
+
+def csv_files(data_dir):
+    """
+    List the plain and compressed CSV files of a directory.
+    
+    Args:
+        data_dir: Directory to scan
+        
+    Returns:
+        list: Sorted file paths
+    """
+    return sorted({file for pattern in CSV_PATTERNS for file in Path(data_dir).glob(pattern)})
+
+
+def dataset_stem(file_path):
+    """
+    Return a CSV file name without its .csv and compression suffixes.
+    
+    Args:
+        file_path: Path or file name ('healthcare.csv.gz' -> 'healthcare')
+        
+    Returns:
+        str: File stem
+    """
+    name = Path(file_path).name
+    suffix = Path(name).suffix
+    if suffix in COMPRESSIONS:
+        name = name[:-len(suffix)]
+    return name[:-len('.csv')] if name.endswith('.csv') else Path(name).stem
+
+
+def decompressing_reader(raw, compression):
+    """
+    Wrap a binary file object in a stream of decompressed bytes.
+    
+    Args:
+        raw: Compressed binary file object
+        compression: 'gzip', 'bz2' or 'zstd'
+        
+    Returns:
+        Binary file-like object
+    """
+    if compression == 'gzip':
+        import gzip
+        return gzip.GzipFile(fileobj=raw, mode='rb')
+    if compression == 'bz2':
+        import bz2
+        return bz2.BZ2File(raw, mode='rb')
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(f"Reading .zst files requires the zstandard package - {e}") from e
+    return zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+
+
+class ThreadedDecompressor:
+    """Decompresses a file in a background thread into a pipe read by the CSV parser."""
+    
+    def __init__(self, file_path, compression, chunk_size=1024**2):
+        """
+        Initialize the decompressor.
+        
+        Args:
+            file_path: Compressed file
+            compression: 'gzip', 'bz2' or 'zstd'
+            chunk_size: Bytes decompressed per write into the pipe
+        """
+        self.file_path = Path(file_path)
+        self.compression = compression
+        self.chunk_size = chunk_size
+        self.error = None
+        self._reader = None
+        self._thread = None
+    
+    def _pump(self, write_fd):
+        try:
+            with os.fdopen(write_fd, 'wb') as pipe, open(self.file_path, 'rb') as raw, \
+                    decompressing_reader(raw, self.compression) as source:
+                while True:
+                    chunk = source.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    pipe.write(chunk)
+        except BrokenPipeError:
+            # The parser stopped reading (e.g. nrows reached or a parse error)
+            pass
+        except Exception as e:
+            self.error = e
+    
+    def __enter__(self):
+        read_fd, write_fd = os.pipe()
+        try:
+            # Larger pipe buffer (Linux): fewer wake-ups between the two threads
+            import fcntl
+            fcntl.fcntl(write_fd, fcntl.F_SETPIPE_SZ, self.chunk_size)
+        except (ImportError, AttributeError, OSError):
+            pass
+        self._reader = os.fdopen(read_fd, 'rb')
+        self._thread = threading.Thread(target=self._pump, args=(write_fd,), daemon=True)
+        self._thread.start()
+        return self._reader
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._reader.close()
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+        return False
+
+
+def read_csv_file(file_path, **kwargs):
+    """
+    Read a plain or compressed CSV file into a DataFrame.
+    
+    Args:
+        file_path: CSV file (.csv, .csv.gz, .csv.bz2 or .csv.zst)
+        **kwargs: Extra pandas.read_csv arguments
+        
+    Returns:
+        DataFrame: Parsed rows
+    """
+    compression = COMPRESSIONS.get(Path(file_path).suffix)
+    if compression is None:
+        return pd.read_csv(file_path, memory_map=True, **kwargs)
+    
+    with ThreadedDecompressor(file_path, compression) as stream:
+        return pd.read_csv(stream, **kwargs)
+
+
 class LOAD_DATA:
     """Loads CSV files into pandas DataFrames with interactive selection."""
     
@@ -34,7 +175,7 @@ class LOAD_DATA:
             return self
         
         try:
-            data_files = list(data_dir.glob('*.csv'))
+            data_files = csv_files(data_dir)
             if not data_files:
                 print("ERROR: No CSV files found in directory")
                 return self
@@ -44,7 +185,7 @@ class LOAD_DATA:
             raise
         
         self.data_dict = {
-            file.stem.split('_')[0]: pd.read_csv(file) for file in data_files
+            dataset_stem(file).split('_')[0]: read_csv_file(file) for file in data_files
         }
         
         if df_name is None:
@@ -53,7 +194,26 @@ class LOAD_DATA:
             self.df = self._select_dataframe(df_name)
         
         return self
-    
+
+    def file_loader(self, file_path):
+        """
+        Load a single CSV file without scanning its directory.
+
+        Args:
+            file_path: Path to the CSV file (optionally gzip, bz2 or zstd compressed)
+
+        Returns:
+            self: For method chaining
+        """
+        file_path = Path(file_path)
+        if not file_path.exists():
+            raise FileNotFoundError(f"{file_path} does not exist")
+
+        self.df = read_csv_file(file_path)
+        self.data_dict = {dataset_stem(file_path).split('_')[0]: self.df}
+        print(f"Loaded file: {file_path.name}")
+        return self
+
     def _select_dataframe(self, df_name):
         """
         Select DataFrame by name with validation.
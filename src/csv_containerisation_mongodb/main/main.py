@@ -5,27 +5,53 @@ Initializes and executes the complete ETL pipeline.
 
 Usage:
     python -m csv_containerisation_mongodb.main.main
+    python -m csv_containerisation_mongodb.main.main --watch
+    python -m csv_containerisation_mongodb.main.main --export data/processed/export.parquet
 
 Author: hhdonglo - OpenClassrooms (DataSoluTech)
 """
 
+import argparse
+import os
 import sys
 import traceback
 from csv_containerisation_mongodb.main.pipeline import HealthcarePipeline, PipelineConfig
 
 
-def main() -> int:
+def main(argv=None) -> int:
     """
     Execute the healthcare data processing pipeline.
     
+    Args:
+        argv: Command line arguments (defaults to sys.argv)
+    
     Returns:
         int: Exit code (0 for success, 1 for failure)
     """
+    parser = argparse.ArgumentParser(description="Healthcare data processing pipeline")
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        default=os.getenv('PIPELINE_MODE', 'batch') == 'watch',
+        help="Keep running and ingest files as they land in data/raw"
+    )
+    parser.add_argument(
+        '--export',
+        metavar='PATH',
+        help="Export the collection to a CSV or Parquet file instead of running the pipeline"
+    )
+    args = parser.parse_args(argv)
+    
     try:
         config = PipelineConfig()
         pipeline = HealthcarePipeline(config=config)
         
-        success = pipeline.run()
+        if args.export:
+            success = pipeline.export(args.export)
+        elif args.watch:
+            success = pipeline.watch()
+        else:
+            success = pipeline.run()
         
         if success:
             print("Pipeline execution completed successfully")
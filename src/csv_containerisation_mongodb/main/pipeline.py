@@ -8,20 +8,45 @@ Main pipeline class orchestrating the complete ETL process:
 4. MongoDB migration
 5. Data integrity verification
 
+Stage modules (cleaning, migration, integrity checks) are imported lazily
+by the stage that needs them so short runs don't pay for unused imports.
+
 Author: hhdonglo - OpenClassrooms (DataSoluTech)
 """
 
+from __future__ import annotations
+
 from pathlib import Path
 import logging
-from typing import Optional
-from dataclasses import dataclass
+from typing import Optional, TYPE_CHECKING
+from dataclasses import dataclass, asdict
 import os
+import time
+
+from csv_containerisation_mongodb.utils.file_manager import FILE_PATH_MANAGER, OUTPUT_MANAGER
+from csv_containerisation_mongodb.data.load_data import LOAD_DATA, CSV_PATTERNS, csv_files, dataset_stem
+from csv_containerisation_mongodb.utils.stage_cache import StageCache
+from csv_containerisation_mongodb.utils.metrics import METRICS, MetricsExporter
+
+if TYPE_CHECKING:
+    from csv_containerisation_mongodb.migration.migration import Connect
+
+
+# DataIntegrityChecker checks, run as separate stages
+INTEGRITY_CHECKS = ('document_count', 'field_structure', 'missing_values', 'data_types', 'duplicates',
+                    'checksums')
+
+# Config fields that tune how a run executes without changing its results;
+# they are left out of the stage cache key
+RUNTIME_CONFIG_PREFIXES = ('stage_cache', 'watch_', 'insert_batch', 'adaptive_batching', 'batch_memory',
+                           'load_profile', 'shard_chunks', 'change_manifest', 'parallel_stages',
+                           'stage_workers', 'profile_', 'metrics_', 'execution_strategy', 'memory_limit',
+                           'benchmark_normalisation')
 
-from csv_containerisation_mongodb.utils.file_manager import FILE_PATH_MANAGER
-from csv_containerisation_mongodb.data.load_data import LOAD_DATA
-from csv_containerisation_mongodb.data.cleaning import FILE_CLEANING
-from csv_containerisation_mongodb.migration.migration import Connect, LoadDb
-from csv_containerisation_mongodb.test.test import DataIntegrityChecker
+
+def _split_names(value: str) -> list:
+    """Split a comma-separated config value into names."""
+    return [name.strip() for name in value.split(',') if name.strip()]
 
 
 @dataclass
@@ -32,6 +57,33 @@ class PipelineConfig:
     db_name: str = os.getenv('MONGO_DATABASE', 'medical_records')
     collection_name: str = 'healthcare_data'
     mongodb_uri: str = os.getenv('MONGO_URI', 'mongodb://localhost:27017')
+    watch_interval: float = float(os.getenv('WATCH_INTERVAL', '2'))
+    partition_by: str = os.getenv('PARTITION_BY', 'none')
+    build_rollups: bool = os.getenv('BUILD_ROLLUPS', '0') == '1'
+    normalise_reference_data: bool = os.getenv('NORMALISE_REFERENCE_DATA', '0') == '1'
+    schema_validation: bool = os.getenv('SCHEMA_VALIDATION', '1') == '1'
+    dead_letter: str = os.getenv('DEAD_LETTER', 'file')
+    insert_batch_size: int = int(os.getenv('INSERT_BATCH_SIZE', '5000'))
+    adaptive_batching: bool = os.getenv('ADAPTIVE_BATCHING', '1') == '1'
+    batch_memory_mb: int = int(os.getenv('BATCH_MEMORY_MB', '64'))
+    load_profile: str = os.getenv('LOAD_PROFILE', 'safe')
+    shard_key: str = os.getenv('SHARD_KEY', '')
+    shard_chunks_per_shard: int = int(os.getenv('SHARD_CHUNKS_PER_SHARD', '4'))
+    change_manifest: bool = os.getenv('CHANGE_MANIFEST', '0') == '1'
+    stage_cache: bool = os.getenv('STAGE_CACHE', '1') == '1'
+    stage_cache_max_mb: int = int(os.getenv('STAGE_CACHE_MAX_MB', '512'))
+    parallel_stages: bool = os.getenv('PARALLEL_STAGES', '1') == '1'
+    stage_workers: int = int(os.getenv('STAGE_WORKERS', '4'))
+    profile_stages: str = os.getenv('PROFILE_STAGES', '')
+    profile_methods: str = os.getenv('PROFILE_METHODS', '')
+    metrics_port: int = int(os.getenv('METRICS_PORT', '0'))
+    metrics_file: str = os.getenv('METRICS_FILE', '')
+    metrics_interval: float = float(os.getenv('METRICS_INTERVAL', '5'))
+    execution_strategy: str = os.getenv('EXECUTION_STRATEGY', 'auto')
+    memory_limit_mb: int = int(os.getenv('MEMORY_LIMIT_MB', '0'))
+    benchmark_normalisation: bool = os.getenv('BENCHMARK_NORMALISATION', '0') == '1'
+    linkage_threshold: float = float(os.getenv('LINKAGE_THRESHOLD', '0.85'))
+    clustered_collection: bool = os.getenv('CLUSTERED_COLLECTION', '0') == '1'
 
 
 class HealthcarePipeline:
@@ -52,43 +104,461 @@ class HealthcarePipeline:
         self.config = config or PipelineConfig()
         self.data_path = FILE_PATH_MANAGER()
         self.loader = LOAD_DATA()
+        self.conn = None
+        self._indexes_ready = False
+        self._index_loader = None
+        self._migration_skipped = False
+        self._run_id = None
+        self.plan = None
+        self.stage_cache = None
+        if self.config.stage_cache:
+            self.stage_cache = StageCache(
+                self.data_path.output_dir / 'cache',
+                max_bytes=self.config.stage_cache_max_mb * 1024**2
+            )
 
     def run(self) -> bool:
         """
         Execute the complete pipeline.
         
+        Stages run as a dependency graph: connecting to MongoDB overlaps with
+        cleaning, and index builds, rollups and the integrity checks run
+        concurrently once the documents are loaded.
+        
         Returns:
             bool: True if pipeline completed successfully, False otherwise
         """
+        from csv_containerisation_mongodb.utils.scheduler import StageScheduler
+        
+        exporter = self._start_metrics()
         try:
             self._print_header()
             
-            if not self._load_raw_data():
-                return False
+            cache_key = self._stage_cache_key()
+            self._migration_skipped = False
+            self.plan = self._plan_execution(self._raw_file_path())
+            
+            stage_workers = self.plan.stage_workers if self.plan is not None else self.config.stage_workers
+            scheduler = StageScheduler(max_workers=stage_workers if self.config.parallel_stages else 1)
+            scheduler.add('clean', lambda: self._prepare_cleaned_data(cache_key))
+            scheduler.add('connect', lambda: self._connect_and_check_cache(cache_key))
+            scheduler.add('load_cleaned', self._unless_migration_cached(self._load_cleaned_data),
+                          after=('clean', 'connect'))
+            scheduler.add('migrate', self._unless_migration_cached(
+                lambda: self._migrate_to_mongodb(self.conn, defer_indexes=True)
+            ), after=('load_cleaned',))
+            scheduler.add('indexes', self._unless_migration_cached(self._build_deferred_indexes), after=('migrate',))
+            scheduler.add('rollups', self._unless_migration_cached(
+                lambda: self._build_rollups(self.conn)
+            ), after=('migrate',))
+            for check in INTEGRITY_CHECKS:
+                scheduler.add(f"verify_{check}", self._unless_migration_cached(
+                    lambda check=check: self._verify_integrity(self.conn, checks=(check,))
+                ), after=('migrate',))
+            scheduler.add('store_cache', self._unless_migration_cached(
+                lambda: self._store_migration(cache_key)
+            ), after=tuple(name for name in scheduler.stages if name != 'store_cache'))
             
-            if not self._clean_data():
+            for stage in scheduler.stages.values():
+                stage.func = self._tracked(stage.name, stage.func)
+            
+            profiler = self._create_profiler()
+            if profiler is None:
+                success = scheduler.run()
+            else:
+                stages = _split_names(self.config.profile_stages)
+                for stage in scheduler.stages.values():
+                    if 'all' in stages or stage.name in stages:
+                        stage.func = profiler.wrap(f"stage.{stage.name}", stage.func)
+                with profiler.instrument(_split_names(self.config.profile_methods)):
+                    success = scheduler.run()
+            
+            scheduler.report()
+            if profiler is not None:
+                profiler.report()
+            
+            if success:
+                self._print_footer()
+            return success
+            
+        except Exception as e:
+            print(f"Pipeline failed: {e}")
+            return False
+        finally:
+            if exporter is not None:
+                exporter.stop()
+
+    def _raw_file_path(self) -> Optional[Path]:
+        """Return the raw CSV file LOAD_DATA selects for the configured name."""
+        for file in csv_files(self.data_path.raw_data_dir):
+            if dataset_stem(file).split('_')[0] == self.config.raw_file_name:
+                return file
+        return None
+
+    def _raw_file_name(self) -> Optional[str]:
+        """
+        Return the raw file name a full run tags its documents and rollups with.
+        
+        It matches the source_file process_file() uses, so a watcher started
+        after a batch run replaces the batch documents of that file.
+        """
+        raw_file = self._raw_file_path()
+        return raw_file.name if raw_file is not None else None
+
+    def _plan_execution(self, input_path: Optional[Path]):
+        """
+        Plan the execution strategy and sizes for an input file.
+        
+        Args:
+            input_path: Raw CSV file about to be processed
+        
+        Returns:
+            ExecutionPlan, or None to run with the configured sizes
+        """
+        if input_path is None or not input_path.exists():
+            return None
+        
+        try:
+            from csv_containerisation_mongodb.utils.planner import ResourcePlanner
+            
+            planner = ResourcePlanner(
+                memory_limit=self.config.memory_limit_mb * 1024**2 or None,
+                insert_batch_size=self.config.insert_batch_size,
+                batch_memory_mb=self.config.batch_memory_mb,
+                stage_workers=self.config.stage_workers
+            )
+            plan = planner.plan(input_path, strategy=self.config.execution_strategy)
+            plan.report()
+            return plan
+            
+        except Exception as e:
+            print(f"WARNING: Execution planning failed, using the configured sizes - {e}")
+            return None
+
+    def _start_metrics(self) -> Optional[MetricsExporter]:
+        """Start publishing live metrics when a port or file is configured."""
+        if not self.config.metrics_port and not self.config.metrics_file:
+            return None
+        
+        return MetricsExporter(
+            port=self.config.metrics_port,
+            path=self.config.metrics_file or None,
+            interval=self.config.metrics_interval,
+            host=os.getenv('METRICS_HOST', '127.0.0.1')
+        ).start()
+
+    def _tracked(self, name: str, stage):
+        """Wrap a stage so its running state and duration are exported as metrics."""
+        def run_stage():
+            METRICS.set('stage_running', 1, stage=name)
+            start = time.perf_counter()
+            try:
+                return stage()
+            finally:
+                METRICS.set('stage_running', 0, stage=name)
+                METRICS.set('stage_duration_seconds', round(time.perf_counter() - start, 3), stage=name)
+        return run_stage
+
+    def _create_profiler(self):
+        """Return a Profiler when stages or methods are selected for profiling."""
+        if not self.config.profile_stages and not self.config.profile_methods:
+            return None
+        
+        from csv_containerisation_mongodb.utils.profiling import Profiler
+        
+        profiler = Profiler(self.data_path.output_dir / 'profiles')
+        print(f"Profiling enabled - run id {profiler.run_id}")
+        return profiler
+
+    def _unless_migration_cached(self, stage):
+        """Wrap a post-connect stage so it is skipped when the migration is cached."""
+        def run_stage():
+            if self._migration_skipped:
+                return True
+            return stage()
+        return run_stage
+
+    def _prepare_cleaned_data(self, cache_key: Optional[str]) -> bool:
+        """
+        Restore the cleaning outputs from the cache, or load and clean the raw data.
+        
+        Returns:
+            bool: True if cleaned data is available, False otherwise
+        """
+        if self._restore_cleaning(cache_key):
+            return True
+        
+        if not self._load_raw_data():
+            return False
+        
+        if not self._clean_data():
+            return False
+        
+        self._store_cleaning(cache_key)
+        return True
+
+    def _connect_and_check_cache(self, cache_key: Optional[str]) -> bool:
+        """
+        Connect to MongoDB and check whether the migration can be skipped.
+        
+        Returns:
+            bool: True if connected, False otherwise
+        """
+        conn = self._connect_mongodb()
+        if not conn:
+            return False
+        
+        self._migration_skipped = self._migration_cached(cache_key, conn)
+        return True
+
+    def process_file(self, file_path: Path) -> bool:
+        """
+        Incrementally ingest a single raw file.
+        
+        Cleans the file and replaces only the documents previously migrated
+        from it, reusing the open MongoDB connection between calls.
+        
+        Args:
+            file_path: Raw CSV file to ingest
+        
+        Returns:
+            bool: True if the file was ingested successfully, False otherwise
+        """
+        file_name = dataset_stem(file_path)
+        try:
+            print("\n" + "=" * 80)
+            print(f"[WATCH] Processing {file_path.name}")
+            print("=" * 80)
+            
+            self.plan = self._plan_execution(file_path)
+            self.loader.file_loader(file_path)
+            METRICS.inc('rows_read_total', len(self.loader.df))
+            
+            if not self._clean_data(file_name=file_name):
                 return False
             
             conn = self._connect_mongodb()
             if not conn:
                 return False
             
-            if not self._load_cleaned_data():
-                return False
+            self.loader.file_loader(self.data_path.processed_data_dir / f"cleaned_{file_name}.csv")
             
-            if not self._migrate_to_mongodb(conn):
+            if not self._migrate_to_mongodb(conn, source_file=file_path.name):
                 return False
             
-            if not self._verify_integrity(conn):
+            if not self._build_rollups(conn, source_file=file_path.name):
                 return False
             
-            self._print_footer()
+            print(f"[WATCH] {file_path.name} ingested: {len(self.loader.df):,} documents")
             return True
             
         except Exception as e:
-            print(f"Pipeline failed: {e}")
+            print(f"ERROR: Processing {file_path.name} failed - {e}")
             return False
 
+    def watch(self, max_cycles: Optional[int] = None) -> bool:
+        """
+        Run as a long-lived service ingesting files dropped in the raw directory.
+        
+        Args:
+            max_cycles: Stop after this many polls (None runs until interrupted)
+        
+        Returns:
+            bool: True when the watcher stops cleanly
+        """
+        from csv_containerisation_mongodb.utils.watcher import FolderWatcher
+        
+        self._print_header()
+        if not self._connect_mongodb():
+            return False
+        
+        exporter = self._start_metrics()
+        watcher = FolderWatcher(
+            watch_dir=self.data_path.raw_data_dir,
+            callback=self.process_file,
+            interval=self.config.watch_interval,
+            patterns=CSV_PATTERNS
+        )
+        try:
+            watcher.run(max_cycles=max_cycles)
+        finally:
+            if exporter is not None:
+                exporter.stop()
+        return True
+
+    def export(self, output_path: Optional[Path] = None, fmt: Optional[str] = None) -> bool:
+        """
+        Export the collection back to the cleaned CSV layout.
+        
+        Args:
+            output_path: Output file (defaults to data/processed/export_<collection>.csv)
+            fmt: 'csv' or 'parquet' (inferred from the file suffix when omitted)
+        
+        Returns:
+            bool: True if the export succeeded, False otherwise
+        """
+        import pandas as pd
+        from csv_containerisation_mongodb.migration.export import HealthcareExporter
+        from csv_containerisation_mongodb.migration.reference_data import ReferenceResolver
+        
+        conn = self._connect_mongodb()
+        if not conn:
+            return False
+        
+        try:
+            print("\n[EXPORT] Exporting MongoDB collection...")
+            output_path = Path(output_path) if output_path else \
+                self.data_path.processed_data_dir / f"export_{self.config.collection_name}.csv"
+            
+            # Keep the column order of the cleaned CSV when it is available
+            cleaned_csv = self.data_path.processed_data_dir / f"{self.config.cleaned_file_name}.csv"
+            columns = pd.read_csv(cleaned_csv, nrows=0).columns if cleaned_csv.exists() else None
+            
+            resolver = None
+            if self.config.normalise_reference_data:
+                resolver = ReferenceResolver(conn.db, self.config.collection_name)
+            
+            HealthcareExporter(conn, resolver=resolver, columns=columns).export(output_path, fmt=fmt)
+            return True
+            
+        except Exception as e:
+            print(f"ERROR: Export failed - {e}")
+            return False
+
+    def _stage_cache_key(self) -> Optional[str]:
+        """
+        Compute the stage cache key for the configured raw file.
+        
+        Returns:
+            Cache key, or None if caching is disabled or the raw file is missing
+        """
+        if self.stage_cache is None:
+            return None
+        
+        raw_file = self._raw_file_path()
+        if raw_file is None:
+            return None
+        
+        config = {
+            key: value for key, value in asdict(self.config).items()
+            if not key.startswith(RUNTIME_CONFIG_PREFIXES)
+        }
+        return self.stage_cache.key(raw_file, config)
+
+    def _cleaning_outputs(self) -> dict:
+        """Return the files produced by the cleaning stage."""
+        output_manager = OUTPUT_MANAGER(
+            output_dir=self.data_path.processed_data_dir,
+            file_name=self.config.raw_file_name
+        )
+        return {
+            'cleaned_csv': output_manager.get_output_path('cleaned_csv'),
+            'quality_csv': output_manager.get_output_path('quality_csv'),
+            'report': output_manager.report_file,
+            'report_json': output_manager.report_json_file
+        }
+
+    def _restore_cleaning(self, cache_key: Optional[str]) -> bool:
+        """
+        Restore cleaning outputs from the stage cache.
+        
+        Returns:
+            bool: True if loading and cleaning can be skipped
+        """
+        if cache_key is None:
+            return False
+        
+        meta = self.stage_cache.get(cache_key, 'cleaning')
+        if meta is None:
+            return False
+        
+        outputs = self._cleaning_outputs()
+        if not self.stage_cache.restore(meta, 'cleaned_csv', outputs['cleaned_csv']):
+            return False
+        for name in ('quality_csv', 'report', 'report_json'):
+            self.stage_cache.restore(meta, name, outputs[name])
+        
+        print("\n[STEP 1-3] Raw data unchanged - cleaning outputs restored from cache")
+        print(f"Cache key: {cache_key}")
+        return True
+
+    def _store_cleaning(self, cache_key: Optional[str]) -> None:
+        """Store cleaning outputs in the stage cache."""
+        if cache_key is None:
+            return
+        self.stage_cache.put(cache_key, 'cleaning', files=self._cleaning_outputs())
+
+    def _collection_checksum(self, conn: Connect) -> Optional[str]:
+        """
+        Hash the content digests of the collection (see migration.checksums).
+        
+        Returns:
+            Hex digest, or None if the digests could not be computed
+        """
+        try:
+            import hashlib
+            import json
+            from csv_containerisation_mongodb.migration.checksums import collection_digests
+            from csv_containerisation_mongodb.migration.schema import HEALTHCARE_SCHEMA
+            
+            digests, _ = collection_digests(conn.collection, HEALTHCARE_SCHEMA, skip_paths=self._encoded_paths())
+            payload = json.dumps(digests, sort_keys=True, default=str)
+            return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        except Exception as e:
+            print(f"[CACHE] Content checksum unavailable - {e}")
+            return None
+
+    def _migration_cached(self, cache_key: Optional[str], conn: Connect) -> bool:
+        """
+        Check whether the collection still holds the verified load of this input.
+        
+        The last recorded migration run must be the cached one and the content
+        checksum of the collection must match the one taken after verification,
+        so later loads, edits and partial replacements are all detected.
+        
+        Returns:
+            bool: True if migration and verification can be skipped
+        """
+        if cache_key is None:
+            return False
+        
+        meta = self.stage_cache.get(cache_key, 'migration')
+        if meta is None:
+            return False
+        
+        from csv_containerisation_mongodb.migration.migration import RUNS_COLLECTION
+        
+        data = meta['data']
+        run = conn.db[RUNS_COLLECTION].find_one({"_id": self.config.collection_name}, {"run_id": 1})
+        if not data.get('run_id') or (run or {}).get('run_id') != data['run_id']:
+            print("[CACHE] Collection loaded by another run since - migration will be repeated")
+            return False
+        
+        if not data.get('checksum') or self._collection_checksum(conn) != data['checksum']:
+            print("[CACHE] Collection content changed since last run - migration will be repeated")
+            return False
+        
+        print(f"\n[STEP 5-7] Input unchanged and {data['documents']:,} verified documents present "
+              f"(run {data['run_id']}, checksum match) - migration skipped")
+        return True
+
+    def _store_migration(self, cache_key: Optional[str]) -> None:
+        """Record the migration manifest (run id and content checksum) in the stage cache."""
+        if cache_key is None or self._run_id is None:
+            return
+        checksum = self._collection_checksum(self.conn)
+        if checksum is None:
+            print("[CACHE] Migration not cached - it will be repeated next run")
+            return
+        self.stage_cache.put(cache_key, 'migration', data={
+            'db_name': self.config.db_name,
+            'collection_name': self.config.collection_name,
+            'documents': len(self.loader.df),
+            'run_id': self._run_id,
+            'checksum': checksum,
+            'verified': True
+        })
+
     def _print_header(self) -> None:
         """Print pipeline header."""
         print("=" * 80)
@@ -118,6 +588,7 @@ class HealthcarePipeline:
             )
             
             rows, cols = self.loader.df.shape
+            METRICS.inc('rows_read_total', rows)
             print(f"Loaded: {rows:,} rows, {cols} columns")
             return True
             
@@ -128,14 +599,19 @@ class HealthcarePipeline:
             print(f"ERROR: Failed to load raw data - {e}")
             return False
 
-    def _clean_data(self) -> bool:
+    def _clean_data(self, file_name: Optional[str] = None) -> bool:
         """
         Clean and standardize the data.
         
+        Args:
+            file_name: Base name for output files (defaults to the configured raw file name)
+        
         Returns:
             bool: True if successful, False otherwise
         """
         try:
+            from csv_containerisation_mongodb.data.cleaning import FILE_CLEANING
+            
             print("\n[STEP 2] Starting data cleaning pipeline...")
             print(f"Output directory: {self.data_path.processed_data_dir}")
             print("-" * 80)
@@ -143,14 +619,18 @@ class HealthcarePipeline:
             with FILE_CLEANING(
                 self.loader,
                 file_path=self.data_path,
-                file_name=self.config.raw_file_name
+                file_name=file_name or self.config.raw_file_name
             ) as cleaner:
                 cleaner.preview()
-                cleaner.standardising_names()
+                cleaner.standardising_names(compare=self.config.benchmark_normalisation)
                 cleaner.drop_duplicates()
                 cleaner.data_type_optimisation()
+                cleaner.link_patients(threshold=self.config.linkage_threshold)
                 cleaner.quality_check(export_to_csv=True)
                 cleaner.finalize_report()
+                cleaned_rows = len(cleaner.df)
+            
+            METRICS.inc('rows_cleaned_total', cleaned_rows)
             
             print("-" * 80)
             print("\n[STEP 3] Data cleaning completed")
@@ -169,10 +649,17 @@ class HealthcarePipeline:
         """
         Establish MongoDB connection.
         
+        The connection is kept on the pipeline and reused by later calls.
+        
         Returns:
             Connect object if successful, None otherwise
         """
+        if self.conn is not None:
+            return self.conn
+        
         try:
+            from csv_containerisation_mongodb.migration.migration import Connect
+            
             print("\n[STEP 4] Connecting to MongoDB...")
             print(f"URI: {self.config.mongodb_uri}")
             
@@ -185,6 +672,7 @@ class HealthcarePipeline:
             
             print(f"Database: {self.config.db_name}")
             print(f"Collection: {self.config.collection_name}")
+            self.conn = conn
             return conn
             
         except Exception as e:
@@ -200,13 +688,12 @@ class HealthcarePipeline:
             bool: True if successful, False otherwise
         """
         try:
+            # Watch mode leaves a cleaned_<stem>.csv per file here: load this run's file only
+            cleaned_file = self.data_path.processed_data_dir / f"{self.config.cleaned_file_name}.csv"
             print("\n[STEP 5] Loading cleaned data...")
-            print(f"Source: {self.data_path.processed_data_dir}")
+            print(f"Source: {cleaned_file}")
             
-            self.loader.csv_loader(
-                data_dir=self.data_path.processed_data_dir,
-                df_name='cleaned'
-            )
+            self.loader.file_loader(cleaned_file)
             
             rows, cols = self.loader.df.shape
             print(f"Loaded: {rows:,} rows, {cols} columns")
@@ -219,23 +706,112 @@ class HealthcarePipeline:
             print(f"ERROR: Failed to load cleaned data - {e}")
             return False
 
-    def _migrate_to_mongodb(self, conn: Connect) -> bool:
+    def _migrate_to_mongodb(self, conn: Connect, source_file: Optional[str] = None,
+                            defer_indexes: bool = False) -> bool:
         """
         Migrate data to MongoDB.
         
         Args:
             conn: MongoDB connection object
+            source_file: Raw file name to scope the reload to (None replaces the collection)
+            defer_indexes: Leave index builds to _build_deferred_indexes so they can
+                run alongside the integrity checks
         
         Returns:
             bool: True if successful, False otherwise
         """
         try:
+            from csv_containerisation_mongodb.migration.migration import LoadDb
+            from csv_containerisation_mongodb.migration.partitioning import AdmissionPartitioner
+            from csv_containerisation_mongodb.migration.reference_data import ReferenceEncoder
+            from csv_containerisation_mongodb.migration.schema import HEALTHCARE_SCHEMA
+            from csv_containerisation_mongodb.migration.dead_letter import DeadLetterQueue
+            from csv_containerisation_mongodb.migration.batching import AdaptiveBatchSizer
+            from csv_containerisation_mongodb.migration.sharding import ShardingPlanner
+            from csv_containerisation_mongodb.migration.clustering import ClusteredLayout
+            
             print("\n[STEP 6] Migrating data to MongoDB...")
             print("-" * 80)
             
-            with LoadDb(conn, df=self.loader.df) as db_loader:
+            partitioner = None
+            if self.config.partition_by != 'none':
+                partitioner = AdmissionPartitioner(self.config.collection_name, self.config.partition_by)
+                print(f"Partition layout: {self.config.partition_by}")
+            
+            encoder = None
+            if self.config.normalise_reference_data:
+                encoder = ReferenceEncoder(conn.db, self.config.collection_name)
+                print("Reference data: normalised layout")
+            
+            clustering = None
+            if self.config.clustered_collection:
+                clustering = ClusteredLayout()
+                print("Collection layout: clustered on admission date")
+            
+            dead_letter = None
+            if self.config.dead_letter != 'none':
+                name = dataset_stem(source_file) if source_file else self.config.raw_file_name
+                dead_letter = DeadLetterQueue(
+                    target=self.config.dead_letter,
+                    path=self.data_path.processed_data_dir / f"dead_letter_{name}.jsonl",
+                    collection=conn.db[f"{self.config.collection_name}_dead_letter"],
+                    source_file=source_file
+                )
+            
+            plan = self.plan
+            batch_size = plan.insert_batch_size if plan is not None else self.config.insert_batch_size
+            batch_memory_mb = plan.batch_memory_mb if plan is not None else self.config.batch_memory_mb
+            chunk_rows = plan.chunk_rows if plan is not None else None
+            insert_workers = plan.insert_workers if plan is not None else 0
+            
+            sharding = None
+            if self.config.shard_key:
+                sharding = ShardingPlanner(
+                    conn.db, self.config.collection_name, self.config.shard_key,
+                    chunks_per_shard=self.config.shard_chunks_per_shard
+                )
+                print(f"Sharded deployment: shard key {sharding.key}")
+                # Pre-splitting needs every document, so sharded loads are never chunked
+                chunk_rows, insert_workers = None, 0
+            
+            batch_sizer = None
+            if self.config.adaptive_batching:
+                # Shared by every writer; the writer count stays as planned
+                batch_sizer = AdaptiveBatchSizer(
+                    initial=batch_size,
+                    max_batch_bytes=batch_memory_mb * 1024**2
+                )
+            else:
+                print(f"Adaptive batching off: {batch_size:,} documents/batch")
+            
+            build_indexes = source_file is None or not self._indexes_ready
+            with LoadDb(
+                conn,
+                df=self.loader.df,
+                source_file=source_file,
+                build_indexes=build_indexes and not defer_indexes,
+                partitioner=partitioner,
+                encoder=encoder,
+                schema=HEALTHCARE_SCHEMA if self.config.schema_validation else None,
+                dead_letter=dead_letter,
+                batch_size=batch_size,
+                batch_sizer=batch_sizer,
+                load_profile=self.config.load_profile,
+                sharding=sharding,
+                change_manifest=self.config.change_manifest,
+                chunk_rows=chunk_rows,
+                insert_workers=insert_workers,
+                clustering=clustering,
+                source_label=None if source_file else self._raw_file_name()
+            ) as db_loader:
                 db_loader.dbloader()
             
+            # Verification compares against the rows that passed validation
+            self.loader.df = db_loader.df
+            self._run_id = db_loader.run_id
+            self._index_loader = db_loader if build_indexes and defer_indexes else None
+            self._indexes_ready = True
+            
             print("-" * 80)
             print("Migration completed")
             return True
@@ -244,33 +820,90 @@ class HealthcarePipeline:
             print(f"ERROR: Data migration failed - {e}")
             return False
 
-    def _verify_integrity(self, conn: Connect) -> bool:
+    def _build_deferred_indexes(self) -> bool:
+        """
+        Build the indexes skipped by a migration run with defer_indexes.
+        
+        Returns:
+            bool: Always True; index failures are reported as warnings
+        """
+        if self._index_loader is None:
+            return True
+        
+        try:
+            self._index_loader.create_indexes()
+            print("Indexes created successfully")
+        except Exception as e:
+            print(f"WARNING: Index creation failed - {e}")
+        finally:
+            self._index_loader = None
+        return True
+
+    def _encoded_paths(self) -> set:
+        """Return the document paths stored as reference ids, if any."""
+        if not self.config.normalise_reference_data:
+            return set()
+        from csv_containerisation_mongodb.migration.reference_data import REFERENCE_FIELDS
+        return {f"{section}.{key}" for section, key, _ in REFERENCE_FIELDS.values()}
+
+    def _build_rollups(self, conn: Connect, source_file: Optional[str] = None) -> bool:
+        """
+        Refresh the dashboard summary collections (when enabled).
+        
+        Args:
+            conn: MongoDB connection object
+            source_file: Raw file name to scope the refresh to (None refreshes everything)
+        
+        Returns:
+            bool: True if successful or disabled, False otherwise
+        """
+        if not self.config.build_rollups:
+            return True
+        
+        try:
+            from csv_containerisation_mongodb.migration.rollups import RollupBuilder
+            
+            print("\n[STEP 6b] Building summary rollups...")
+            RollupBuilder(
+                conn, df=self.loader.df, source_file=source_file,
+                source_label=None if source_file else self._raw_file_name()
+            ).build()
+            return True
+            
+        except Exception as e:
+            print(f"ERROR: Rollup build failed - {e}")
+            return False
+
+    def _verify_integrity(self, conn: Connect, checks: tuple = INTEGRITY_CHECKS) -> bool:
         """
         Verify data integrity after migration.
         
         Args:
             conn: MongoDB connection object
+            checks: INTEGRITY_CHECKS to run
         
         Returns:
             bool: True if verification passed, False otherwise
         """
         try:
-            print("\n[STEP 7] Verifying data integrity...")
+            from csv_containerisation_mongodb.test.integrity import DataIntegrityChecker
+            
+            scope = "" if checks == INTEGRITY_CHECKS else f" ({', '.join(checks)})"
+            print(f"\n[STEP 7] Verifying data integrity{scope}...")
             print("-" * 80)
             
             with DataIntegrityChecker(
                 db_name=self.config.db_name,
                 collection_name=self.config.collection_name,
-                df=self.loader.df
+                df=self.loader.df,
+                uri=self.config.mongodb_uri,
+                encoded_paths=self._encoded_paths()
             ) as checker:
-                checker.test_document_count()
-                checker.test_field_structure()
-                checker.test_missing_values()
-                checker.test_data_types()
-                checker.test_duplicates()
+                for check in checks:
+                    getattr(checker, f"test_{check}")()
             
             print("-" * 80)
-            print("Data integrity verification PASSED")
+            print(f"Data integrity verification{scope} PASSED")
             return True
         
         except AssertionError as e:
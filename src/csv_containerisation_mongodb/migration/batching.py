@@ -0,0 +1,159 @@
+"""
+Adaptive Batching Module
+
+Chooses the insert_many batch size at run time. Each batch is timed and the
+size is moved by hill climbing on documents per second: it keeps growing
+while throughput improves, backs off with a smaller step when it drops, and
+settles once the step becomes negligible. The size is always capped by a
+per-batch memory ceiling estimated from the encoded BSON size of documents.
+
+One controller is shared by every insert writer (chunked background writers,
+one writer per shard): batches are recorded under a lock, and a batch taken
+before the size last moved is kept in the history but does not steer it.
+The number of writers itself is not adapted; it comes from the execution plan.
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+import threading
+import time
+
+import bson
+
+
+# MongoDB maxWriteBatchSize: larger insert_many calls are split by the driver anyway
+MAX_WRITE_BATCH = 100_000
+
+
+class AdaptiveBatchSizer:
+    """Hill-climbing controller for the insert batch size."""
+
+    def __init__(self, initial=5000, min_size=500, max_size=MAX_WRITE_BATCH, max_batch_bytes=64 * 1024**2,
+                 step=2.0, min_step=1.15, tolerance=0.05):
+        """
+        Initialize the controller.
+
+        Args:
+            initial: First batch size
+            min_size: Smallest batch size tried
+            max_size: Largest batch size tried
+            max_batch_bytes: Memory ceiling for one batch of encoded documents
+            step: Initial multiplicative step between sizes
+            min_step: Step below which the size is considered settled
+            tolerance: Relative throughput gain required to keep moving
+        """
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_batch_bytes = max_batch_bytes
+        self.step = step
+        self.min_step = min_step
+        self.tolerance = tolerance
+
+        self.direction = 1
+        self.settled = False
+        self.best = None
+        self.avg_document_bytes = None
+        self.history = []
+        self.size = self._clamp(initial)
+        self._lock = threading.Lock()
+
+    def _clamp(self, size):
+        """Keep a size within bounds and under the memory ceiling."""
+        upper = self.max_size
+        if self.avg_document_bytes:
+            upper = min(upper, int(self.max_batch_bytes // self.avg_document_bytes))
+        return max(self.min_size, min(int(size), max(upper, self.min_size)))
+
+    def next_size(self):
+        """Return the size to use for the next batch."""
+        with self._lock:
+            return self.size
+
+    def measure(self, batch):
+        """
+        Sample the encoded size and encode time of a batch from its first document.
+
+        Args:
+            batch: Documents about to be inserted
+
+        Returns:
+            tuple: (estimated batch encode seconds, encoded bytes per document)
+        """
+        start = time.perf_counter()
+        document_bytes = len(bson.encode(batch[0]))
+        return (time.perf_counter() - start) * len(batch), document_bytes
+
+    def record(self, documents, seconds, encode_seconds=0.0, document_bytes=None, size=None):
+        """
+        Record a completed batch and pick the next size.
+
+        Args:
+            documents: Number of documents in the batch
+            seconds: Wall time of the insert round trip
+            encode_seconds: Estimated BSON encode time of the batch
+            document_bytes: Encoded bytes per document
+            size: Size returned by next_size() for the batch (defaults to the current size)
+        """
+        with self._lock:
+            self._record(documents, seconds, encode_seconds, document_bytes,
+                         self.size if size is None else size)
+
+    def _record(self, documents, seconds, encode_seconds, document_bytes, size):
+        """Record a batch and move the size; called with the lock held."""
+        if document_bytes:
+            self.avg_document_bytes = document_bytes if self.avg_document_bytes is None else \
+                0.8 * self.avg_document_bytes + 0.2 * document_bytes
+
+        throughput = documents / seconds if seconds > 0 else float('inf')
+        self.history.append({
+            'size': size,
+            'documents': documents,
+            'seconds': seconds,
+            'encode_seconds': encode_seconds,
+            'docs_per_s': throughput
+        })
+
+        # A short tail batch, or one taken before another writer's batch moved
+        # the size, is not comparable with the current size
+        if self.settled or size != self.size or documents < size:
+            return
+
+        if self.best is None or throughput > self.best[1] * (1 + self.tolerance):
+            self.best = (self.size, throughput)
+            candidate = self._clamp(self.size * self.step ** self.direction)
+            if candidate != self.size:
+                self.size = candidate
+                return
+
+        # No gain (or at a bound): turn around with a smaller step
+        self.direction = -self.direction
+        self.step = self.step ** 0.5
+        if self.step < self.min_step:
+            self.settled = True
+            self.size = self._clamp(self.best[0])
+            print(f"Adaptive batching settled on {self.size:,} documents/batch "
+                  f"(~{self.best[1]:,.0f} docs/s) - pin with INSERT_BATCH_SIZE={self.size} ADAPTIVE_BATCHING=0")
+            return
+        self.size = self._clamp(self.best[0] * self.step ** self.direction)
+
+    def report(self):
+        """Print the batch sizes tried and their throughput."""
+        if not self.history:
+            return
+
+        sizes = {}
+        for batch in self.history:
+            entry = sizes.setdefault(batch['size'], {'batches': 0, 'documents': 0, 'seconds': 0.0, 'encode': 0.0})
+            entry['batches'] += 1
+            entry['documents'] += batch['documents']
+            entry['seconds'] += batch['seconds']
+            entry['encode'] += batch['encode_seconds']
+
+        print("\n[ADAPTIVE BATCHING]")
+        for size, entry in sizes.items():
+            rate = entry['documents'] / entry['seconds'] if entry['seconds'] else 0.0
+            encode_share = entry['encode'] / entry['seconds'] * 100 if entry['seconds'] else 0.0
+            print(f"- {size:>7,} docs/batch: {entry['batches']} batches, {rate:,.0f} docs/s, "
+                  f"~{encode_share:.0f}% encoding")
+        state = "settled" if self.settled else "still adapting"
+        print(f"- Final size: {self.size:,} ({state})")
@@ -0,0 +1,235 @@
+"""
+Change Feed Module
+
+Publishes what each migration run changed in healthcare_data so downstream
+consumers (caches, rollups, exports) can update incrementally instead of
+rescanning the collection.
+
+Two sources are supported:
+- MongoDB change streams (replica sets and sharded clusters), grouped into
+  one change set per completed run using the migration_runs marker;
+- a per-run change manifest written by LoadDb into migration_changes, for
+  standalone servers without change streams.
+
+Usage:
+    feed = ChangeFeed(conn)
+    feed.follow(lambda changes: print(changes.summary()))
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import time
+
+from csv_containerisation_mongodb.migration.migration import RUNS_COLLECTION
+from csv_containerisation_mongodb.migration.partitioning import partition_pattern
+
+
+MANIFEST_COLLECTION = 'migration_changes'
+
+# Ids stored per manifest document, keeping each well under the 16MB limit
+MANIFEST_CHUNK = 50_000
+
+
+@dataclass
+class ChangeSet:
+    """Document ids changed by one migration run."""
+    run_id: str
+    collection: str
+    source_file: str = None
+    inserted: list = field(default_factory=list)
+    updated: list = field(default_factory=list)
+    deleted: list = field(default_factory=list)
+    # True when whole collections were dropped and consumers should rescan
+    dropped: bool = False
+
+    def summary(self):
+        """Return a one-line description of the change set."""
+        scope = f" ({self.source_file})" if self.source_file else ""
+        text = (f"run {self.run_id}{scope}: {len(self.inserted):,} inserted, "
+                f"{len(self.updated):,} updated, {len(self.deleted):,} deleted")
+        return text + " - collection dropped" if self.dropped else text
+
+
+def write_manifest(db, collection_name, run_id, source_file, inserted, deleted, retention=20):
+    """
+    Record the ids changed by a run in the change manifest.
+
+    Ids both deleted and re-inserted by the run are reported as updated.
+
+    Args:
+        db: pymongo Database
+        collection_name: Migrated collection
+        run_id: Run id stored in migration_runs
+        source_file: Raw file of a scoped load (None for a full reload)
+        inserted: Ids inserted by the run
+        deleted: Ids removed by the run
+        retention: Number of runs kept per collection
+
+    Returns:
+        ChangeSet: The recorded changes
+    """
+    inserted_ids = set(inserted)
+    updated = [_id for _id in deleted if _id in inserted_ids]
+    updated_ids = set(updated)
+    changes = ChangeSet(
+        run_id=run_id,
+        collection=collection_name,
+        source_file=source_file,
+        inserted=[_id for _id in inserted if _id not in updated_ids],
+        updated=updated,
+        deleted=[_id for _id in deleted if _id not in updated_ids]
+    )
+
+    finished_at = datetime.now(timezone.utc)
+    manifest = db[MANIFEST_COLLECTION]
+    documents = []
+    for operation in ('inserted', 'updated', 'deleted'):
+        ids = getattr(changes, operation)
+        for start in range(0, len(ids), MANIFEST_CHUNK):
+            documents.append({
+                'run_id': run_id,
+                'collection': collection_name,
+                'source_file': source_file,
+                'finished_at': finished_at,
+                'operation': operation,
+                'ids': ids[start:start + MANIFEST_CHUNK]
+            })
+    if not documents:
+        documents.append({
+            'run_id': run_id,
+            'collection': collection_name,
+            'source_file': source_file,
+            'finished_at': finished_at,
+            'operation': None,
+            'ids': []
+        })
+    manifest.insert_many(documents, ordered=False)
+    manifest.create_index([('collection', 1), ('finished_at', 1)])
+
+    kept = manifest.distinct('finished_at', {'collection': collection_name})
+    if len(kept) > retention:
+        cutoff = sorted(kept)[-retention]
+        manifest.delete_many({'collection': collection_name, 'finished_at': {'$lt': cutoff}})
+
+    return changes
+
+
+class ChangeFeed:
+    """Yields one ChangeSet per completed migration run."""
+
+    def __init__(self, conn, source='auto'):
+        """
+        Initialize the feed.
+
+        Args:
+            conn: Connected MongoDB connection object
+            source: 'change_stream', 'manifest' or 'auto' (change streams when available)
+        """
+        if source not in ('auto', 'change_stream', 'manifest'):
+            raise ValueError(f"Unknown change feed source: {source}")
+
+        self.db = conn.db
+        self.collection_name = conn.collection_name
+        self.source = source
+        if source == 'auto':
+            self.source = 'change_stream' if self.supports_change_streams() else 'manifest'
+        self.last_finished_at = None
+
+    def supports_change_streams(self):
+        """Change streams need a replica set or a sharded cluster."""
+        hello = self.db.client.admin.command('hello')
+        return 'setName' in hello or hello.get('msg') == 'isdbgrid'
+
+    def poll(self):
+        """
+        Return the change sets recorded in the manifest since the last poll.
+
+        Returns:
+            list: ChangeSet objects, oldest run first
+        """
+        query = {'collection': self.collection_name}
+        if self.last_finished_at is not None:
+            query['finished_at'] = {'$gt': self.last_finished_at}
+
+        runs = {}
+        for document in self.db[MANIFEST_COLLECTION].find(query).sort('finished_at', 1):
+            changes = runs.setdefault(document['run_id'], ChangeSet(
+                run_id=document['run_id'],
+                collection=document['collection'],
+                source_file=document.get('source_file')
+            ))
+            if document['operation'] is not None:
+                getattr(changes, document['operation']).extend(document['ids'])
+            self.last_finished_at = document['finished_at']
+
+        return list(runs.values())
+
+    def stream(self, resume_after=None):
+        """
+        Yield change sets from change streams as migration runs complete.
+
+        Events on the collection (and its time partitions) are accumulated
+        until the run marker for the collection is written.
+
+        Args:
+            resume_after: Resume token of a previous stream
+        """
+        pipeline = [
+            {'$match': {'$or': [
+                {'ns.coll': self.collection_name},
+                {'ns.coll': {'$regex': partition_pattern(self.collection_name)}},
+                {'ns.coll': RUNS_COLLECTION, 'documentKey._id': self.collection_name}
+            ]}},
+            # Only the run marker's full document is needed
+            {'$set': {'fullDocument': {'$cond': [
+                {'$eq': ['$ns.coll', RUNS_COLLECTION]}, '$fullDocument', '$$REMOVE'
+            ]}}}
+        ]
+
+        pending = ChangeSet(run_id=None, collection=self.collection_name)
+        operations = {'insert': 'inserted', 'update': 'updated', 'replace': 'updated', 'delete': 'deleted'}
+        with self.db.watch(pipeline, full_document='updateLookup', resume_after=resume_after) as events:
+            for event in events:
+                if event['ns'].get('coll') == RUNS_COLLECTION:
+                    run = event.get('fullDocument') or {}
+                    pending.run_id = run.get('run_id')
+                    pending.source_file = run.get('source_file')
+                    yield pending
+                    pending = ChangeSet(run_id=None, collection=self.collection_name)
+                elif event['operationType'] in operations:
+                    getattr(pending, operations[event['operationType']]).append(event['documentKey']['_id'])
+                elif event['operationType'] in ('drop', 'rename', 'invalidate'):
+                    pending.dropped = True
+
+    def follow(self, callback, interval=2.0, max_runs=None):
+        """
+        Call back with every new change set until interrupted.
+
+        Args:
+            callback: Called with each ChangeSet
+            interval: Seconds between manifest polls
+            max_runs: Stop after this many change sets (None runs forever)
+        """
+        print(f"Following changes on '{self.collection_name}' via {self.source.replace('_', ' ')}")
+        delivered = 0
+        try:
+            if self.source == 'change_stream':
+                for changes in self.stream():
+                    callback(changes)
+                    delivered += 1
+                    if max_runs is not None and delivered >= max_runs:
+                        return
+            else:
+                # Only runs finishing after start-up are delivered
+                self.poll()
+                while True:
+                    for changes in self.poll():
+                        callback(changes)
+                        delivered += 1
+                        if max_runs is not None and delivered >= max_runs:
+                            return
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            print("\nChange feed stopped")
@@ -0,0 +1,222 @@
+"""
+Content Checksum Module
+
+Order-independent digests of every schema field, computed once on the
+cleaned DataFrame (vectorised pandas) and once on the collection (a single
+$group aggregation). Comparing the two digests verifies the migrated values
+in one collection scan while only a few kilobytes leave the server.
+
+Per field, whatever the row or document order:
+
+- every kind: non-null count, min and max;
+- string:     total length in code points and the sum of a polynomial
+              hash of each value;
+- int:        sum;
+- double:     sum, as integers scaled to the field's digits when set;
+- date:       sum of epoch seconds.
+
+The string hash only uses operators available in any aggregation pipeline
+($reduce over the code points, $indexOfCP into a fixed alphabet), so the
+server computes exactly what string_hash computes locally.
+
+Usage:
+    expected = frame_digests(df, HEALTHCARE_SCHEMA)
+    found = collection_digests(collection, HEALTHCARE_SCHEMA)
+    comparison = compare_digests(expected, found)
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+import math
+
+import pandas as pd
+
+
+# Characters hashed by position; any other character hashes as 0
+HASH_ALPHABET = ''.join(chr(code) for code in range(32, 127))
+HASH_BASE = 31
+HASH_MODULUS = 2**31 - 1
+
+
+def string_hash(value):
+    """
+    Polynomial hash of a string, as computed by the aggregation pipeline.
+
+    Args:
+        value: String to hash
+
+    Returns:
+        int: Hash in [0, HASH_MODULUS)
+    """
+    digest = 0
+    for char in value:
+        digest = (digest * HASH_BASE + HASH_ALPHABET.find(char) + 1) % HASH_MODULUS
+    return digest
+
+
+def _digest_key(path, statistic):
+    """Aggregation output name of one statistic (dots are not allowed)."""
+    return f"{path.replace('.', '__')}__{statistic}"
+
+
+def _python_value(value):
+    """Convert a pandas/numpy scalar to the type pymongo returns."""
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value.item() if hasattr(value, 'item') else value
+
+
+def frame_digests(df, schema, skip_paths=()):
+    """
+    Compute the digests of the values the migration stores.
+
+    Args:
+        df: Cleaned DataFrame
+        schema: DocumentSchema mapping columns to document paths
+        skip_paths: Dotted paths not to digest (e.g. reference-encoded fields)
+
+    Returns:
+        dict: Dotted path -> {statistic: value}
+    """
+    df = schema.conform(df)
+    digests = {}
+    for field in schema.fields:
+        if field.path in skip_paths:
+            continue
+
+        values = df[field.column].dropna()
+        digest = {'count': len(values)}
+
+        if field.kind == 'string':
+            # Hash each distinct value once and weight it by its frequency
+            counts = values.astype(str).value_counts()
+            uniques = counts.index.to_series()
+            digest['length'] = int((uniques.str.len() * counts).sum())
+            digest['hash'] = sum(string_hash(value) * int(count) for value, count in counts.items())
+            digest['min'], digest['max'] = (uniques.min(), uniques.max()) if len(uniques) else (None, None)
+        elif field.kind == 'int':
+            values = values.astype('int64')
+            digest['sum'] = int(values.sum())
+            digest['min'], digest['max'] = _python_value(values.min()), _python_value(values.max())
+        elif field.kind == 'double':
+            values = values.astype(float)
+            if field.digits is not None:
+                values = values.round(field.digits)
+                digest['sum'] = int((values * 10**field.digits).round().astype('int64').sum())
+            else:
+                digest['sum'] = float(values.sum())
+            digest['min'], digest['max'] = _python_value(values.min()), _python_value(values.max())
+        elif field.kind == 'date':
+            # BSON dates keep milliseconds
+            values = pd.to_datetime(values).dt.floor('ms')
+            digest['sum'] = int(((values - pd.Timestamp(0)) // pd.Timedelta(seconds=1)).sum())
+            digest['min'], digest['max'] = _python_value(values.min()), _python_value(values.max())
+
+        digests[field.path] = digest
+
+    return digests
+
+
+def _hash_expression(path):
+    """Aggregation expression computing string_hash of a field (0 when null)."""
+    char_code = {'$indexOfCP': [{'$literal': HASH_ALPHABET}, {'$substrCP': ['$$text', '$$this', 1]}]}
+    return {'$let': {
+        'vars': {'text': {'$ifNull': [f"${path}", '']}},
+        'in': {'$reduce': {
+            'input': {'$range': [0, {'$strLenCP': '$$text'}]},
+            'initialValue': 0,
+            'in': {'$mod': [{'$add': [{'$multiply': ['$$value', HASH_BASE]}, char_code, 1]}, HASH_MODULUS]},
+        }},
+    }}
+
+
+def digest_pipeline(schema, skip_paths=()):
+    """
+    Build the aggregation computing frame_digests() server-side.
+
+    Args:
+        schema: DocumentSchema of the collection
+        skip_paths: Dotted paths not to digest
+
+    Returns:
+        list: Aggregation pipeline returning a single document
+    """
+    group = {'_id': None}
+    for field in schema.fields:
+        if field.path in skip_paths:
+            continue
+
+        value = f"${field.path}"
+        group[_digest_key(field.path, 'count')] = {
+            '$sum': {'$cond': [{'$eq': [{'$ifNull': [value, None]}, None]}, 0, 1]}
+        }
+        group[_digest_key(field.path, 'min')] = {'$min': value}
+        group[_digest_key(field.path, 'max')] = {'$max': value}
+
+        if field.kind == 'string':
+            group[_digest_key(field.path, 'length')] = {'$sum': {'$strLenCP': {'$ifNull': [value, '']}}}
+            group[_digest_key(field.path, 'hash')] = {'$sum': _hash_expression(field.path)}
+        elif field.kind == 'int':
+            group[_digest_key(field.path, 'sum')] = {'$sum': value}
+        elif field.kind == 'double':
+            if field.digits is not None:
+                value = {'$toLong': {'$round': [{'$multiply': [value, 10**field.digits]}, 0]}}
+            group[_digest_key(field.path, 'sum')] = {'$sum': value}
+        elif field.kind == 'date':
+            seconds = {'$toLong': {'$floor': {'$divide': [{'$toLong': value}, 1000]}}}
+            group[_digest_key(field.path, 'sum')] = {'$sum': seconds}
+
+    return [{'$group': group}]
+
+
+def collection_digests(collection, schema, skip_paths=()):
+    """
+    Compute the digests of a collection in one aggregation.
+
+    Args:
+        collection: pymongo Collection
+        schema: DocumentSchema of the collection
+        skip_paths: Dotted paths not to digest
+
+    Returns:
+        tuple: (dotted path -> {statistic: value}, raw aggregation result)
+    """
+    result = next(collection.aggregate(digest_pipeline(schema, skip_paths)), None) or {}
+
+    digests = {}
+    for field in schema.fields:
+        if field.path in skip_paths:
+            continue
+        prefix = _digest_key(field.path, '')
+        digests[field.path] = {
+            key[len(prefix):]: value for key, value in result.items() if key.startswith(prefix)
+        }
+        digests[field.path].setdefault('count', 0)
+
+    return digests, result
+
+
+def compare_digests(expected, found):
+    """
+    Compare source and collection digests statistic by statistic.
+
+    Args:
+        expected: frame_digests() result
+        found: collection_digests() digests
+
+    Returns:
+        DataFrame: One row per (field, statistic) with a 'Match' column
+    """
+    rows = []
+    for path, statistics in expected.items():
+        for statistic, value in statistics.items():
+            actual = found.get(path, {}).get(statistic)
+            if isinstance(value, float) and isinstance(actual, (int, float)):
+                match = math.isclose(value, actual, rel_tol=1e-9, abs_tol=1e-6)
+            else:
+                match = value == actual
+            rows.append({'Field': path, 'Statistic': statistic, 'Expected': value, 'Found': actual, 'Match': match})
+
+    return pd.DataFrame(rows, columns=['Field', 'Statistic', 'Expected', 'Found', 'Match'])
@@ -0,0 +1,131 @@
+"""
+Clustered Collection Layout Module
+
+Stores healthcare_data as a clustered collection, whose documents are kept
+in _id order, with a deterministic, sortable _id:
+
+    ObjectId(admission date as 4 bytes of epoch seconds | 8 bytes of record hash)
+
+Admissions from the same period are therefore neighbours on disk: admission
+date range reads and _id-range exports scan a contiguous slice of the
+clustered index instead of following a secondary index to scattered
+records, and the admission_date index is no longer built.
+
+The record hash covers the source file and the stored values (plus an
+occurrence number for identical rows), so reloading a file reproduces the
+same ids.
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from collections import Counter
+import calendar
+import hashlib
+import math
+
+from bson import ObjectId, encode
+
+
+# ObjectId timestamps are unsigned 32-bit seconds
+MAX_SECONDS = 2**32 - 1
+
+
+class ClusteredLayout:
+    """Assigns date-ordered _ids and creates the clustered collection."""
+
+    def __init__(self, date_path='admission_details.admission_date'):
+        """
+        Initialize the layout.
+
+        Args:
+            date_path: Dotted path of the date leading the _id
+        """
+        self.date_path = date_path
+        self._section, self._key = date_path.split('.', 1)
+        self._occurrences = Counter()
+
+    @staticmethod
+    def _seconds(date, rounding=math.floor):
+        """Return the epoch seconds of a date, clamped to the ObjectId range (0 when missing)."""
+        if date is None:
+            return 0
+        seconds = calendar.timegm(date.utctimetuple()) + date.microsecond / 1e6
+        return min(max(int(rounding(seconds)), 0), MAX_SECONDS)
+
+    def create_collection(self, db, collection_name):
+        """
+        Create the collection clustered on _id, unless it already exists.
+
+        Args:
+            db: pymongo Database
+            collection_name: Collection to create
+
+        Returns:
+            bool: True if the collection is clustered
+        """
+        self._occurrences.clear()
+        if collection_name in db.list_collection_names():
+            clustered = 'clusteredIndex' in db[collection_name].options()
+            if not clustered:
+                print(f"WARNING: '{collection_name}' exists and is not clustered; "
+                      f"reload the whole collection to convert it")
+            return clustered
+
+        db.create_collection(collection_name, clusteredIndex={'key': {'_id': 1}, 'unique': True})
+        return True
+
+    def assign_id(self, document, source_file=None):
+        """
+        Set the deterministic _id of a built document.
+
+        Args:
+            document: Document holding the schema fields only (before metadata,
+                partition fields and reference ids are added)
+            source_file: Raw file the document comes from
+        """
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update((source_file or '').encode('utf-8'))
+        digest.update(encode(document))
+        record = digest.digest()
+
+        # Identical rows of one load get distinct, still reproducible ids
+        occurrence = self._occurrences[record]
+        self._occurrences[record] += 1
+        if occurrence:
+            digest.update(occurrence.to_bytes(8, 'big'))
+            record = digest.digest()
+
+        date = document.get(self._section, {}).get(self._key)
+        document['_id'] = ObjectId(self._seconds(date).to_bytes(4, 'big') + record)
+        return document
+
+    @staticmethod
+    def sort(documents, labels):
+        """
+        Order documents (and their DataFrame labels) by _id.
+
+        Returns:
+            tuple: (documents, labels) in clustered-index order
+        """
+        order = sorted(range(len(documents)), key=lambda position: documents[position]['_id'])
+        return [documents[position] for position in order], [labels[position] for position in order]
+
+    def id_range(self, start, end):
+        """
+        Return the _id filter covering admission dates in [start, end).
+
+        The bounds are whole seconds, so the date condition must still be
+        applied alongside; the filter only restricts the clustered scan.
+
+        Args:
+            start: Range start (inclusive)
+            end: Range end (exclusive)
+
+        Returns:
+            dict: Filter on _id
+        """
+        lower = ObjectId(self._seconds(start).to_bytes(4, 'big') + bytes(8))
+        upper = self._seconds(end, rounding=math.ceil)
+        if upper == MAX_SECONDS:
+            return {'_id': {'$gte': lower, '$lte': ObjectId(b'\xff' * 12)}}
+        return {'_id': {'$gte': lower, '$lt': ObjectId(max(upper, 1).to_bytes(4, 'big') + bytes(8))}}
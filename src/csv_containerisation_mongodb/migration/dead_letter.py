@@ -0,0 +1,122 @@
+"""
+Dead-Letter Module
+
+Collects rows that could not be migrated (schema validation, document
+transformation or insertion failures) together with the reason, so a run
+can finish with the valid rows instead of aborting on the first bad one.
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+
+from csv_containerisation_mongodb.utils.metrics import METRICS
+
+
+DEAD_LETTER_TARGETS = ('file', 'collection', 'memory')
+
+
+class DeadLetterQueue:
+    """Buffers rejected rows and writes them once at the end of a run."""
+
+    def __init__(self, target='file', path=None, collection=None, source_file=None):
+        """
+        Initialize the queue.
+
+        Args:
+            target: 'file' (JSON lines), 'collection' (MongoDB) or 'memory'
+            path: Output file for the 'file' target
+            collection: pymongo Collection for the 'collection' target
+            source_file: Raw file the rows came from
+        """
+        if target not in DEAD_LETTER_TARGETS:
+            raise ValueError(f"Unknown dead-letter target: {target} (expected one of {DEAD_LETTER_TARGETS})")
+        if target == 'file' and path is None:
+            raise ValueError("A path is required for the 'file' dead-letter target")
+        if target == 'collection' and collection is None:
+            raise ValueError("A collection is required for the 'collection' dead-letter target")
+
+        self.target = target
+        self.path = Path(path) if path is not None else None
+        self.collection = collection
+        self.source_file = source_file
+        self.entries = []
+
+    def add(self, row, stage, reason):
+        """
+        Record one rejected row.
+
+        Args:
+            row: Row values (dict or Series)
+            stage: 'validation', 'transform' or 'insert'
+            reason: Why the row was rejected
+        """
+        if hasattr(row, 'to_dict'):
+            row = row.to_dict()
+        self.entries.append({
+            'stage': stage,
+            'reason': str(reason),
+            'source_file': self.source_file,
+            'rejected_at': datetime.now(timezone.utc),
+            'row': row
+        })
+        METRICS.inc('documents_rejected_total')
+
+    def add_frame(self, df, stage, reason_column='rejection_reason'):
+        """
+        Record every row of a rejected DataFrame.
+
+        Args:
+            df: Rejected rows
+            stage: Stage that rejected them
+            reason_column: Column holding the rejection reason
+        """
+        for row in df.to_dict('records'):
+            reason = row.pop(reason_column, 'rejected')
+            self.add(row, stage, reason)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def summary(self):
+        """Return rejected row counts per (stage, reason)."""
+        return Counter((entry['stage'], entry['reason']) for entry in self.entries)
+
+    def flush(self):
+        """
+        Write the buffered entries to the configured target.
+
+        The file target is rewritten on every run so it only holds the
+        rows rejected by the latest load.
+
+        Returns:
+            int: Number of entries written
+        """
+        if self.target == 'file':
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(entry, default=str) + "\n" for entry in self.entries)
+        elif self.target == 'collection':
+            scope = {} if self.source_file is None else {'source_file': self.source_file}
+            self.collection.delete_many(scope)
+            if self.entries:
+                documents = [
+                    {**entry, 'row': json.loads(json.dumps(entry['row'], default=str))}
+                    for entry in self.entries
+                ]
+                self.collection.insert_many(documents, ordered=False)
+        return len(self.entries)
+
+    def report(self):
+        """Print a summary of rejected rows."""
+        if not self.entries:
+            print("Dead-letter: no rejected rows")
+            return
+
+        location = self.path if self.target == 'file' else \
+            self.collection.name if self.target == 'collection' else 'memory'
+        print(f"Dead-letter: {len(self.entries):,} rejected rows -> {location}")
+        for (stage, reason), count in self.summary().most_common(5):
+            print(f"  - [{stage}] {reason[:100]}: {count:,} rows")
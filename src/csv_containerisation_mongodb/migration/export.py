@@ -0,0 +1,161 @@
+"""
+Export Module
+
+Reverse of LoadDb.transform_row_to_mongodb: reads healthcare documents back
+into the flat layout of the cleaned CSV and writes CSV or Parquet.
+
+The collection is split into _id ranges ($bucketAuto) read in parallel with
+large cursor batches and a projection limited to the schema fields. Each
+range is flattened straight into per-column buffers. On a clustered
+collection (see clustering) each range is a contiguous slice on disk.
+
+Usage:
+    exporter = HealthcareExporter(conn)
+    exporter.export('data/processed/export_healthcare_data.parquet')
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import time
+
+import pandas as pd
+
+from csv_containerisation_mongodb.migration.schema import HEALTHCARE_SCHEMA
+from csv_containerisation_mongodb.migration.reference_data import REFERENCE_FIELDS
+
+
+EXPORT_FORMATS = ('csv', 'parquet')
+
+
+class HealthcareExporter:
+    """Parallel, columnar export of the healthcare collection."""
+
+    def __init__(self, conn, schema=HEALTHCARE_SCHEMA, resolver=None, columns=None, workers=4, batch_size=10_000):
+        """
+        Initialize the exporter.
+
+        Args:
+            conn: Connected MongoDB connection object
+            schema: DocumentSchema mapping columns to document paths
+            resolver: ReferenceResolver when reference data is normalised
+            columns: Output column order (defaults to the schema order)
+            workers: Number of _id ranges read in parallel
+            batch_size: Cursor batch size
+        """
+        self.collection = conn.collection
+        self.schema = schema
+        self.resolver = resolver
+        self.columns = list(columns) if columns is not None else schema.columns
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+
+    def _ranges(self):
+        """
+        Split the collection into contiguous _id ranges.
+
+        Returns:
+            list: Range filters covering the whole collection
+        """
+        try:
+            buckets = list(self.collection.aggregate([
+                {'$project': {'_id': 1}},
+                {'$bucketAuto': {'groupBy': '$_id', 'buckets': self.workers}}
+            ], allowDiskUse=True))
+        except Exception:
+            return [{}]
+
+        if not buckets:
+            return [{}]
+
+        # $bucketAuto upper bounds are exclusive, except for the last bucket
+        ranges = [{'_id': {'$gte': bucket['_id']['min'], '$lt': bucket['_id']['max']}} for bucket in buckets[:-1]]
+        last = buckets[-1]['_id']
+        ranges.append({'_id': {'$gte': last['min'], '$lte': last['max']}})
+        return ranges
+
+    def _read_range(self, query):
+        """
+        Read one _id range into per-column buffers.
+
+        Args:
+            query: Range filter
+
+        Returns:
+            DataFrame: Flattened rows of the range
+        """
+        fields = [(field.column, field.section, field.key) for field in self.schema.fields]
+        buffers = {column: [] for column, _, _ in fields}
+        projection = {'_id': 0, **{f"{section}.{key}": 1 for _, section, key in fields}}
+
+        empty = {}
+        for document in self.collection.find(query, projection, batch_size=self.batch_size):
+            for column, section, key in fields:
+                buffers[column].append(document.get(section, empty).get(key))
+
+        return pd.DataFrame(buffers)
+
+    def _decode_references(self, df):
+        """Replace reference ids with names when reference data is normalised."""
+        if self.resolver is None:
+            return df
+
+        for field, (_, _, column) in REFERENCE_FIELDS.items():
+            if field in self.resolver.fields and column in df:
+                names = {ref_id: self.resolver.name(field, ref_id) for ref_id in df[column].dropna().unique()}
+                df[column] = df[column].map(names)
+        return df
+
+    def read(self):
+        """
+        Read the whole collection into a DataFrame.
+
+        Returns:
+            DataFrame: Rows in the cleaned CSV layout
+        """
+        ranges = self._ranges()
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(ranges))) as executor:
+            frames = list(executor.map(self._read_range, ranges))
+
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=self.schema.columns)
+        df = self._decode_references(df)
+        for field in self.schema.fields:
+            if field.kind == 'date':
+                df[field.column] = pd.to_datetime(df[field.column])
+        return df[[column for column in self.columns if column in df]]
+
+    def export(self, output_path, fmt=None):
+        """
+        Export the collection to CSV or Parquet.
+
+        Args:
+            output_path: Output file
+            fmt: 'csv' or 'parquet' (inferred from the file suffix when omitted)
+
+        Returns:
+            DataFrame: The exported rows
+        """
+        output_path = Path(output_path)
+        fmt = fmt or output_path.suffix.lstrip('.').lower() or 'csv'
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt} (expected one of {EXPORT_FORMATS})")
+
+        start = time.perf_counter()
+        df = self.read()
+        read_seconds = time.perf_counter() - start
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if fmt == 'parquet':
+            try:
+                df.to_parquet(output_path, index=False)
+            except ImportError as e:
+                raise ImportError(f"Parquet export requires pyarrow (poetry install --extras parquet) - {e}") from e
+        else:
+            df.to_csv(output_path, index=False, date_format='%Y-%m-%d')
+
+        total_seconds = time.perf_counter() - start
+        rate = len(df) / total_seconds if total_seconds else 0.0
+        print(f"Exported {len(df):,} documents to {output_path} "
+              f"(read {read_seconds:.2f}s, total {total_seconds:.2f}s, {rate:,.0f} docs/s)")
+        return df
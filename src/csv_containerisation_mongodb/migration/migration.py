@@ -7,18 +7,37 @@ Implements structured document transformation and bulk insertion.
 Author: hhdonglo - OpenClassrooms (DataSoluTech)
 """
 
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+from pymongo import MongoClient, ReturnDocument, WriteConcern
+from pymongo.errors import BulkWriteError, ConnectionFailure
 import pandas as pd
 from datetime import datetime, timezone
 import logging
 import os
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from csv_containerisation_mongodb.utils.file_manager import FILE_PATH_MANAGER
 from csv_containerisation_mongodb.data.load_data import LOAD_DATA
+from csv_containerisation_mongodb.utils.metrics import METRICS
+from csv_containerisation_mongodb.migration.schema import HEALTHCARE_SCHEMA
 
 logger = logging.getLogger(__name__)
 
+# Collection recording the last completed migration run per collection
+RUNS_COLLECTION = 'migration_runs'
+
+# Write concern of the inserted batches per load profile. Every run ends with
+# a majority + journaled write to RUNS_COLLECTION, which the server only
+# acknowledges once all earlier writes are journaled and replicated, so the
+# "bulk" profile still finishes durable.
+LOAD_PROFILES = {
+    'safe': WriteConcern(w='majority', j=True),
+    'bulk': WriteConcern(w=1, j=False),
+}
+DURABLE_WRITE_CONCERN = WriteConcern(w='majority', j=True)
+
 
 class Connect:
     """MongoDB connection manager."""
@@ -73,17 +92,194 @@ class Connect:
 class LoadDb:
     """Handles data migration from DataFrame to MongoDB."""
     
-    def __init__(self, db: Connect, df=None):
+    def __init__(self, db: Connect, df=None, source_file=None, build_indexes=True, partitioner=None, encoder=None,
+                 schema=None, dead_letter=None, batch_size=5000, batch_sizer=None,
+                 load_profile='safe', sharding=None, change_manifest=False, chunk_rows=None, insert_workers=0,
+                 mapping=HEALTHCARE_SCHEMA, clustering=None, source_label=None):
         """
         Initialize database loader.
         
         Args:
             db: MongoDB connection object
             df: DataFrame to migrate
+            source_file: Raw file name the DataFrame came from. When set, only
+                documents previously migrated from this file are replaced
+                instead of resetting the whole collection.
+            build_indexes: Whether to (re)create indexes after insertion
+            partitioner: Optional AdmissionPartitioner for a time-partitioned layout
+            encoder: Optional ReferenceEncoder storing reference values as ids
+            schema: Optional DocumentSchema used to reject invalid rows up front
+                and to install the server-side $jsonSchema validator
+            dead_letter: Optional DeadLetterQueue. When set, rows failing validation,
+                transformation or insertion are recorded there and the run carries on;
+                otherwise the first failure aborts the load.
+            batch_size: Documents per insert_many call
+            batch_sizer: Optional AdaptiveBatchSizer choosing the batch size from
+                measured throughput (batch_size is then unused)
+            load_profile: Key of LOAD_PROFILES selecting the batch write concern
+            sharding: Optional ShardingPlanner. The collection is sharded and
+                pre-split before inserting, and each shard gets its own writer.
+            change_manifest: Whether to record the ids inserted, updated and deleted
+                by the run in the change manifest (see change_feed)
+            chunk_rows: Transform and insert this many rows at a time instead of
+                building every document first (not supported with sharding)
+            insert_workers: With chunk_rows, number of slices inserted in background
+                threads while the next slice is transformed (0 inserts inline).
+                A batch_sizer is shared by all writers.
+            mapping: DocumentSchema the documents are built from (its compiled builder)
+            clustering: Optional ClusteredLayout. The collection is created clustered
+                on a date-ordered, deterministic _id and every insert is sorted by it
+                (not supported with sharding or split partitions).
+            source_label: Raw file name recorded as metadata.source_file by a full
+                reload (source_file=None), so a later per-file reload of the same
+                file replaces these documents instead of duplicating them.
         """
+        if load_profile not in LOAD_PROFILES:
+            raise ValueError(f"Unknown load profile: {load_profile} (expected one of {list(LOAD_PROFILES)})")
+        splits_collections = partitioner is not None and partitioner.splits_collections
+        if sharding is not None and splits_collections:
+            raise ValueError("Sharded loads cannot be combined with split partitions")
+        if chunk_rows is not None and sharding is not None:
+            raise ValueError("Sharded loads need every document up front and cannot be chunked")
+        if clustering is not None and (sharding is not None or splits_collections):
+            raise ValueError("Clustered collections cannot be combined with sharding or split partitions")
+        
+        self.db = db.db
         self.collection = db.collection
         self.collection_name = db.collection_name
         self.df = df
+        self.source_file = source_file
+        self.build_indexes = build_indexes
+        self.partitioner = partitioner
+        self.encoder = encoder
+        self.schema = schema
+        self.dead_letter = dead_letter
+        self.batch_size = batch_size
+        self.batch_sizer = batch_sizer
+        self.load_profile = load_profile
+        self.sharding = sharding
+        self.change_manifest = change_manifest
+        self.chunk_rows = chunk_rows
+        self.insert_workers = insert_workers
+        self.mapping = mapping
+        self._build = mapping.builder
+        self.clustering = clustering
+        self.source_label = source_label
+        self._clustered = False
+        self.deleted_ids = []
+        self._validated = set()
+        self.insert_seconds = None
+        self.rejected = None
+        self.run_id = None
+
+    @property
+    def _splits_collections(self):
+        return self.partitioner is not None and self.partitioner.splits_collections
+
+    def _target_collections(self):
+        """Return the collections holding this load's documents."""
+        if self._splits_collections:
+            return [self.db[name] for name in self.partitioner.list_partitions(self.db)]
+        return [self.collection]
+
+    @property
+    def _source_tag(self):
+        """Raw file name stored in metadata.source_file, if any."""
+        return self.source_file or self.source_label
+
+    @property
+    def _encoded_paths(self):
+        return self.encoder.encoded_paths if self.encoder is not None else set()
+
+    def _validate(self):
+        """Reject rows that do not match the schema before documents are built."""
+        self.df, self.rejected = self.schema.validate_frame(self.df)
+        print(f"Schema validation: {len(self.df):,} valid rows, {len(self.rejected):,} rejected")
+        if self.dead_letter is not None:
+            self.dead_letter.add_frame(self.rejected, 'validation')
+        if not self.rejected.empty:
+            for reason, count in self.rejected['rejection_reason'].value_counts().head(5).items():
+                print(f"  - {reason}: {count:,} rows")
+
+    def _apply_validator(self, collection_name):
+        """Install the $jsonSchema validator on a target collection (once per load)."""
+        if self.schema is None or collection_name in self._validated:
+            return
+        self._validated.add(collection_name)
+        try:
+            self.schema.apply_validator(self.db, collection_name, self._encoded_paths)
+        except Exception as e:
+            logger.warning(f"Validator not applied to {collection_name}: {e}")
+            print(f"WARNING: Schema validator not applied to '{collection_name}' - {e}")
+
+    def _reset(self):
+        """
+        Remove the documents this load replaces.
+        
+        Returns:
+            int: Number of documents removed
+        """
+        if self.change_manifest:
+            self.deleted_ids = [
+                document['_id']
+                for collection in self._target_collections()
+                for document in collection.find(self._scope_filter(), {'_id': 1})
+            ]
+        
+        if not self._splits_collections and self._partition_view() is not None:
+            if self.source_file is not None:
+                raise ValueError(f"'{self.collection_name}' is a view over partition collections; "
+                                 f"reload the whole collection to change its layout")
+            return self._drop_partition_view()
+        
+        if self._splits_collections and self.source_file is None:
+            deleted = 0
+            for collection in self._target_collections():
+                deleted += collection.estimated_document_count()
+                collection.drop()
+            self.db.drop_collection(self.collection_name)
+            return deleted
+        
+        if (self.sharding is not None or self.clustering is not None) and self.source_file is None:
+            # Dropping lets the next load shard and pre-split, or cluster, an empty collection
+            deleted = self.collection.estimated_document_count()
+            self.collection.drop()
+            return deleted
+        
+        return sum(
+            collection.delete_many(self._scope_filter()).deleted_count
+            for collection in self._target_collections()
+        )
+
+    def _partition_view(self):
+        """Return the view definition when the collection is a view left by a split layout."""
+        views = list(self.db.list_collections(filter={'name': self.collection_name, 'type': 'view'}))
+        return views[0]['options'] if views else None
+
+    def _drop_partition_view(self):
+        """
+        Drop the view over partition collections and the partitions it spans.
+        
+        Returns:
+            int: Number of documents removed
+        """
+        options = self._partition_view()
+        partitions = [options['viewOn']] + [stage['$unionWith'] for stage in options.get('pipeline', [])
+                                            if isinstance(stage.get('$unionWith'), str)]
+        deleted = 0
+        for name in partitions:
+            deleted += self.db[name].estimated_document_count()
+            self.db.drop_collection(name)
+        self.db.drop_collection(self.collection_name)
+        print(f"Dropped view '{self.collection_name}' and {len(partitions)} partition collections "
+              f"left by a split layout")
+        return deleted
+
+    def _scope_filter(self):
+        """Return the filter selecting documents owned by this load."""
+        if self.source_file is None:
+            return {}
+        return {"metadata.source_file": self.source_file}
 
     def transform_row_to_mongodb(self, row):
         """
@@ -95,92 +291,113 @@ class LoadDb:
         Returns:
             dict: Structured MongoDB document
         """
-        document = {
-            "patient_info": {
-                "name": row['Name'],
-                "age": int(row['Age']),
-                "gender": row['Gender'],
-                "blood_type": row['Blood Type']
-            },
-            
-            "medical_details": {
-                "medical_condition": row['Medical Condition'],
-                "medication": row['Medication'],
-                "test_results": row['Test Results']
-            },
-            
-            "admission_details": {
-                "admission_date": row['Admission Date'],
-                "admission_type": row['Admission Type'],
-                "room_number": int(row['Room Number']),
-                "discharge_date": row['Discharge Date']
-            },
-            
-            "hospital_info": {
-                "hospital": row['Hospital'],
-                "doctor": row['Doctor']
-            },
-            
-            "billing": {
-                "insurance_provider": row['Insurance Provider'],
-                "billing_amount": float(round(row['Billing Amount'], 2))
-            },
+        return self._complete_document(self._build(tuple(row.get(column) for column in self.mapping.columns)))
+
+    def _complete_document(self, document):
+        """
+        Add the migration metadata, partition fields and reference ids to a built document.
+        
+        Args:
+            document: Document returned by the compiled mapping builder
             
-            "metadata": {
-                "created_at": datetime.now(timezone.utc),
-                "updated_at": datetime.now(timezone.utc),
-                "data_source": "CSV_migration",
-                "migrated_by": "Hope - DataSoluTech"
-            }
+        Returns:
+            dict: Structured MongoDB document
+        """
+        if self.clustering is not None:
+            self.clustering.assign_id(document, self._source_tag)
+        
+        now = datetime.now(timezone.utc)
+        document["metadata"] = {
+            "created_at": now,
+            "updated_at": now,
+            "data_source": "CSV_migration",
+            "migrated_by": "Hope - DataSoluTech"
         }
+
+        if self._source_tag is not None:
+            document["metadata"]["source_file"] = self._source_tag
+
+        if self.partitioner is not None:
+            self.partitioner.annotate(document)
+
+        if self.encoder is not None:
+            self.encoder.encode(document)
         
         return document
 
     def dbloader(self):
         """Load DataFrame into MongoDB collection with bulk insertion."""
         
+        # Sizes of the previous load, compared with this one in the savings report
+        stats_before = self.encoder.collection_stats(self.collection) if self.encoder is not None else None
+        
         try:
-            deleted_count = self.collection.delete_many({})
-            print(f"Collection '{self.collection_name}' reset: {deleted_count.deleted_count} documents removed")
+            deleted_count = self._reset()
+            if self.source_file is None:
+                print(f"Collection '{self.collection_name}' reset: {deleted_count} documents removed")
+            else:
+                print(f"Replacing '{self.source_file}' in '{self.collection_name}': "
+                      f"{deleted_count} documents removed")
         except Exception as e:
             print(f"ERROR: Collection reset failed - {e}")
             raise
 
+        if self.clustering is not None:
+            self._create_clustered_collection()
+        
         print('-' * 80)
         print('INSERTING DATA INTO MONGODB')
         print('-' * 80)
         
         try:
-            documents = []
-            total_rows = len(self.df)
+            self.df = self.mapping.conform(self.df)
+            if self.schema is not None:
+                self._validate()
             
-            print(f"Transforming {total_rows:,} records...")
+            if self.encoder is not None:
+                self.encoder.prepare(self.df)
             
-            for idx, row in self.df.iterrows():
-                doc = self.transform_row_to_mongodb(row)
-                documents.append(doc)
+            if self.chunk_rows is not None:
+                insert_start = time.perf_counter()
+                inserted, accepted, inserted_ids = self._load_in_chunks()
+                self.insert_seconds = time.perf_counter() - insert_start
+            else:
+                documents, labels = self._transform_rows()
                 
-                if (idx + 1) % 5000 == 0:
-                    print(f"  Progress: {idx + 1:,}/{total_rows:,} records")
-            
-            print(f"Inserting {len(documents):,} documents...")
-            result = self.collection.insert_many(documents, ordered=False)
+                if self.sharding is not None:
+                    self.sharding.prepare(documents)
+                
+                insert_start = time.perf_counter()
+                inserted, accepted = self._insert_documents(documents, labels)
+                self.insert_seconds = time.perf_counter() - insert_start
+                inserted_ids = self._inserted_ids(documents, labels, accepted) if self.change_manifest else []
             
-            print(f"Successfully inserted {len(result.inserted_ids):,} documents")
+            print(f"Successfully inserted {inserted:,} documents")
             
         except Exception as e:
             logger.error(f"Data insertion failed: {e}", exc_info=True)
             print(f"ERROR: Data insertion failed - {e}")
             raise
         
-        try:
-            self.create_indexes()
-            print("Indexes created successfully")
-        except Exception as e:
-            logger.error(f"Index creation failed: {e}")
-            print(f"WARNING: Index creation failed - {e}")
+        # Only rows that reached the collection count towards the checks below
+        self.df = self.df.loc[accepted]
+        
+        if self.build_indexes:
+            try:
+                self.create_indexes()
+                print("Indexes created successfully")
+            except Exception as e:
+                logger.error(f"Index creation failed: {e}")
+                print(f"WARNING: Index creation failed - {e}")
         
-        inserted_count = self.collection.count_documents({})
+        if self._splits_collections:
+            partitions = self.partitioner.create_view(self.db)
+            print(f"View '{self.collection_name}' spans {len(partitions)} partitions")
+        
+        inserted_count = sum(
+            collection.count_documents(self._scope_filter())
+            for collection in self._target_collections()
+        )
         expected_count = len(self.df)
         
         if inserted_count != expected_count:
@@ -188,26 +405,369 @@ class LoadDb:
             logger.error(error_msg)
             raise ValueError(error_msg)
         
+        previous_run = self._record_run(inserted_count)
+        self._report_throughput(inserted_count, previous_run)
+        
+        if self.change_manifest:
+            self._write_change_manifest(inserted_ids)
+        
+        if self.batch_sizer is not None:
+            self.batch_sizer.report()
+        
+        if self.dead_letter is not None:
+            self.dead_letter.flush()
+            self.dead_letter.report()
+        
+        if self.encoder is not None:
+            self.encoder.report(self.df, self.collection, before=stats_before)
+        
         print('-' * 80)
         print(f"Total documents inserted: {inserted_count:,}")
         print("DONE")
         print('-' * 80)
 
+    def _create_clustered_collection(self):
+        """Create the collection clustered on _id (documents still get their date-ordered ids)."""
+        try:
+            self._clustered = self.clustering.create_collection(self.db, self.collection_name)
+        except Exception as e:
+            logger.warning(f"Clustered collection not created: {e}")
+            print(f"WARNING: '{self.collection_name}' not created as a clustered collection - {e}")
+            return
+        if self._clustered:
+            print(f"Collection '{self.collection_name}' clustered on admission-date _id")
+
+    def _transform_rows(self, frame=None):
+        """
+        Build documents for every row, isolating rows that fail.
+        
+        Args:
+            frame: Rows to transform (defaults to the whole DataFrame, with progress output)
+        
+        Returns:
+            tuple: (documents, DataFrame index labels of the documents)
+        """
+        documents = []
+        labels = []
+        reported = 0
+        show_progress = frame is None
+        frame = self.df if frame is None else frame
+        total_rows = len(frame)
+        
+        if show_progress:
+            print(f"Transforming {total_rows:,} records...")
+        
+        build = self._build
+        rows = frame[self.mapping.columns].itertuples(index=False, name=None)
+        for position, (label, values) in enumerate(zip(frame.index, rows), start=1):
+            try:
+                documents.append(self._complete_document(build(values)))
+                labels.append(label)
+            except Exception as e:
+                if self.dead_letter is None:
+                    raise
+                self.dead_letter.add(frame.iloc[position - 1], 'transform', f"{type(e).__name__}: {e}")
+            
+            if position % 5000 == 0:
+                METRICS.inc('documents_built_total', len(documents) - reported)
+                reported = len(documents)
+                if show_progress:
+                    print(f"  Progress: {position:,}/{total_rows:,} records")
+        
+        METRICS.inc('documents_built_total', len(documents) - reported)
+        return documents, labels
+
+    def _load_in_chunks(self):
+        """
+        Transform and insert the DataFrame chunk_rows rows at a time.
+        
+        Only the documents of the slice being built and of the slices being
+        inserted are held in memory. With insert_workers, slices are inserted
+        in background threads while the next one is transformed.
+        
+        Returns:
+            tuple: (number inserted, labels of the inserted rows, ids of the inserted documents)
+        """
+        total_rows = len(self.df)
+        starts = range(0, total_rows, self.chunk_rows)
+        writers = f"{self.insert_workers} background writer(s)" if self.insert_workers else "inline inserts"
+        print(f"Streaming {total_rows:,} records in {len(starts)} chunks of {self.chunk_rows:,} ({writers})...")
+        
+        inserted = 0
+        accepted = []
+        inserted_ids = []
+        pending = deque()
+        
+        def collect(result, documents, labels):
+            nonlocal inserted
+            chunk_inserted, chunk_accepted = result
+            inserted += chunk_inserted
+            accepted.extend(chunk_accepted)
+            if self.change_manifest:
+                inserted_ids.extend(self._inserted_ids(documents, labels, chunk_accepted))
+        
+        with ThreadPoolExecutor(max_workers=max(self.insert_workers, 1)) as executor:
+            for number, start in enumerate(starts, start=1):
+                documents, labels = self._transform_rows(self.df.iloc[start:start + self.chunk_rows])
+                if self.insert_workers:
+                    pending.append((executor.submit(self._insert_documents, documents, labels, quiet=True),
+                                    documents, labels))
+                    while len(pending) > self.insert_workers:
+                        future, documents, labels = pending.popleft()
+                        collect(future.result(), documents, labels)
+                else:
+                    collect(self._insert_documents(documents, labels, quiet=True), documents, labels)
+                print(f"  Chunk {number}/{len(starts)}: {min(start + self.chunk_rows, total_rows):,}/"
+                      f"{total_rows:,} records transformed")
+            
+            while pending:
+                future, documents, labels = pending.popleft()
+                collect(future.result(), documents, labels)
+        
+        return inserted, accepted, inserted_ids
+
+    def _insert_documents(self, documents, labels, quiet=False):
+        """
+        Insert documents batch by batch into their target collections.
+        
+        Args:
+            documents: Documents to insert
+            labels: DataFrame index labels of the documents
+            quiet: Skip the per-call progress lines (used for chunked loads)
+        
+        Returns:
+            tuple: (number inserted, labels of the inserted rows)
+        """
+        if self._splits_collections or self.sharding is not None:
+            label_of = {id(document): label for document, label in zip(documents, labels)}
+            routed = self.partitioner.route(documents) if self._splits_collections else self.sharding.route(documents)
+            groups = [
+                (target, group, [label_of[id(document)] for document in group])
+                for target, group in routed.items()
+            ]
+        else:
+            if self.clustering is not None:
+                # Inserting in _id order appends to neighbouring clustered index pages
+                documents, labels = self.clustering.sort(documents, labels)
+            groups = [(self.collection_name, documents, labels)]
+        
+        if not quiet:
+            if self.batch_sizer is None:
+                print(f"Inserting {len(documents):,} documents in batches of {self.batch_size:,}...")
+            else:
+                print(f"Inserting {len(documents):,} documents with adaptive batches "
+                      f"(starting at {self.batch_sizer.next_size():,})...")
+        
+        if self.sharding is not None:
+            self._apply_validator(self.collection_name)
+            # One writer per shard so the load scales with the number of shards
+            with ThreadPoolExecutor(max_workers=max(len(groups), 1)) as executor:
+                results = list(executor.map(
+                    lambda group: self._insert_group(self.collection_name, group[1], group[2]), groups
+                ))
+        else:
+            results = []
+            for name, group, group_labels in groups:
+                self._apply_validator(name)
+                results.append(self._insert_group(name, group, group_labels))
+        
+        inserted = 0
+        accepted = []
+        for (target, _, _), (group_inserted, group_accepted) in zip(groups, results):
+            inserted += group_inserted
+            accepted.extend(group_accepted)
+            if len(groups) > 1 and not quiet:
+                print(f"  {target}: {group_inserted:,} documents")
+        
+        return inserted, accepted
+
+    def _insert_group(self, name, group, group_labels):
+        """
+        Insert the documents bound for one collection or shard in batches.
+        
+        Args:
+            name: Target collection name
+            group: Documents to insert
+            group_labels: DataFrame index labels of the documents
+        
+        Returns:
+            tuple: (number inserted, labels of the inserted rows)
+        """
+        collection = self.db[name].with_options(write_concern=LOAD_PROFILES[self.load_profile])
+        inserted = 0
+        accepted = []
+        
+        start = 0
+        while start < len(group):
+            size = self.batch_size if self.batch_sizer is None else self.batch_sizer.next_size()
+            batch = group[start:start + size]
+            if self.batch_sizer is not None:
+                encode_seconds, document_bytes = self.batch_sizer.measure(batch)
+            
+            batch_start = time.perf_counter()
+            batch_inserted, batch_accepted = self._insert_batch(collection, batch, group_labels[start:start + size])
+            batch_seconds = time.perf_counter() - batch_start
+            METRICS.observe('insert_batch_seconds', batch_seconds)
+            METRICS.inc('documents_inserted_total', batch_inserted)
+            if self.batch_sizer is not None:
+                self.batch_sizer.record(len(batch), batch_seconds, encode_seconds, document_bytes, size=size)
+            
+            inserted += batch_inserted
+            accepted.extend(batch_accepted)
+            start += size
+        
+        return inserted, accepted
+
+    def _insert_batch(self, collection, batch, batch_labels):
+        """
+        Insert one batch, sending rejected documents to the dead-letter queue.
+        
+        Args:
+            collection: Target collection
+            batch: Documents to insert
+            batch_labels: DataFrame index labels of the documents
+        
+        Returns:
+            tuple: (number inserted, labels of the inserted rows)
+        """
+        try:
+            result = collection.insert_many(batch, ordered=False)
+            return len(result.inserted_ids), batch_labels
+        except BulkWriteError as e:
+            if self.dead_letter is None:
+                raise
+            
+            failed = {error['index']: error.get('errmsg', 'write error') for error in e.details.get('writeErrors', [])}
+            for index, reason in failed.items():
+                self.dead_letter.add(self.df.loc[batch_labels[index]], 'insert', reason)
+            
+            accepted = [label for index, label in enumerate(batch_labels) if index not in failed]
+            return e.details.get('nInserted', len(accepted)), accepted
+
+    def _record_run(self, document_count):
+        """
+        Record the completed run so readers can invalidate cached results.
+        
+        The write uses a majority + journaled write concern and acts as the
+        durability barrier for batches inserted with a weaker profile.
+        
+        Args:
+            document_count: Number of documents loaded by this run
+        
+        Returns:
+            dict: The previous run record, or None
+        """
+        self.run_id = uuid.uuid4().hex
+        runs = self.db[RUNS_COLLECTION].with_options(write_concern=DURABLE_WRITE_CONCERN)
+        return runs.find_one_and_update(
+            {"_id": self.collection_name},
+            {"$set": {
+                "run_id": self.run_id,
+                "finished_at": datetime.now(timezone.utc),
+                "documents": document_count,
+                "rejected": len(self.dead_letter) if self.dead_letter is not None else 0,
+                "source_file": self.source_file,
+                "load_profile": self.load_profile,
+                "docs_per_s": self._throughput(document_count)
+            }},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+
+    @staticmethod
+    def _inserted_ids(documents, labels, accepted):
+        """
+        Return the _id of every inserted document.
+        
+        Args:
+            documents: Documents built by this run (with their _id after insertion)
+            labels: DataFrame index labels of the documents
+            accepted: Labels of the inserted rows
+        """
+        accepted = set(accepted)
+        return [document['_id'] for document, label in zip(documents, labels) if label in accepted]
+
+    def _write_change_manifest(self, inserted_ids):
+        """
+        Publish the ids changed by this run to the change manifest.
+        
+        Args:
+            inserted_ids: Ids of the documents inserted by this run
+        """
+        from csv_containerisation_mongodb.migration.change_feed import write_manifest
+        
+        try:
+            changes = write_manifest(
+                self.db, self.collection_name, self.run_id, self.source_file, inserted_ids, self.deleted_ids
+            )
+            print(f"Change manifest: {changes.summary()}")
+        except Exception as e:
+            logger.warning(f"Change manifest not written: {e}")
+            print(f"WARNING: Change manifest not written - {e}")
+
+    def _throughput(self, document_count):
+        """Return the insert throughput of this run in documents per second."""
+        if not self.insert_seconds:
+            return None
+        return round(document_count / self.insert_seconds, 1)
+
+    def _report_throughput(self, document_count, previous_run):
+        """
+        Print the insert throughput, compared with the previous run's profile.
+        
+        Args:
+            document_count: Number of documents loaded by this run
+            previous_run: Run record replaced by this run
+        """
+        throughput = self._throughput(document_count)
+        if throughput is None:
+            return
+        
+        print(f"Load profile '{self.load_profile}': {throughput:,.0f} docs/s "
+              f"({LOAD_PROFILES[self.load_profile].document})")
+        
+        if previous_run and previous_run.get('docs_per_s'):
+            previous = previous_run['docs_per_s']
+            change = (throughput - previous) / previous * 100
+            print(f"  Previous run ('{previous_run.get('load_profile', 'safe')}'): {previous:,.0f} docs/s "
+                  f"({change:+.1f}%)")
+
     def create_indexes(self):
         """Create indexes for optimized query performance."""
         print("\n[CREATING INDEXES]")
         
-        self.collection.create_index("patient_info.name")
+        collections = self._target_collections()
+        for collection in collections:
+            collection.create_index("patient_info.name")
+            collection.create_index("patient_info.patient_id")
+            if not self._clustered:
+                collection.create_index("admission_details.admission_date")
+            collection.create_index([
+                ("medical_details.medical_condition", 1),
+                ("hospital_info.hospital", 1)
+            ])
         print("- Created index on patient_info.name")
-        
-        self.collection.create_index("admission_details.admission_date")
-        print("- Created index on admission_details.admission_date")
-        
-        self.collection.create_index([
-            ("medical_details.medical_condition", 1),
-            ("hospital_info.hospital", 1)
-        ])
+        print("- Created index on patient_info.patient_id")
+        if self._clustered:
+            print("- admission_details.admission_date ranges use the clustered _id (no secondary index)")
+        else:
+            print("- Created index on admission_details.admission_date")
         print("- Created compound index on medical_condition + hospital")
+
+        if self.partitioner is not None and self.partitioner.granularity == 'bucket':
+            self.collection.create_index([
+                ("admission_details.admission_bucket", 1),
+                ("admission_details.admission_date", 1)
+            ])
+            print("- Created compound index on admission_bucket + admission_date")
+
+        if self._source_tag is not None:
+            for collection in collections:
+                collection.create_index("metadata.source_file")
+            print("- Created index on metadata.source_file")
+
+        if len(collections) > 1:
+            print(f"- Indexes applied to {len(collections)} partition collections")
         
         print("[INDEXES CREATED]\n")
         return self
@@ -0,0 +1,211 @@
+"""
+Admission Date Partitioning Module
+
+Time-partitioned layouts for healthcare documents, keyed on
+admission_details.admission_date:
+
+- 'year' / 'month': one collection per period (healthcare_data_2024,
+  healthcare_data_2024_03, ...) behind a read-only view named after the
+  base collection, so full-collection readers keep working.
+- 'bucket': a single collection with an admission_details.admission_bucket
+  field ('YYYY-MM') usable as a shard-key prefix.
+
+Range queries are routed to the partitions (or buckets) they overlap.
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from datetime import datetime
+import re
+
+
+GRANULARITIES = ('year', 'month', 'bucket')
+UNDATED_SUFFIX = 'undated'
+
+
+def partition_pattern(base_name):
+    """
+    Return the regex matching the partition collections of a base collection.
+
+    Args:
+        base_name: Base collection name
+
+    Returns:
+        str: Pattern matching <base>_YYYY, <base>_YYYY_MM and <base>_undated
+    """
+    return rf"^{re.escape(base_name)}_(\d{{4}}(_\d{{2}})?|{UNDATED_SUFFIX})$"
+
+
+class AdmissionPartitioner:
+    """Routes documents and date-range queries to admission-date partitions."""
+
+    def __init__(self, base_name, granularity='month'):
+        """
+        Initialize the partitioner.
+
+        Args:
+            base_name: Base collection name
+            granularity: 'year', 'month' or 'bucket'
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown partition granularity: {granularity} (expected one of {GRANULARITIES})")
+
+        self.base_name = base_name
+        self.granularity = granularity
+        self._pattern = re.compile(partition_pattern(base_name))
+
+    @property
+    def splits_collections(self):
+        """True when documents are spread over one collection per period."""
+        return self.granularity in ('year', 'month')
+
+    @staticmethod
+    def bucket(date):
+        """Return the 'YYYY-MM' bucket of a date (None for missing dates)."""
+        if date is None:
+            return None
+        return f"{date.year:04d}-{date.month:02d}"
+
+    def collection_name(self, date):
+        """
+        Return the partition collection holding documents admitted on a date.
+
+        Args:
+            date: Admission datetime (or None)
+
+        Returns:
+            str: Collection name
+        """
+        if not self.splits_collections:
+            return self.base_name
+        if date is None:
+            return f"{self.base_name}_{UNDATED_SUFFIX}"
+        if self.granularity == 'year':
+            return f"{self.base_name}_{date.year:04d}"
+        return f"{self.base_name}_{date.year:04d}_{date.month:02d}"
+
+    def annotate(self, document):
+        """
+        Add the bucket field to a document when using the bucket layout.
+
+        Args:
+            document: MongoDB document (modified in place)
+
+        Returns:
+            dict: The document
+        """
+        if self.granularity == 'bucket':
+            admission = document['admission_details']
+            admission['admission_bucket'] = self.bucket(admission['admission_date'])
+        return document
+
+    def route(self, documents):
+        """
+        Group documents by target collection.
+
+        Args:
+            documents: Iterable of MongoDB documents
+
+        Returns:
+            dict: Collection name -> list of documents
+        """
+        routed = {}
+        for document in documents:
+            name = self.collection_name(document['admission_details']['admission_date'])
+            routed.setdefault(name, []).append(document)
+        return routed
+
+    def list_partitions(self, db):
+        """Return the existing partition collections, sorted by period."""
+        return sorted(name for name in db.list_collection_names() if self._pattern.match(name))
+
+    @staticmethod
+    def _months(start, end):
+        """Yield (year, month) for every month overlapping [start, end)."""
+        year, month = start.year, start.month
+        while (year, month) < (end.year, end.month) or \
+                ((year, month) == (end.year, end.month) and end > datetime(year, month, 1, tzinfo=end.tzinfo)):
+            yield year, month
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    def buckets_for_range(self, start, end):
+        """Return the 'YYYY-MM' buckets overlapping [start, end)."""
+        return [f"{year:04d}-{month:02d}" for year, month in self._months(start, end)]
+
+    def partitions_for_range(self, start, end, existing=None):
+        """
+        Return the partition collections overlapping [start, end).
+
+        Args:
+            start: Range start (inclusive)
+            end: Range end (exclusive)
+            existing: Existing partition names to restrict the result to
+
+        Returns:
+            list: Collection names
+        """
+        if not self.splits_collections:
+            return [self.base_name]
+
+        names = []
+        for year, month in self._months(start, end):
+            name = self.collection_name(datetime(year, month, 1))
+            if name not in names:
+                names.append(name)
+
+        if existing is not None:
+            names = [name for name in names if name in existing]
+        return names
+
+    def range_filter(self, start, end):
+        """
+        Build the query filter for admissions in [start, end).
+
+        In the bucket layout the filter also pins the bucket field so that
+        a bucket-prefixed shard key can target the matching shards.
+        """
+        query = {"admission_details.admission_date": {"$gte": start, "$lt": end}}
+        if self.granularity == 'bucket':
+            query["admission_details.admission_bucket"] = {"$in": self.buckets_for_range(start, end)}
+        return query
+
+    def find_range(self, db, start, end, extra_filter=None, projection=None):
+        """
+        Yield documents admitted in [start, end), reading only the relevant partitions.
+
+        Args:
+            db: pymongo Database
+            start: Range start (inclusive)
+            end: Range end (exclusive)
+            extra_filter: Additional query conditions
+            projection: Optional projection
+
+        Yields:
+            dict: Matching documents
+        """
+        query = self.range_filter(start, end)
+        if extra_filter:
+            query.update(extra_filter)
+
+        existing = set(self.list_partitions(db)) if self.splits_collections else None
+        for name in self.partitions_for_range(start, end, existing):
+            yield from db[name].find(query, projection)
+
+    def create_view(self, db):
+        """
+        Replace the base collection with a view over all partitions.
+
+        Args:
+            db: pymongo Database
+
+        Returns:
+            list: Partition collections included in the view
+        """
+        partitions = self.list_partitions(db)
+        db.drop_collection(self.base_name)
+        if not partitions:
+            return partitions
+
+        pipeline = [{"$unionWith": name} for name in partitions[1:]]
+        db.create_collection(self.base_name, viewOn=partitions[0], pipeline=pipeline)
+        return partitions
@@ -0,0 +1,280 @@
+"""
+Reference Data Module
+
+Dictionary-encodes the low-cardinality text fields of healthcare documents
+(hospital, doctor, insurance provider, medical condition, medication) into
+small reference collections, storing compact integer ids in the patient
+documents. Ids are stable across runs: existing names keep their id and new
+names are appended.
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+import pandas as pd
+
+
+# field -> (document section, document key, CSV column)
+REFERENCE_FIELDS = {
+    'hospital': ('hospital_info', 'hospital', 'Hospital'),
+    'doctor': ('hospital_info', 'doctor', 'Doctor'),
+    'insurance_provider': ('billing', 'insurance_provider', 'Insurance Provider'),
+    'medical_condition': ('medical_details', 'medical_condition', 'Medical Condition'),
+    'medication': ('medical_details', 'medication', 'Medication'),
+}
+
+# Fields covered by the medical_condition + hospital compound index
+INDEXED_FIELDS = ('medical_condition', 'hospital')
+
+BSON_INT32_SIZE = 4
+
+
+def reference_collection_name(collection_name, field):
+    """Return the reference collection name for a field."""
+    return f"{collection_name}_ref_{field}"
+
+
+class ReferenceEncoder:
+    """Maintains reference collections and encodes documents with their ids."""
+
+    def __init__(self, db, collection_name, fields=None):
+        """
+        Initialize the encoder.
+
+        Args:
+            db: pymongo Database
+            collection_name: Patient collection name
+            fields: Reference fields to encode (defaults to all)
+        """
+        self.db = db
+        self.collection_name = collection_name
+        self.fields = list(fields or REFERENCE_FIELDS)
+        self.mappings = {}
+
+    @property
+    def encoded_paths(self):
+        """Dotted document paths stored as reference ids."""
+        return {f"{REFERENCE_FIELDS[field][0]}.{REFERENCE_FIELDS[field][1]}" for field in self.fields}
+
+    def _collection(self, field):
+        return self.db[reference_collection_name(self.collection_name, field)]
+
+    def prepare(self, df):
+        """
+        Register every distinct value of the DataFrame in the reference collections.
+
+        Args:
+            df: Cleaned DataFrame about to be migrated
+
+        Returns:
+            dict: field -> number of new reference entries
+        """
+        added = {}
+        for field in self.fields:
+            _, _, column = REFERENCE_FIELDS[field]
+            collection = self._collection(field)
+
+            mapping = {doc['name']: doc['_id'] for doc in collection.find({}, {'name': 1})}
+            next_id = max(mapping.values(), default=0) + 1
+
+            new_entries = []
+            for name in pd.unique(df[column].dropna()):
+                name = str(name)
+                if name not in mapping:
+                    mapping[name] = next_id
+                    new_entries.append({'_id': next_id, 'name': name})
+                    next_id += 1
+
+            if new_entries:
+                collection.insert_many(new_entries, ordered=False)
+            collection.create_index('name', unique=True)
+
+            self.mappings[field] = mapping
+            added[field] = len(new_entries)
+
+        print("Reference data: " + ", ".join(
+            f"{field}={len(self.mappings[field])} (+{added[field]})" for field in self.fields
+        ))
+        return added
+
+    def encode(self, document):
+        """
+        Replace reference values in a document with their ids (in place).
+
+        Args:
+            document: MongoDB document built by LoadDb.transform_row_to_mongodb
+
+        Returns:
+            dict: The document
+        """
+        for field in self.fields:
+            section, key, _ = REFERENCE_FIELDS[field]
+            value = document[section][key]
+            if value is not None and not pd.isna(value):
+                document[section][key] = self.mappings[field][str(value)]
+        return document
+
+    def estimate_savings(self, df):
+        """
+        Estimate the BSON bytes saved by storing ids instead of strings.
+
+        A BSON string costs 4 (length) + len + 1 (terminator) bytes; an id
+        costs 4 bytes (int32). Index savings cover the fields in the
+        medical_condition + hospital compound index.
+
+        Args:
+            df: Cleaned DataFrame that was migrated
+
+        Returns:
+            dict: 'document_bytes' and 'index_bytes' saved
+        """
+        saved = {}
+        for field in self.fields:
+            _, _, column = REFERENCE_FIELDS[field]
+            values = df[column].dropna().astype(str)
+            string_bytes = (values.str.len() + 5).sum()
+            saved[field] = int(string_bytes - BSON_INT32_SIZE * len(values))
+
+        return {
+            'document_bytes': sum(saved.values()),
+            'index_bytes': sum(saved[field] for field in INDEXED_FIELDS if field in saved),
+            'per_field': saved
+        }
+
+    def collection_stats(self, collection):
+        """
+        Read the measured sizes of a collection.
+
+        Args:
+            collection: Patient collection
+
+        Returns:
+            dict: 'count', 'size', 'storageSize' and 'totalIndexSize' from
+                collStats, or None if the collection does not exist or they are unavailable
+        """
+        try:
+            if collection.name not in self.db.list_collection_names():
+                return None
+            stats = self.db.command('collStats', collection.name)
+        except Exception as e:
+            print(f"WARNING: Collection stats unavailable - {e}")
+            return None
+        return {key: stats.get(key, 0) for key in ('count', 'size', 'storageSize', 'totalIndexSize')}
+
+    @staticmethod
+    def _print_stats(label, stats):
+        """Print one collection_stats() result."""
+        print(f"- {label}: {stats['count']:,} documents, data {stats['size'] / 1024**2:.2f} MB, "
+              f"storage {stats['storageSize'] / 1024**2:.2f} MB, indexes {stats['totalIndexSize'] / 1024**2:.2f} MB")
+
+    def report(self, df, collection, before=None):
+        """
+        Print the estimated savings and the measured collection sizes.
+
+        The estimate is computed from the cleaned data; the measured sizes
+        come from collStats before and after the load. Their difference is a
+        measured saving only when the previous load held the same rows in
+        the plain layout.
+
+        Args:
+            df: Cleaned DataFrame that was migrated
+            collection: Patient collection
+            before: collection_stats() taken before the collection was reset
+
+        Returns:
+            dict: estimate_savings() result with the 'before' and 'after' stats
+        """
+        savings = self.estimate_savings(df)
+        print("\n[REFERENCE DATA SAVINGS]")
+        print("Estimated from the cleaned data (uncompressed BSON, not measured):")
+        for field, saved in savings['per_field'].items():
+            print(f"- {field}: ~{saved / 1024:.1f} KB saved in documents")
+        print(f"- Documents: ~{savings['document_bytes'] / 1024**2:.2f} MB saved")
+        print(f"- Indexes: ~{savings['index_bytes'] / 1024**2:.2f} MB saved (medical_condition + hospital)")
+
+        after = self.collection_stats(collection)
+        savings.update(before=before, after=after)
+        if after is None:
+            return savings
+
+        print("Measured with collStats:")
+        if before is not None and before['count']:
+            self._print_stats("Before this load", before)
+        self._print_stats("After this load", after)
+        if before is not None and before['count']:
+            change = ", ".join(f"{name} {(after[key] - before[key]) / 1024**2:+.2f} MB" for name, key in
+                               (('data', 'size'), ('storage', 'storageSize'), ('indexes', 'totalIndexSize')))
+            scope = "same row count" if before['count'] == after['count'] else \
+                "different row counts, not a like-for-like comparison"
+            print(f"- Change: {change} ({scope})")
+        return savings
+
+
+class ReferenceResolver:
+    """Cached id -> name lookups for reading encoded documents."""
+
+    def __init__(self, db, collection_name, fields=None):
+        """
+        Initialize the resolver.
+
+        Args:
+            db: pymongo Database
+            collection_name: Patient collection name
+            fields: Reference fields to resolve (defaults to all)
+        """
+        self.db = db
+        self.collection_name = collection_name
+        self.fields = list(fields or REFERENCE_FIELDS)
+        self._names = {}
+        self._ids = {}
+
+    def _load(self, field):
+        """Load (or reload) a reference collection into memory."""
+        collection = self.db[reference_collection_name(self.collection_name, field)]
+        names = {doc['_id']: doc['name'] for doc in collection.find()}
+        self._names[field] = names
+        self._ids[field] = {name: ref_id for ref_id, name in names.items()}
+
+    def name(self, field, ref_id):
+        """
+        Return the name for a reference id, reloading the table on a miss.
+
+        Args:
+            field: Reference field
+            ref_id: Encoded id
+        """
+        if field not in self._names or ref_id not in self._names[field]:
+            self._load(field)
+        return self._names[field].get(ref_id)
+
+    def id(self, field, name):
+        """
+        Return the id of a reference name, reloading the table on a miss.
+
+        Args:
+            field: Reference field
+            name: Reference value
+        """
+        if field not in self._ids or name not in self._ids[field]:
+            self._load(field)
+        return self._ids[field].get(name)
+
+    def decode(self, document):
+        """
+        Replace reference ids in a document with their names (in place).
+
+        Args:
+            document: Encoded MongoDB document
+
+        Returns:
+            dict: The document
+        """
+        for field in self.fields:
+            section, key, _ = REFERENCE_FIELDS[field]
+            if section in document and isinstance(document[section].get(key), int):
+                document[section][key] = self.name(field, document[section][key])
+        return document
+
+    def invalidate(self):
+        """Drop the cached reference tables."""
+        self._names.clear()
+        self._ids.clear()
@@ -0,0 +1,193 @@
+"""
+Summary Rollups Module
+
+Precomputes dashboard rollups (counts, billing and length-of-stay
+statistics per medical condition, hospital, admission type, insurance
+provider and admission month) from the DataFrame the pipeline already
+holds, and merges them into small summary collections.
+
+Rollup documents are additive and keyed by (source, key): a full run owns
+the slice of its raw file (or '__all__' when unnamed) and clears every
+other slice, while watch-mode runs refresh only the slice of the file they
+ingested. read() combines the slices at query time.
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from datetime import datetime, timezone
+import math
+
+import pandas as pd
+from pymongo import ReplaceOne
+
+from csv_containerisation_mongodb.migration.migration import Connect
+
+
+ROLLUP_DIMENSIONS = {
+    'condition': 'Medical Condition',
+    'hospital': 'Hospital',
+    'admission_type': 'Admission Type',
+    'insurance_provider': 'Insurance Provider',
+    'month': 'Admission Month',
+}
+
+FULL_SOURCE = '__all__'
+
+
+def _clean_number(value):
+    """Convert numpy scalars to BSON-friendly Python numbers (NaN -> None)."""
+    if value is None or (isinstance(value, float) and math.isnan(value)) or pd.isna(value):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+
+class RollupBuilder:
+    """Computes and stores summary collections for dashboards."""
+
+    def __init__(self, conn: Connect, df, source_file=None, source_label=None):
+        """
+        Initialize the rollup builder.
+
+        Args:
+            conn: MongoDB connection object
+            df: Cleaned DataFrame that was migrated
+            source_file: Raw file the DataFrame came from (None for a full run)
+            source_label: Raw file of a full run, so a later watch-mode refresh of
+                that file replaces its slice instead of adding to it
+        """
+        self.db = conn.db
+        self.collection_name = conn.collection_name
+        self.df = df
+        self.full = source_file is None
+        self.source = source_file or source_label or FULL_SOURCE
+
+    def summary_collection(self, dimension):
+        """Return the summary collection for a dimension."""
+        return self.db[f"{self.collection_name}_summary_{dimension}"]
+
+    def _prepared_frame(self):
+        """Return the columns needed for rollups with derived month and length of stay."""
+        admission = pd.to_datetime(self.df['Admission Date'], errors='coerce')
+        discharge = pd.to_datetime(self.df['Discharge Date'], errors='coerce')
+
+        frame = self.df[[column for column in ROLLUP_DIMENSIONS.values() if column in self.df.columns]].copy()
+        frame['Admission Month'] = admission.dt.strftime('%Y-%m')
+        frame['Billing Amount'] = pd.to_numeric(self.df['Billing Amount'], errors='coerce')
+        frame['Length Of Stay'] = (discharge - admission).dt.days
+        return frame
+
+    def compute(self, dimension, frame=None):
+        """
+        Compute the rollup for one dimension.
+
+        Args:
+            dimension: Key of ROLLUP_DIMENSIONS
+            frame: Result of _prepared_frame() shared across dimensions
+                (prepared here when omitted)
+
+        Returns:
+            DataFrame: One row per dimension value with additive statistics
+        """
+        if frame is None:
+            frame = self._prepared_frame()
+        column = ROLLUP_DIMENSIONS[dimension]
+
+        return frame.groupby(column, observed=True, dropna=True).agg(
+            count=('Billing Amount', 'size'),
+            billing_sum=('Billing Amount', 'sum'),
+            los_sum=('Length Of Stay', 'sum'),
+            los_count=('Length Of Stay', 'count'),
+            los_min=('Length Of Stay', 'min'),
+            los_max=('Length Of Stay', 'max'),
+        )
+
+    def _merge(self, dimension, rollup):
+        """
+        Upsert rollup rows and remove keys no longer present for this source.
+
+        Returns:
+            int: Number of rollup documents written
+        """
+        collection = self.summary_collection(dimension)
+        refreshed_at = datetime.now(timezone.utc)
+
+        operations = []
+        keys = []
+        for key, row in rollup.to_dict('index').items():
+            key = _clean_number(key)
+            keys.append(key)
+            document = {
+                'dimension': dimension,
+                'key': key,
+                'source_file': self.source,
+                'refreshed_at': refreshed_at,
+                **{field: _clean_number(value) for field, value in row.items()}
+            }
+            operations.append(ReplaceOne({'_id': {'source': self.source, 'key': key}}, document, upsert=True))
+
+        if operations:
+            collection.bulk_write(operations, ordered=False)
+
+        stale = {'source_file': self.source, 'key': {'$nin': keys}}
+        if self.full:
+            stale = {'$or': [stale, {'source_file': {'$ne': self.source}}]}
+        collection.delete_many(stale)
+        collection.create_index('key')
+
+        return len(operations)
+
+    def build(self, dimensions=None):
+        """
+        Compute and merge rollups for the given dimensions.
+
+        Args:
+            dimensions: Dimensions to build (defaults to all)
+
+        Returns:
+            dict: Dimension -> number of rollup documents
+        """
+        print("\n[BUILDING ROLLUPS]")
+        written = {}
+        # Date parsing and derived columns are shared by every dimension
+        frame = self._prepared_frame()
+        for dimension in dimensions or ROLLUP_DIMENSIONS:
+            written[dimension] = self._merge(dimension, self.compute(dimension, frame))
+            print(f"- {self.summary_collection(dimension).name}: {written[dimension]} rows")
+        print("[ROLLUPS BUILT]\n")
+        return written
+
+    def read(self, dimension):
+        """
+        Read a rollup, combining the slices of all sources.
+
+        Args:
+            dimension: Key of ROLLUP_DIMENSIONS
+
+        Returns:
+            list: One document per key with count, billing and length-of-stay statistics
+        """
+        pipeline = [
+            {'$group': {
+                '_id': '$key',
+                'count': {'$sum': '$count'},
+                'billing_sum': {'$sum': '$billing_sum'},
+                'los_sum': {'$sum': '$los_sum'},
+                'los_count': {'$sum': '$los_count'},
+                'los_min': {'$min': '$los_min'},
+                'los_max': {'$max': '$los_max'},
+            }},
+            {'$project': {
+                '_id': 0,
+                'key': '$_id',
+                'count': 1,
+                'billing_sum': {'$round': ['$billing_sum', 2]},
+                'billing_avg': {'$round': [{'$divide': ['$billing_sum', '$count']}, 2]},
+                'los_avg': {'$cond': [
+                    {'$gt': ['$los_count', 0]}, {'$divide': ['$los_sum', '$los_count']}, None
+                ]},
+                'los_min': 1,
+                'los_max': 1,
+            }},
+            {'$sort': {'key': 1}},
+        ]
+        return list(self.summary_collection(dimension).aggregate(pipeline))
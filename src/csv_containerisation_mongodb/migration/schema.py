@@ -0,0 +1,303 @@
+"""
+Healthcare Document Schema Module
+
+Single declarative definition of the CSV-to-document mapping (source
+column, target path, type, rounding), compiled into:
+
+- a specialised document builder: Python source generated once per schema
+  with one positional variable per column and the converters inlined, so
+  building a document does no per-field dispatch or lookups;
+- a MongoDB $jsonSchema validator applied to the collection, so type
+  enforcement happens server-side at insert time;
+- a vectorised DataFrame validator that rejects bad rows in bulk before
+  any document is built.
+
+The migration, the integrity checks and the export all read the same
+schema, so adding a field is a one-line change.
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+
+# Schema type -> accepted BSON types
+BSON_TYPES = {
+    'string': ['string'],
+    'int': ['int', 'long'],
+    'double': ['double'],
+    'date': ['date'],
+}
+
+INT64_LIMIT = 2**63
+
+
+def _as_datetime(value):
+    """
+    Convert a CSV date value to a BSON-compatible datetime.
+
+    Args:
+        value: Date string, Timestamp or datetime
+
+    Returns:
+        datetime: Naive datetime, or None for missing values
+    """
+    if value is None or pd.isna(value):
+        return None
+    return pd.Timestamp(value).to_pydatetime()
+
+
+def _is_missing(value):
+    """Return True for None and NaN."""
+    return value is None or value != value
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """One CSV column and where/how it is stored in the document."""
+    column: str
+    section: str
+    key: str
+    kind: str
+    nullable: bool = False
+    # Decimal places kept for 'double' fields (None keeps full precision)
+    digits: int = None
+
+    @property
+    def path(self) -> str:
+        """Dotted document path of the field."""
+        return f"{self.section}.{self.key}"
+
+
+class DocumentSchema:
+    """Field layout of healthcare documents and its compiled validators."""
+
+    def __init__(self, fields):
+        """
+        Initialize the schema.
+
+        Args:
+            fields: List of FieldSpec in document order
+        """
+        self.fields = list(fields)
+
+    @property
+    def columns(self):
+        """CSV columns covered by the schema."""
+        return [field.column for field in self.fields]
+
+    @property
+    def sections(self):
+        """Document sections in order."""
+        return list(dict.fromkeys(field.section for field in self.fields))
+
+    @property
+    def column_paths(self):
+        """Dotted document path -> CSV column."""
+        return {field.path: field.column for field in self.fields}
+
+    @staticmethod
+    def _converter(field, variable):
+        """Return the Python expression converting one column value."""
+        if field.kind == 'int':
+            expression = f"int({variable})"
+        elif field.kind == 'double':
+            expression = f"float({variable})" if field.digits is None else f"float(round({variable}, {field.digits}))"
+        elif field.kind == 'date':
+            return f"_as_datetime({variable})"
+        else:
+            expression = variable
+
+        if field.nullable:
+            expression = f"(None if _is_missing({variable}) else {expression})"
+        return expression
+
+    def builder_source(self):
+        """
+        Generate the source of the document builder.
+
+        Returns:
+            str: Source of build(values), where values holds one value per
+                schema column in schema order
+        """
+        variables = [f"v{position}" for position in range(len(self.fields))]
+        lines = ["def build(values):"]
+        if variables:
+            lines.append(f"    {', '.join(variables)}, = values")
+        lines.append("    return {")
+        for section in self.sections:
+            lines.append(f"        {section!r}: {{")
+            for field, variable in zip(self.fields, variables):
+                if field.section == section:
+                    lines.append(f"            {field.key!r}: {self._converter(field, variable)},")
+            lines.append("        },")
+        lines.append("    }")
+        return "\n".join(lines) + "\n"
+
+    @cached_property
+    def builder(self):
+        """
+        Document builder compiled from the schema on first use.
+
+        Returns:
+            callable: build(values) -> nested document
+        """
+        namespace = {'_as_datetime': _as_datetime, '_is_missing': _is_missing}
+        exec(compile(self.builder_source(), f"<document builder: {', '.join(self.sections)}>", 'exec'), namespace)
+        return namespace['build']
+
+    def json_schema(self, encoded_paths=()):
+        """
+        Compile the schema into a $jsonSchema document.
+
+        Args:
+            encoded_paths: Dotted paths stored as reference ids (ints) instead of strings
+
+        Returns:
+            dict: $jsonSchema specification
+        """
+        properties = {}
+        for section in self.sections:
+            section_fields = [field for field in self.fields if field.section == section]
+            section_properties = {}
+            for field in section_fields:
+                bson_types = list(BSON_TYPES[field.kind])
+                if field.path in encoded_paths:
+                    bson_types = ['int', 'long']
+                if field.nullable:
+                    bson_types.append('null')
+                section_properties[field.key] = {'bsonType': bson_types}
+
+            properties[section] = {
+                'bsonType': 'object',
+                'required': [field.key for field in section_fields],
+                'properties': section_properties
+            }
+
+        return {
+            'bsonType': 'object',
+            'required': self.sections,
+            'properties': properties
+        }
+
+    def apply_validator(self, db, collection_name, encoded_paths=()):
+        """
+        Install the $jsonSchema validator on a collection, creating it if needed.
+
+        Args:
+            db: pymongo Database
+            collection_name: Collection to validate
+            encoded_paths: Dotted paths stored as reference ids
+        """
+        validator = {'$jsonSchema': self.json_schema(encoded_paths)}
+        if collection_name in db.list_collection_names():
+            db.command({
+                'collMod': collection_name,
+                'validator': validator,
+                'validationLevel': 'strict',
+                'validationAction': 'error'
+            })
+        else:
+            db.create_collection(
+                collection_name,
+                validator=validator,
+                validationLevel='strict',
+                validationAction='error'
+            )
+
+    def conform(self, df):
+        """
+        Add the nullable schema columns absent from a DataFrame as missing values.
+
+        Frames written before a nullable field was added (older cleaned CSVs,
+        stage cache entries) can then still be validated and migrated.
+
+        Args:
+            df: Cleaned DataFrame
+
+        Returns:
+            DataFrame: df, with any absent nullable column filled with None
+
+        Raises:
+            ValueError: If required schema columns are missing from the DataFrame
+        """
+        absent = [field for field in self.fields if field.column not in df.columns]
+        missing = [field.column for field in absent if not field.nullable]
+        if missing:
+            raise ValueError(f"DataFrame is missing schema columns: {missing}")
+        if not absent:
+            return df
+        return df.assign(**{field.column: None for field in absent})
+
+    def validate_frame(self, df):
+        """
+        Check whole columns against the schema before documents are built.
+
+        Args:
+            df: Cleaned DataFrame
+
+        Returns:
+            tuple: (valid DataFrame, rejected DataFrame with a 'rejection_reason' column)
+
+        Raises:
+            ValueError: If required schema columns are missing from the DataFrame
+        """
+        df = self.conform(df)
+
+        failures = pd.DataFrame(False, index=df.index, columns=self.columns)
+        for field in self.fields:
+            values = df[field.column]
+            present = values.notna()
+
+            if field.kind == 'string':
+                bad = ~present
+                if field.nullable:
+                    bad &= present
+            elif field.kind == 'date':
+                parsed = pd.to_datetime(values, errors='coerce')
+                bad = present & parsed.isna()
+                if not field.nullable:
+                    bad |= ~present
+            else:
+                numbers = pd.to_numeric(values, errors='coerce')
+                bad = numbers.isna() | ~np.isfinite(numbers.fillna(0))
+                if field.kind == 'int':
+                    bad |= (numbers != np.floor(numbers)) | (numbers.abs() >= INT64_LIMIT)
+                if field.nullable:
+                    bad &= present
+
+            failures[field.column] = bad
+
+        rejected_mask = failures.any(axis=1)
+        rejected = df[rejected_mask].copy()
+        if not rejected.empty:
+            rejected['rejection_reason'] = failures[rejected_mask].apply(
+                lambda row: 'invalid ' + ', '.join(row.index[row]), axis=1
+            )
+
+        return df[~rejected_mask], rejected
+
+
+HEALTHCARE_SCHEMA = DocumentSchema([
+    FieldSpec('Name', 'patient_info', 'name', 'string'),
+    # Added by patient linkage; frames cleaned before it have no such column
+    FieldSpec('Patient Id', 'patient_info', 'patient_id', 'string', nullable=True),
+    FieldSpec('Age', 'patient_info', 'age', 'int'),
+    FieldSpec('Gender', 'patient_info', 'gender', 'string'),
+    FieldSpec('Blood Type', 'patient_info', 'blood_type', 'string'),
+    FieldSpec('Medical Condition', 'medical_details', 'medical_condition', 'string'),
+    FieldSpec('Medication', 'medical_details', 'medication', 'string'),
+    FieldSpec('Test Results', 'medical_details', 'test_results', 'string'),
+    FieldSpec('Admission Date', 'admission_details', 'admission_date', 'date', nullable=True),
+    FieldSpec('Admission Type', 'admission_details', 'admission_type', 'string'),
+    FieldSpec('Room Number', 'admission_details', 'room_number', 'int'),
+    FieldSpec('Discharge Date', 'admission_details', 'discharge_date', 'date', nullable=True),
+    FieldSpec('Hospital', 'hospital_info', 'hospital', 'string'),
+    FieldSpec('Doctor', 'hospital_info', 'doctor', 'string'),
+    FieldSpec('Insurance Provider', 'billing', 'insurance_provider', 'string'),
+    FieldSpec('Billing Amount', 'billing', 'billing_amount', 'double', digits=2),
+])
@@ -0,0 +1,192 @@
+"""
+Sharding Module
+
+Prepares healthcare_data on a sharded cluster before a load: shards the
+collection on the configured key, pre-splits and distributes chunks from the
+key distribution of the data about to be inserted, and groups documents per
+target shard so each batch is routed to a single shard. Hashed keys are not
+routed: mongos spreads every batch over the shards, and the load is split
+evenly over one writer per shard instead.
+
+Shard key specifications:
+    hashed:patient_info.name
+    hospital_info.hospital,admission_details.admission_date
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from bisect import bisect_right
+
+from bson.min_key import MinKey
+
+
+HASHED_PREFIX = 'hashed:'
+
+
+def parse_shard_key(spec):
+    """
+    Parse a shard key specification.
+
+    Args:
+        spec: 'hashed:<path>' or comma-separated dotted paths (ranged)
+
+    Returns:
+        dict: Shard key document, e.g. {'patient_info.name': 'hashed'}
+    """
+    spec = spec.strip()
+    if spec.startswith(HASHED_PREFIX):
+        return {spec[len(HASHED_PREFIX):].strip(): 'hashed'}
+
+    paths = [path.strip() for path in spec.split(',') if path.strip()]
+    if not paths:
+        raise ValueError(f"Invalid shard key specification: '{spec}'")
+    return {path: 1 for path in paths}
+
+
+def _get_path(document, path):
+    """Return the value at a dotted path of a document (None when missing)."""
+    value = document
+    for key in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _sort_key(values):
+    """Order key tuples the way MongoDB does for nulls (before any value)."""
+    return tuple((value is not None, value) for value in values)
+
+
+class ShardingPlanner:
+    """Shards the target collection and routes documents per shard."""
+
+    def __init__(self, db, collection_name, shard_key, chunks_per_shard=4):
+        """
+        Initialize the planner.
+
+        Args:
+            db: pymongo Database (connected through mongos)
+            collection_name: Collection to shard
+            shard_key: Shard key specification (see parse_shard_key)
+            chunks_per_shard: Chunks created per shard when pre-splitting a ranged key
+        """
+        self.db = db
+        self.admin = db.client.admin
+        self.collection_name = collection_name
+        self.namespace = f"{db.name}.{collection_name}"
+        self.key = parse_shard_key(shard_key)
+        self.chunks_per_shard = chunks_per_shard
+        self.split_points = []
+        self.chunk_shards = []
+        self.writers = 1
+
+    @property
+    def hashed(self):
+        return 'hashed' in self.key.values()
+
+    def is_sharded_cluster(self):
+        """Check that the connection goes through a mongos router."""
+        return self.admin.command('hello').get('msg') == 'isdbgrid'
+
+    def shards(self):
+        """Return the ids of the cluster's shards."""
+        return [shard['_id'] for shard in self.admin.command('listShards')['shards']]
+
+    def _chunk_count(self):
+        """Return the number of chunks of the collection (0 if not sharded)."""
+        config = self.db.client.config
+        collection = config.collections.find_one({'_id': self.namespace})
+        if collection is None:
+            return 0
+        return config.chunks.count_documents({'uuid': collection['uuid']})
+
+    def _key_values(self, document):
+        return tuple(_get_path(document, path) for path in self.key)
+
+    def prepare(self, documents):
+        """
+        Shard the collection and pre-split it for the documents about to be loaded.
+
+        Hashed keys rely on the server pre-splitting an empty collection
+        across all shards. Ranged keys are split at quantiles of the incoming
+        key values and the chunks are moved so each shard owns a contiguous
+        range.
+
+        Args:
+            documents: Documents about to be inserted
+
+        Raises:
+            RuntimeError: If the connection is not to a sharded cluster
+        """
+        if not self.is_sharded_cluster():
+            raise RuntimeError("Sharded mode requires a connection through mongos")
+
+        shards = self.shards()
+        self.writers = len(shards)
+        fresh = self._chunk_count() == 0
+        if fresh:
+            self.admin.command('enableSharding', self.db.name)
+            self.admin.command('shardCollection', self.namespace, key=self.key)
+            print(f"Sharded '{self.namespace}' on {self.key} across {len(shards)} shards")
+
+        if self.hashed:
+            return
+
+        if not fresh and self._chunk_count() > 1:
+            print(f"'{self.namespace}' already has {self._chunk_count()} chunks - pre-split skipped")
+            return
+
+        chunk_count = len(shards) * self.chunks_per_shard
+        keys = sorted((self._key_values(document) for document in documents), key=_sort_key)
+        points = []
+        for i in range(1, chunk_count):
+            point = keys[i * len(keys) // chunk_count] if keys else None
+            if point is None or None in point or (points and _sort_key(point) <= _sort_key(points[-1])):
+                continue
+            points.append(point)
+
+        for point in points:
+            self.admin.command('split', self.namespace, middle=dict(zip(self.key, point)))
+
+        # Chunk i covers [points[i-1], points[i]); give each shard a contiguous run.
+        # All chunks start on the database's primary shard.
+        primary = self.db.client.config.databases.find_one({'_id': self.db.name})['primary']
+        chunk_shards = [shards[i * len(shards) // (len(points) + 1)] for i in range(len(points) + 1)]
+        for i, shard in enumerate(chunk_shards):
+            if shard == primary:
+                continue
+            find = {path: MinKey() for path in self.key} if i == 0 else dict(zip(self.key, points[i - 1]))
+            self.admin.command('moveChunk', self.namespace, find=find, to=shard)
+
+        self.split_points = [_sort_key(point) for point in points]
+        self.chunk_shards = chunk_shards
+        print(f"Pre-split '{self.namespace}' into {len(chunk_shards)} chunks over {len(shards)} shards")
+
+    def route(self, documents):
+        """
+        Group documents by the shard owning their chunk.
+
+        Without a chunk map (hashed keys, or a collection pre-split by an
+        earlier load) documents cannot be routed: they are split evenly over
+        one writer per shard and mongos distributes each batch.
+
+        Args:
+            documents: Documents to insert
+
+        Returns:
+            dict: shard id (or writer name when not routed) -> documents
+        """
+        if not self.chunk_shards:
+            documents = list(documents)
+            writers = max(1, min(self.writers, len(documents)))
+            reason = 'hashed shard key' if self.hashed else 'chunk map of an earlier load unknown'
+            print(f"Shard routing skipped ({reason}): {len(documents):,} documents split evenly "
+                  f"over {writers} parallel writer(s), mongos routes each batch")
+            return {f"writer {number + 1}": documents[number::writers] for number in range(writers)}
+
+        groups = {}
+        for document in documents:
+            chunk = bisect_right(self.split_points, _sort_key(self._key_values(document)))
+            groups.setdefault(self.chunk_shards[chunk], []).append(document)
+        return groups
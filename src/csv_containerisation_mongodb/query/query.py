@@ -0,0 +1,311 @@
+"""
+Healthcare Query Module
+
+Read-side access layer over medical_records.healthcare_data. Lookups match
+the indexes created by LoadDb.create_indexes, results are kept in a bounded
+TTL/LRU cache that is cleared whenever a new migration run is recorded, and
+per-query latency statistics are collected.
+
+Usage:
+    conn = Connect('medical_records', 'healthcare_data')
+    queries = HealthcareQueries(conn)
+    queries.by_patient_name('Bobby Jackson')
+    queries.print_stats()
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from collections import OrderedDict, deque
+from datetime import datetime
+import copy
+import json
+import time
+
+from csv_containerisation_mongodb.migration.migration import Connect, RUNS_COLLECTION
+from csv_containerisation_mongodb.migration.clustering import ClusteredLayout
+
+
+class ResultCache:
+    """Bounded LRU cache whose entries expire after a time-to-live."""
+
+    def __init__(self, max_entries=256, ttl=300.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached results
+            ttl: Seconds before an entry expires (None never expires)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """
+        Return a cached value, or None on a miss or expired entry.
+
+        Args:
+            key: Cache key
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        stored_at, value = entry
+        if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """
+        Store a value, evicting the least recently used entry when full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries."""
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class QueryStats:
+    """Latency and cache statistics for one query type."""
+
+    def __init__(self, window=1000):
+        self.calls = 0
+        self.hits = 0
+        self.latencies_ms = deque(maxlen=window)
+
+    def record(self, latency_ms, hit):
+        """Record one call."""
+        self.calls += 1
+        self.hits += int(hit)
+        self.latencies_ms.append(latency_ms)
+
+    def summary(self):
+        """
+        Summarize the recorded calls.
+
+        Returns:
+            dict: calls, hit rate and latency percentiles in milliseconds
+        """
+        latencies = sorted(self.latencies_ms)
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))]
+
+        return {
+            'calls': self.calls,
+            'hit_rate': self.hits / self.calls if self.calls else 0.0,
+            'mean_ms': sum(latencies) / len(latencies) if latencies else 0.0,
+            'p50_ms': percentile(50),
+            'p95_ms': percentile(95),
+            'max_ms': latencies[-1] if latencies else 0.0
+        }
+
+
+class HealthcareQueries:
+    """Typed, cached lookups over the healthcare collection."""
+
+    def __init__(self, conn: Connect, cache_size=256, cache_ttl=300.0, refresh_interval=1.0, partitioner=None,
+                 resolver=None, clustering=None):
+        """
+        Initialize the query layer.
+
+        Args:
+            conn: Connected MongoDB connection object
+            cache_size: Maximum number of cached query results
+            cache_ttl: Seconds before a cached result expires
+            refresh_interval: Seconds between checks for a new migration run
+            partitioner: AdmissionPartitioner used when the data is time-partitioned
+            resolver: ReferenceResolver used when reference data is normalised
+            clustering: ClusteredLayout used when the collection is clustered on admission date
+                (detected from the collection options when None)
+        """
+        self.db = conn.db
+        self.collection = conn.collection
+        self.collection_name = conn.collection_name
+        self.cache = ResultCache(max_entries=cache_size, ttl=cache_ttl)
+        self.refresh_interval = refresh_interval
+        self.partitioner = partitioner
+        self.resolver = resolver
+        self.clustering = clustering
+        self._detected_clustering = None
+        self.stats = {}
+        self._run_id = None
+        self._checked_at = None
+
+    def _check_migration_run(self):
+        """Clear the cache if a migration run finished since the last check."""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.refresh_interval:
+            return
+        self._checked_at = now
+
+        run = self.db[RUNS_COLLECTION].find_one({"_id": self.collection_name}, {"run_id": 1})
+        run_id = run['run_id'] if run else None
+        if run_id != self._run_id:
+            self.cache.clear()
+            if self.resolver is not None:
+                self.resolver.invalidate()
+            # A full reload may have changed the collection layout
+            self._detected_clustering = None
+            self._run_id = run_id
+
+    def invalidate(self):
+        """Drop all cached results."""
+        self.cache.clear()
+
+    def _cached(self, name, params, fetch):
+        """
+        Serve a query from the cache or run it and cache the result.
+
+        Args:
+            name: Query name (used for statistics)
+            params: JSON-serialisable query parameters
+            fetch: Callable running the query
+
+        Returns:
+            list: Query result (a copy, so callers cannot alter cached documents)
+        """
+        start = time.perf_counter()
+        self._check_migration_run()
+
+        key = (name, json.dumps(params, sort_keys=True, default=str))
+        result = self.cache.get(key)
+        hit = result is not None
+        if not hit:
+            result = fetch()
+            if self.resolver is not None:
+                result = [self.resolver.decode(doc) for doc in result]
+            self.cache.put(key, result)
+        result = copy.deepcopy(result)
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.stats.setdefault(name, QueryStats()).record(latency_ms, hit)
+        return result
+
+    def _clustered_layout(self):
+        """Return the ClusteredLayout of the collection, or None if it is not clustered."""
+        if self.clustering is not None:
+            return self.clustering
+        if self._detected_clustering is None:
+            clustered = 'clusteredIndex' in self.collection.options()
+            self._detected_clustering = ClusteredLayout() if clustered else False
+        return self._detected_clustering or None
+
+    def _encoded(self, field, name):
+        """Translate a reference name to its id when reference data is normalised."""
+        if self.resolver is None:
+            return name
+        return self.resolver.id(field, name)
+
+    def by_patient_name(self, name: str, limit: int = 0) -> list[dict]:
+        """
+        Find admissions for a patient (index: patient_info.name).
+
+        Args:
+            name: Patient name as stored after standardisation
+            limit: Maximum number of documents (0 for all)
+        """
+        return self._cached(
+            'by_patient_name', {'name': name, 'limit': limit},
+            lambda: list(self.collection.find({"patient_info.name": name}).limit(limit))
+        )
+
+    def by_patient_id(self, patient_id: str, limit: int = 0) -> list[dict]:
+        """
+        Find admissions linked to one patient (index: patient_info.patient_id).
+
+        Args:
+            patient_id: Patient cluster id assigned by record linkage
+            limit: Maximum number of documents (0 for all)
+        """
+        return self._cached(
+            'by_patient_id', {'patient_id': patient_id, 'limit': limit},
+            lambda: list(self.collection.find({"patient_info.patient_id": patient_id}).limit(limit))
+        )
+
+    def by_admission_date_range(self, start: datetime, end: datetime, limit: int = 0) -> list[dict]:
+        """
+        Find admissions in [start, end) (index: admission_details.admission_date,
+        or the clustered _id range when the collection is clustered).
+
+        Args:
+            start: Range start (inclusive)
+            end: Range end (exclusive)
+            limit: Maximum number of documents (0 for all)
+        """
+        def fetch():
+            if self.partitioner is not None:
+                documents = self.partitioner.find_range(self.db, start, end)
+                return [doc for _, doc in zip(range(limit), documents)] if limit else list(documents)
+            query = {"admission_details.admission_date": {"$gte": start, "$lt": end}}
+            clustering = self._clustered_layout()
+            if clustering is not None:
+                # _id order is admission date order: one contiguous clustered scan
+                query.update(clustering.id_range(start, end))
+                return list(self.collection.find(query).sort("_id", 1).limit(limit))
+            return list(self.collection.find(query).sort("admission_details.admission_date", 1).limit(limit))
+
+        return self._cached('by_admission_date_range', {'start': start, 'end': end, 'limit': limit}, fetch)
+
+    def by_condition_and_hospital(self, condition: str, hospital: str = None, limit: int = 0) -> list[dict]:
+        """
+        Find admissions by medical condition, optionally at one hospital
+        (index: medical_condition + hospital).
+
+        Args:
+            condition: Medical condition
+            hospital: Hospital name (None for all hospitals)
+            limit: Maximum number of documents (0 for all)
+        """
+        query = {"medical_details.medical_condition": self._encoded('medical_condition', condition)}
+        if hospital is not None:
+            query["hospital_info.hospital"] = self._encoded('hospital', hospital)
+
+        return self._cached(
+            'by_condition_and_hospital', {'condition': condition, 'hospital': hospital, 'limit': limit},
+            lambda: list(self.collection.find(query).limit(limit))
+        )
+
+    def aggregate(self, name: str, pipeline: list) -> list[dict]:
+        """
+        Run an aggregation pipeline through the result cache.
+
+        Args:
+            name: Query name used for statistics
+            pipeline: Aggregation pipeline
+        """
+        return self._cached(name, {'pipeline': pipeline}, lambda: list(self.collection.aggregate(pipeline)))
+
+    def get_stats(self) -> dict:
+        """Return the latency summary of every query type."""
+        return {name: stats.summary() for name, stats in self.stats.items()}
+
+    def print_stats(self) -> None:
+        """Print per-query latency statistics."""
+        print("=" * 90)
+        print("QUERY STATISTICS")
+        print("=" * 90)
+        print(f"{'Query':<28} {'Calls':>7} {'Hit %':>7} {'Mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'Max ms':>9}")
+        print("-" * 90)
+        for name, summary in self.get_stats().items():
+            print(f"{name:<28} {summary['calls']:>7} {summary['hit_rate'] * 100:>6.1f}% "
+                  f"{summary['mean_ms']:>9.2f} {summary['p50_ms']:>9.2f} "
+                  f"{summary['p95_ms']:>9.2f} {summary['max_ms']:>9.2f}")
+        print("=" * 90)
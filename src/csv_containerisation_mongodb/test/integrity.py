@@ -0,0 +1,294 @@
+"""
+Data Integrity Checker for Healthcare MongoDB Migration
+
+Validates data integrity after CSV-to-MongoDB migration. Used by the
+pipeline's verification stage and by the pytest suite in test.py; pytest
+itself is not imported here so production runs don't load it.
+
+Author: hhdonglo- OpenClassrooms (DataSoluTech)
+"""
+
+import os
+import sys
+
+import pandas as pd
+from pymongo import MongoClient
+
+from csv_containerisation_mongodb.migration.schema import HEALTHCARE_SCHEMA
+from csv_containerisation_mongodb.migration.checksums import frame_digests, collection_digests, compare_digests
+
+# Fields added by the migration that have no CSV column counterpart
+DERIVED_FIELDS = {'admission_bucket'}
+
+
+class DataIntegrityChecker:
+    """
+    Validates data integrity after migration to MongoDB.
+    
+    Performs comprehensive checks: document count, field structure,
+    data types, missing values, duplicates, and content checksums.
+    """
+        
+    def __init__(self, db_name, collection_name, df, uri=None, schema=HEALTHCARE_SCHEMA, encoded_paths=()):
+        """
+        Initialize checker with MongoDB connection parameters.
+        
+        Args:
+            db_name: Database name
+            collection_name: Collection name
+            df: DataFrame to compare against
+            uri: MongoDB URI (defaults to localhost)
+            schema: DocumentSchema the documents must follow
+            encoded_paths: Dotted paths stored as reference ids
+        """
+        self.uri = uri or os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
+        self.db_name = db_name
+        self.collection_name = collection_name
+        self.df = df
+        self.schema = schema
+        self.encoded_paths = encoded_paths
+        self._connect()
+
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+    
+    def _connect(self):
+        """Establish MongoDB connection."""
+        try:
+            client = MongoClient(self.uri, serverSelectionTimeoutMS=5000)
+            client.admin.command('ping')
+            self.db = client[self.db_name]
+            self.collection = self.db[self.collection_name]
+            print(f"[INFO] Connected to {self.db_name}.{self.collection_name}")
+        except Exception as e:
+            if 'pytest' in sys.modules:
+                sys.modules['pytest'].skip(f"MongoDB not available: {e}")
+            raise
+
+    def test_document_count(self):
+        """Verify document count matches DataFrame row count."""
+        total_docs = self.collection.count_documents({})
+        expected_docs = len(self.df)
+        
+        assert total_docs == expected_docs, \
+            f"Document count mismatch: Expected {expected_docs}, Found {total_docs}"
+        
+        print(f"[PASS] Document count: {total_docs} matches expected: {expected_docs}")
+
+    def test_field_structure(self):
+        """Verify all CSV columns exist in MongoDB documents."""
+        print("=" * 70)
+        print("FIELD STRUCTURE VALIDATION")
+        print("=" * 70)
+        
+        doc = self.collection.find_one()
+        assert doc is not None, "No documents found in collection"
+        
+        # Document paths map back to CSV columns through the mapping schema
+        column_paths = self.schema.column_paths
+        doc_structure = []
+        for keys, values in doc.items():
+            if keys in ['_id', 'metadata']:
+                continue
+            
+            assert isinstance(values, dict), f"Expected nested dict for {keys}"
+            
+            for sub_key, sub_value in values.items():
+                if sub_key in DERIVED_FIELDS:
+                    continue
+                path = f"{keys}.{sub_key}"
+                doc_structure.append(column_paths.get(path, path))
+
+        check_tab = pd.DataFrame({
+            "MongoDB Field": pd.Series(doc_structure),
+            "Expected (CSV)": pd.Series(self.df.columns.tolist())
+        })
+        
+        print(check_tab.to_string())
+        
+        assert set(self.df.columns) == set(doc_structure), \
+            f"Field mismatch: CSV has {set(self.df.columns) - set(doc_structure)}, " \
+            f"MongoDB has {set(doc_structure) - set(self.df.columns)}"
+        
+        print('-' * 70)
+        print("[PASS] Field structure validation passed")
+
+    def test_missing_values(self):
+        """Verify missing values match between CSV and MongoDB."""
+        print("=" * 70)
+        print("MISSING VALUES VALIDATION")
+        print("=" * 70)
+
+        fields_names = []
+        for doc in self.collection.find({}).limit(1):
+            for key, value in doc.items():
+                if key not in ['_id', 'metadata']:
+                    if isinstance(value, dict):
+                        for sub_key, sub_value in value.items():
+                            fields_names.append(f"{key}.{sub_key}")
+                    else:
+                        fields_names.append(key)
+        
+        total_docs = self.collection.count_documents({})
+        assert total_docs > 0, "No documents in collection"
+
+        missing_values = {}
+        for field in fields_names:
+            count_missing_docs = self.collection.count_documents({
+                "$or": [
+                    {field: None},
+                    {field: {"$exists": False}}
+                ]
+            })
+            missing_values[field] = count_missing_docs / total_docs * 100
+
+        df_missing_mongo = pd.DataFrame.from_dict(
+            missing_values, 
+            orient='index', 
+            columns=['MongoDB Missing (%)']
+        )
+
+        df_missing_csv = pd.DataFrame(
+            self.df.isna().mean() * 100,
+            columns=['CSV Missing (%)']
+        )
+
+        comparison = df_missing_mongo.join(df_missing_csv, how='outer').fillna(0)
+        comparison['Match'] = abs(comparison['MongoDB Missing (%)'] - comparison['CSV Missing (%)']) < 0.01
+
+        print(comparison.to_string())
+        print("\n" + "=" * 70)
+        print(f"Fields with matching missing values: {comparison['Match'].sum()}/{len(comparison)}")
+        
+        assert comparison['Match'].all(), \
+            f"Missing values mismatch:\n{comparison[~comparison['Match']]}"
+        
+        print("[PASS] Missing values validation passed")
+        print("=" * 70)
+
+    def test_data_types(self):
+        """
+        Verify field types of every document against the document schema.
+        
+        Mismatches are counted per field in a single server-side aggregation,
+        so type drift anywhere in the collection is detected.
+        """
+        schema = self.schema.json_schema(self.encoded_paths)
+        
+        group = {'_id': None, 'total': {'$sum': 1}}
+        expected = {}
+        for section, section_schema in schema['properties'].items():
+            for key, spec in section_schema['properties'].items():
+                path = f"{section}.{key}"
+                expected[path] = spec['bsonType']
+                group[path.replace('.', '__')] = {
+                    '$sum': {'$cond': [{'$in': [{'$type': f"${path}"}, spec['bsonType']]}, 0, 1]}
+                }
+        
+        result = next(self.collection.aggregate([{'$group': group}]), None)
+        assert result is not None, "No documents found"
+
+        print("=" * 90)
+        print("DATA TYPE VALIDATION")
+        print("=" * 90)
+        print(f"{'Field':<40} {'Expected Types':<30} {'Mismatches':>10}")
+        print("-" * 90)
+
+        all_match = True
+        for path, bson_types in expected.items():
+            mismatches = result[path.replace('.', '__')]
+            if mismatches:
+                all_match = False
+            print(f"{path:<40} {', '.join(bson_types):<30} {mismatches:>10}")
+
+        print("=" * 90)
+        
+        assert all_match, "Data type validation failed"
+        
+        print(f"[PASS] Data types validation passed ({result['total']:,} documents)")
+        print("=" * 90)
+
+    def test_checksums(self):
+        """
+        Verify stored values against the DataFrame with order-independent digests.
+        
+        Per-field counts, sums, min/max and string hashes are computed with
+        pandas and in one server-side aggregation, so the full content is
+        verified without reading the documents back.
+        """
+        import bson
+        
+        print("=" * 90)
+        print("CONTENT CHECKSUM VALIDATION")
+        print("=" * 90)
+        
+        skipped = set(self.encoded_paths)
+        expected = frame_digests(self.df, self.schema, skip_paths=skipped)
+        found, result = collection_digests(self.collection, self.schema, skip_paths=skipped)
+        assert result, "No documents found"
+        
+        comparison = compare_digests(expected, found)
+        fields = comparison.groupby('Field', sort=False)['Match'].agg(['size', 'sum'])
+        print(f"{'Field':<40} {'Statistics':>10} {'Matching':>10}")
+        print("-" * 90)
+        for path, row in fields.iterrows():
+            print(f"{path:<40} {row['size']:>10} {row['sum']:>10}")
+        if skipped:
+            print(f"Skipped reference-encoded fields: {', '.join(sorted(skipped))}")
+        print(f"Digest transferred: {len(bson.encode(result)) / 1024:.1f} KB")
+        print("=" * 90)
+        
+        mismatches = comparison[~comparison['Match']]
+        assert mismatches.empty, f"Content checksum mismatch:\n{mismatches.to_string(index=False)}"
+        
+        print(f"[PASS] Content checksums match ({len(comparison)} statistics over {len(fields)} fields)")
+        print("=" * 90)
+
+    def test_duplicates(self):
+        """Verify duplicate count matches between CSV and MongoDB."""
+        print("\n" + "=" * 70)
+        print("DUPLICATE VALIDATION")
+        print("=" * 70)
+        
+        csv_total = len(self.df)
+        csv_dup_count = self.df.duplicated().sum()
+        
+        pipeline = [
+            {
+                "$project": {
+                    "_id": 0,
+                    "metadata": 0
+                }
+            },
+            {
+                "$group": {
+                    "_id": "$$ROOT",
+                    "count": {"$sum": 1}
+                }
+            }
+        ]
+        
+        all_groups = list(self.collection.aggregate(pipeline))
+        mongo_unique = len(all_groups)
+        mongo_total = sum(g['count'] for g in all_groups)
+        mongo_dup_count = mongo_total - mongo_unique
+        
+        print(f"\nDuplicate Count Comparison:")
+        print(f"  CSV: {csv_dup_count}/{csv_total}")
+        print(f"  MongoDB: {mongo_dup_count}/{mongo_total}")
+        
+        assert csv_dup_count == mongo_dup_count, \
+            f"Duplicate count mismatch: CSV has {csv_dup_count}, MongoDB has {mongo_dup_count}"
+        
+        print(f"  [PASS] Status: MATCH")
+        
+        if mongo_dup_count > 0:
+            duplicates = [g for g in all_groups if g['count'] > 1]
+            print(f"\n  MongoDB has {len(duplicates)} sets of duplicates:")
+            for dup in duplicates[:3]:
+                print(f"    Count: {dup['count']}")
+        
+        print("=" * 70)
@@ -0,0 +1,41 @@
+"""
+Adaptive Batching Tests
+
+Usage:
+    pytest src/csv_containerisation_mongodb/test/test_batching.py -v
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from csv_containerisation_mongodb.migration.batching import AdaptiveBatchSizer
+
+
+def test_batches_of_other_writers_taken_before_a_move_do_not_steer():
+    """With several writers, a batch started at the previous size is recorded but ignored."""
+    sizer = AdaptiveBatchSizer(initial=1000, min_size=100)
+    first, second = sizer.next_size(), sizer.next_size()
+
+    sizer.record(first, 0.1, size=first)
+    moved = sizer.next_size()
+    sizer.record(second, 0.01, size=second)
+
+    assert moved == 2000 and sizer.next_size() == moved
+    assert [batch['size'] for batch in sizer.history] == [1000, 1000]
+
+
+def test_concurrent_writers_share_one_sizer():
+    """Writers recording concurrently leave a consistent history and a size within bounds."""
+    sizer = AdaptiveBatchSizer(initial=1000, min_size=100, max_size=20_000)
+
+    def writer(_):
+        for _ in range(50):
+            size = sizer.next_size()
+            sizer.record(size, size / 50_000, size=size)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(writer, range(4)))
+
+    assert len(sizer.history) == 200
+    assert 100 <= sizer.next_size() <= 20_000
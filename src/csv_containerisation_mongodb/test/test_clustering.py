@@ -0,0 +1,129 @@
+"""
+Clustered Collection Layout Tests
+
+Checks the date-ordered _id of ClusteredLayout and that the query layer
+uses it on clustered collections; MongoDB is not needed.
+
+Usage:
+    pytest src/csv_containerisation_mongodb/test/test_clustering.py -v
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from csv_containerisation_mongodb.migration.clustering import ClusteredLayout
+from csv_containerisation_mongodb.query.query import HealthcareQueries
+
+
+def document(name, admission_date):
+    """Built document holding the fields assign_id reads."""
+    return {
+        'patient_info': {'name': name},
+        'admission_details': {'admission_date': admission_date},
+    }
+
+
+def in_range(_id, id_filter):
+    """Evaluate an id_range() filter on one _id."""
+    bounds = id_filter['_id']
+    below_upper = _id < bounds['$lt'] if '$lt' in bounds else _id <= bounds['$lte']
+    return bounds['$gte'] <= _id and below_upper
+
+
+def test_assign_id_is_deterministic_and_date_led():
+    """Reloading a file reproduces the ids; identical rows and other files get distinct ids."""
+    admitted = datetime(2023, 7, 14, 9, 30)
+    rows = [document('ann lee', admitted), document('ann lee', admitted), document('bob kim', admitted)]
+
+    def load(source_file):
+        layout = ClusteredLayout()
+        return [layout.assign_id(dict(row), source_file)['_id'] for row in rows]
+
+    first, again = load('a.csv'), load('a.csv')
+    other_file = ClusteredLayout().assign_id(dict(rows[0]), 'b.csv')['_id']
+
+    assert first == again
+    assert len(set(first)) == 3 and other_file not in first
+    assert {_id.generation_time for _id in first} == {admitted.replace(tzinfo=timezone.utc)}
+    assert ClusteredLayout().assign_id(document('no date', None))['_id'].generation_time.year == 1970
+
+
+def test_sort_orders_documents_and_labels_by_admission_date():
+    """sort() keeps each DataFrame label with its document."""
+    layout = ClusteredLayout()
+    dates = [datetime(2023, 3, 1), datetime(2021, 1, 5), datetime(2022, 6, 30)]
+    documents = [layout.assign_id(document(f"patient {day.year}", day)) for day in dates]
+
+    ordered, labels = layout.sort(documents, ['2023', '2021', '2022'])
+
+    assert labels == ['2021', '2022', '2023']
+    assert [doc['admission_details']['admission_date'] for doc in ordered] == sorted(dates)
+
+
+def test_id_range_covers_start_inclusive_to_end_exclusive():
+    """The _id bounds keep every admission in [start, end) and exclude whole seconds outside it."""
+    layout = ClusteredLayout()
+    start, end = datetime(2023, 1, 1), datetime(2023, 2, 1)
+    id_filter = layout.id_range(start, end)
+
+    def admitted(day):
+        return layout.assign_id(document('patient', day))['_id']
+
+    assert in_range(admitted(start), id_filter)
+    assert in_range(admitted(end - timedelta(microseconds=1)), id_filter)
+    assert not in_range(admitted(start - timedelta(seconds=1)), id_filter)
+    assert not in_range(admitted(end), id_filter)
+
+    # A fractional end second is rounded up; the date condition trims the rest
+    assert in_range(admitted(end), layout.id_range(start, end + timedelta(milliseconds=500)))
+    assert in_range(admitted(datetime(2200, 1, 1)), layout.id_range(start, datetime(2200, 1, 1)))
+
+
+class RecordingCollection:
+    """Collection double recording find() filters and sorts."""
+
+    def __init__(self, options):
+        self._options = options
+        self.queries = []
+
+    def options(self):
+        return self._options
+
+    def find(self, query):
+        self.queries.append(query)
+        return self
+
+    def sort(self, key, direction):
+        self.queries.append(('sort', key))
+        return self
+
+    def limit(self, limit):
+        return []
+
+    def find_one(self, *args):
+        return None
+
+
+class RecordingConn:
+    """Connect double exposing one collection."""
+
+    def __init__(self, options):
+        self.collection = RecordingCollection(options)
+        self.collection_name = 'healthcare_data'
+        self.db = {'migration_runs': self.collection}
+
+
+def test_date_range_queries_detect_a_clustered_collection():
+    """Without an explicit layout, a clustered collection is queried by _id range."""
+    start, end = datetime(2023, 1, 1), datetime(2023, 2, 1)
+
+    clustered = RecordingConn({'clusteredIndex': {'key': {'_id': 1}, 'unique': True}})
+    HealthcareQueries(clustered).by_admission_date_range(start, end)
+    query, sort = clustered.collection.queries
+    assert query['_id'] == ClusteredLayout().id_range(start, end)['_id'] and sort == ('sort', '_id')
+
+    plain = RecordingConn({})
+    HealthcareQueries(plain).by_admission_date_range(start, end)
+    query, sort = plain.collection.queries
+    assert '_id' not in query and sort == ('sort', 'admission_details.admission_date')
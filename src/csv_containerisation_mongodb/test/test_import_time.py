@@ -0,0 +1,45 @@
+"""
+Import-Time Regression Tests
+
+Checks that the pipeline entry point does not eagerly import modules that
+are only needed by individual stages or by the test suite.
+
+Usage:
+    pytest src/csv_containerisation_mongodb/test/test_import_time.py -v
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+import pytest
+
+from csv_containerisation_mongodb.utils.import_profile import measure_import_time
+
+
+LAZY_MODULES = [
+    'IPython',
+    'pytest',
+    'tabulate',
+    'pymongo',
+    'csv_containerisation_mongodb.data.cleaning',
+    'csv_containerisation_mongodb.migration.migration',
+    'csv_containerisation_mongodb.test.integrity',
+]
+
+
+@pytest.fixture(scope="module")
+def entry_point_profile():
+    """Import profile of the production entry point."""
+    return measure_import_time()
+
+
+@pytest.mark.parametrize("module", LAZY_MODULES)
+def test_entry_point_does_not_import(entry_point_profile, module):
+    """Heavy and stage-only modules must be imported lazily."""
+    assert module not in entry_point_profile['modules'], \
+        f"{module} is imported at startup"
+
+
+def test_entry_point_import_budget(entry_point_profile):
+    """Startup import time stays within a generous budget."""
+    assert entry_point_profile['total_ms'] < 5000, \
+        f"Entry point import took {entry_point_profile['total_ms']:.0f} ms"
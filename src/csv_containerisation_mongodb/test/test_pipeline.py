@@ -0,0 +1,169 @@
+"""
+Pipeline Stage Tests
+
+Runs the file-based pipeline stages (loading, cleaning, reloading the
+cleaned data) on a small generated dataset; MongoDB is not needed except
+for the batch/watch test, which is skipped when MongoDB is not available.
+
+Usage:
+    pytest src/csv_containerisation_mongodb/test/test_pipeline.py -v
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+import os
+import re
+import uuid
+
+import pandas as pd
+from pymongo import MongoClient
+import pytest
+
+from csv_containerisation_mongodb.main.pipeline import HealthcarePipeline, PipelineConfig
+from csv_containerisation_mongodb.utils.metrics import METRICS
+
+
+def healthcare_rows(count, first=0):
+    """Generate distinct raw healthcare rows."""
+    return pd.DataFrame({
+        'Name': [f"patient {number}" for number in range(first, first + count)],
+        'Age': [20 + number % 60 for number in range(count)],
+        'Gender': ['Female', 'Male'] * (count // 2) + ['Female'] * (count % 2),
+        'Blood Type': 'O-',
+        'Medical Condition': 'Cancer',
+        'Date of Admission': '2023-07-14',
+        'Doctor': 'Dr A',
+        'Hospital': 'Kim Inc',
+        'Insurance Provider': 'Aetna',
+        'Billing Amount': 1200.5,
+        'Room Number': [100 + number for number in range(count)],
+        'Admission Type': 'Urgent',
+        'Discharge Date': '2023-07-20',
+        'Medication': 'Aspirin',
+        'Test Results': 'Normal',
+    })
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    """Pipeline rooted in a temporary project directory."""
+    monkeypatch.setenv('PROJECT_ROOT', str(tmp_path))
+    monkeypatch.setenv('REPORT_QUIET', '1')
+    return HealthcarePipeline(PipelineConfig(stage_cache=False))
+
+
+def exported_counter(name):
+    """Value of a counter in the Prometheus exposition."""
+    match = re.search(rf"^healthcare_{name} (\S+)$", METRICS.render(), re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_row_counters_count_raw_and_cleaned_rows_once(pipeline):
+    """rows_read_total counts raw rows once; rows_cleaned_total counts the cleaned output."""
+    raw = healthcare_rows(200)
+    raw = pd.concat([raw, raw.head(5)], ignore_index=True)
+    raw.to_csv(pipeline.data_path.raw_data_dir / 'healthcare.csv', index=False)
+    METRICS.reset()
+
+    assert pipeline._load_raw_data()
+    assert pipeline._clean_data()
+    assert pipeline._load_cleaned_data()
+
+    assert exported_counter('rows_read_total') == 205
+    assert exported_counter('rows_cleaned_total') == 200
+
+
+def test_cleaned_data_is_loaded_from_the_configured_file(pipeline):
+    """Other cleaned files in the processed folder (e.g. from watch mode) are ignored."""
+    processed = pipeline.data_path.processed_data_dir
+    healthcare_rows(30).to_csv(processed / 'cleaned_healthcare.csv', index=False)
+    healthcare_rows(7, first=500).to_csv(processed / 'cleaned_zz_dropped_file.csv', index=False)
+
+    assert pipeline._load_cleaned_data()
+
+    assert len(pipeline.loader.df) == 30
+    assert pipeline.loader.df['Name'].iloc[0] == 'patient 0'
+
+
+def test_cleaned_frame_without_patient_id_still_migrates(pipeline):
+    """Cleaned CSVs written before patient linkage validate and build with a null patient_id."""
+    from csv_containerisation_mongodb.migration.schema import HEALTHCARE_SCHEMA
+
+    healthcare_rows(20).to_csv(pipeline.data_path.raw_data_dir / 'healthcare.csv', index=False)
+    assert pipeline._load_raw_data()
+    assert pipeline._clean_data()
+    assert pipeline._load_cleaned_data()
+    cleaned = pipeline.loader.df.drop(columns='Patient Id')
+
+    valid, rejected = HEALTHCARE_SCHEMA.validate_frame(cleaned)
+    documents = [HEALTHCARE_SCHEMA.builder(values)
+                 for values in valid[HEALTHCARE_SCHEMA.columns].itertuples(index=False, name=None)]
+
+    assert len(valid) == 20 and rejected.empty
+    assert {document['patient_info']['patient_id'] for document in documents} == {None}
+    with pytest.raises(ValueError, match='Age'):
+        HEALTHCARE_SCHEMA.validate_frame(cleaned.drop(columns='Age'))
+
+
+def test_linkage_threshold_is_part_of_the_stage_cache_key(tmp_path, monkeypatch):
+    """Cached cleaning outputs are not reused after LINKAGE_THRESHOLD changes."""
+    monkeypatch.setenv('PROJECT_ROOT', str(tmp_path))
+    keys = set()
+    for threshold in (0.85, 0.9):
+        pipeline = HealthcarePipeline(PipelineConfig(stage_cache=True, linkage_threshold=threshold))
+        healthcare_rows(5).to_csv(pipeline.data_path.raw_data_dir / 'healthcare.csv', index=False)
+        keys.add(pipeline._stage_cache_key())
+
+    assert len(keys) == 2 and None not in keys
+
+
+def test_stage_cache_restores_both_cleaning_reports(tmp_path, monkeypatch):
+    """A cache hit restores the JSON report together with the Markdown report."""
+    monkeypatch.setenv('PROJECT_ROOT', str(tmp_path))
+    monkeypatch.setenv('REPORT_QUIET', '1')
+    pipeline = HealthcarePipeline(PipelineConfig(stage_cache=True))
+    healthcare_rows(10).to_csv(pipeline.data_path.raw_data_dir / 'healthcare.csv', index=False)
+    cache_key = pipeline._stage_cache_key()
+    assert pipeline._prepare_cleaned_data(cache_key)
+
+    outputs = pipeline._cleaning_outputs()
+    reports = {name: outputs[name].read_text(encoding='utf-8') for name in ('report', 'report_json')}
+    for name in reports:
+        outputs[name].unlink()
+
+    assert pipeline._restore_cleaning(cache_key)
+    assert {name: outputs[name].read_text(encoding='utf-8') for name in reports} == reports
+
+
+@pytest.fixture
+def mongo_uri():
+    """URI of a reachable MongoDB; the test is skipped otherwise."""
+    uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
+    try:
+        MongoClient(uri, serverSelectionTimeoutMS=2000).admin.command('ping')
+    except Exception as e:
+        pytest.skip(f"MongoDB not available: {e}")
+    return uri
+
+
+def test_watch_after_batch_run_replaces_the_batch_documents(tmp_path, monkeypatch, mongo_uri):
+    """A watcher started after a batch run reloads the raw file in place, without duplicates."""
+    monkeypatch.setenv('PROJECT_ROOT', str(tmp_path))
+    monkeypatch.setenv('REPORT_QUIET', '1')
+    db_name = f"test_watch_{uuid.uuid4().hex[:8]}"
+    config = PipelineConfig(db_name=db_name, mongodb_uri=mongo_uri, stage_cache=False, watch_interval=0)
+    client = MongoClient(mongo_uri)
+    try:
+        pipeline = HealthcarePipeline(config)
+        healthcare_rows(40).to_csv(pipeline.data_path.raw_data_dir / 'healthcare.csv', index=False)
+        assert pipeline.run()
+        collection = client[db_name][config.collection_name]
+        loaded = collection.count_documents({})
+
+        HealthcarePipeline(config).watch(max_cycles=2)
+
+        assert collection.count_documents({}) == loaded == 40
+        assert collection.count_documents({'metadata.source_file': 'healthcare.csv'}) == loaded
+        assert client[db_name]['migration_runs'].find_one()['source_file'] == 'healthcare.csv'
+    finally:
+        client.drop_database(db_name)
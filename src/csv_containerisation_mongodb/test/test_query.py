@@ -0,0 +1,51 @@
+"""
+Query Layer Tests
+
+Usage:
+    pytest src/csv_containerisation_mongodb/test/test_query.py -v
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from csv_containerisation_mongodb.query.query import HealthcareQueries
+
+
+class StoredCollection:
+    """Collection double returning fresh copies of stored documents."""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.finds = 0
+
+    def find(self, query):
+        self.finds += 1
+        return self
+
+    def limit(self, limit):
+        return [{'patient_info': dict(document['patient_info'])} for document in self.documents]
+
+    def find_one(self, *args):
+        return None
+
+
+class StoredConn:
+    """Connect double exposing one collection."""
+
+    def __init__(self, documents):
+        self.collection = StoredCollection(documents)
+        self.collection_name = 'healthcare_data'
+        self.db = {'migration_runs': self.collection}
+
+
+def test_changing_a_result_does_not_change_the_cached_result():
+    """Cache hits return copies, so a caller editing its documents leaves later hits intact."""
+    conn = StoredConn([{'patient_info': {'name': 'ann lee', 'age': 41}}])
+    queries = HealthcareQueries(conn)
+
+    first = queries.by_patient_name('ann lee')
+    first[0]['patient_info']['age'] = 99
+    first.append({'patient_info': {'name': 'intruder'}})
+
+    assert queries.by_patient_name('ann lee') == [{'patient_info': {'name': 'ann lee', 'age': 41}}]
+    assert conn.collection.finds == 1
+    assert queries.get_stats()['by_patient_name']['hit_rate'] == 0.5
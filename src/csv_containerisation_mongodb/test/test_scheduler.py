@@ -0,0 +1,47 @@
+"""
+Stage Scheduler Tests
+
+Usage:
+    pytest src/csv_containerisation_mongodb/test/test_scheduler.py -v
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+import pytest
+
+from csv_containerisation_mongodb.utils.scheduler import StageScheduler
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_failure_only_skips_dependent_stages(max_workers):
+    """A failed branch skips its dependents while an independent branch still runs."""
+    ran = []
+
+    def stage(name, ok=True):
+        def run():
+            ran.append(name)
+            return ok
+        return run
+
+    scheduler = StageScheduler(max_workers=max_workers)
+    scheduler.add('migrate', stage('migrate'))
+    scheduler.add('verify_a', stage('verify_a', ok=False), after=('migrate',))
+    scheduler.add('report_a', stage('report_a'), after=('verify_a',))
+    scheduler.add('summary_a', stage('summary_a'), after=('report_a',))
+    scheduler.add('verify_b', stage('verify_b'), after=('migrate',))
+    scheduler.add('report_b', stage('report_b'), after=('verify_b',))
+    scheduler.add('store_cache', stage('store_cache'), after=('verify_a', 'verify_b'))
+
+    assert scheduler.run() is False
+
+    status = {name: stage.status for name, stage in scheduler.stages.items()}
+    assert status == {
+        'migrate': 'done',
+        'verify_a': 'failed',
+        'report_a': 'skipped',
+        'summary_a': 'skipped',
+        'verify_b': 'done',
+        'report_b': 'done',
+        'store_cache': 'skipped',
+    }
+    assert sorted(ran) == ['migrate', 'report_b', 'verify_a', 'verify_b']
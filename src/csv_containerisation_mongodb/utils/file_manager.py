@@ -6,7 +6,9 @@ for data processing workflows.
 
 from pathlib import Path
 from datetime import datetime
+import json
 import os
+import sys
 
 
 class FILE_PATH_MANAGER:
@@ -63,16 +65,21 @@ class OUTPUT_MANAGER:
     This class handles:
     - Creating output directories
     - Managing file paths for cleaned data and reports
+    - Buffering report events in memory and writing the markdown and
+      JSON reports once, in finalize_report
     
     Attributes:
         output_dir (Path): Directory where all outputs are saved
         file_name (str): Base name for output files
         report_file (Path): Path to markdown report file
+        report_json_file (Path): Path to JSON report file
         cleaned_csv_file (Path): Path to cleaned CSV file
         timestamp (str): Timestamp used for file naming (if enabled)
+        quiet (bool): Skip console output of tables
+        events (list): Buffered report events
     """
     
-    def __init__(self, output_dir, file_name='unnamed', report_title='Data Processing Report', use_timestamp=False):
+    def __init__(self, output_dir, file_name='unnamed', report_title='Data Processing Report', use_timestamp=False, quiet=None):
         """
         Initialize OUTPUT_MANAGER.
         
@@ -81,11 +88,16 @@ class OUTPUT_MANAGER:
             file_name (str): Base name for output files
             report_title (str): Title for the markdown report
             use_timestamp (bool): Whether to add timestamps to filenames (default: False)
+            quiet (bool, optional): Skip rendering tables to the console. Defaults to
+                the REPORT_QUIET environment variable ('1', '0' or 'auto'); 'auto'
+                is quiet when stdout is not a terminal, as in container runs.
         """
         self.output_dir = Path(output_dir)
         self.file_name = file_name
         self.report_title = report_title
         self.use_timestamp = use_timestamp
+        self.quiet = self._resolve_quiet(quiet)
+        self.events = []
         
         # Generate timestamp if enabled
         if self.use_timestamp:
@@ -97,6 +109,7 @@ class OUTPUT_MANAGER:
         
         # File paths with or without timestamps
         self.report_file = self.output_dir / f"cleaning_report_{self.file_name}{timestamp_suffix}.md"
+        self.report_json_file = self.output_dir / f"cleaning_report_{self.file_name}{timestamp_suffix}.json"
         self.cleaned_csv_file = self.output_dir / f"cleaned_{self.file_name}{timestamp_suffix}.csv"
         self.quality_csv_file = self.output_dir / f"quality_report_{self.file_name}{timestamp_suffix}.csv"
         
@@ -119,18 +132,118 @@ class OUTPUT_MANAGER:
 
 
     
+    @staticmethod
+    def _resolve_quiet(quiet):
+        """Resolve the quiet flag from the argument or REPORT_QUIET."""
+        if quiet is not None:
+            return quiet
+        mode = os.getenv('REPORT_QUIET', 'auto').lower()
+        if mode == 'auto':
+            return not sys.stdout.isatty()
+        return mode in ('1', 'true', 'yes')
+
+
+
+    
     def write_to_report(self, message):
         """
-        Write a message directly to the report file.
+        Buffer a message for the report file.
         
         Args:
             message (str): Message to write to report
         """
-        try:
-            with open(self.report_file, 'a', encoding='utf-8') as f:
-                f.write(message + "\n")
-        except Exception as e:
-            print(f"Error writing to report: {e}")
+        self.events.append({'type': 'text', 'message': message})
+
+
+
+    
+    def log(self, message=""):
+        """
+        Print a message to the console and buffer it for the report.
+        
+        Args:
+            message (str): Message to log
+        """
+        print(message)
+        self.write_to_report(message)
+
+
+
+    
+    def add_table(self, table, title=None, fmt='markdown'):
+        """
+        Buffer a DataFrame or Series for the report.
+        
+        The table is only rendered to the console when not in quiet mode;
+        the report rendering happens once, in finalize_report.
+        
+        Args:
+            table (DataFrame or Series): Table to report
+            title (str, optional): Table title
+            fmt (str): 'markdown' or 'text'
+        """
+        self.events.append({'type': 'table', 'title': title, 'table': table, 'fmt': fmt})
+        if not self.quiet:
+            print(self._render_table(table, fmt))
+
+
+
+    
+    @staticmethod
+    def _render_table(table, fmt):
+        """Render a table as markdown or as a fenced text block."""
+        if fmt == 'markdown':
+            return table.to_markdown()
+        return "```\n" + table.to_string() + "\n```"
+
+
+
+    
+    def _render_markdown(self, final_stats=None):
+        """Render the buffered events as a markdown document."""
+        lines = [f"# {self.report_title}", "", f"Generated: {datetime.now().isoformat(timespec='seconds')}", ""]
+        for event in self.events:
+            if event['type'] == 'text':
+                lines.append(event['message'])
+            else:
+                if event['title']:
+                    lines.append(f"### {event['title']}\n")
+                lines.append(self._render_table(event['table'], event['fmt']))
+                lines.append("")
+        
+        if final_stats:
+            lines.append("\n## Final Statistics\n")
+            lines.extend(f"- **{key}:** {value}" for key, value in final_stats.items())
+        
+        return "\n".join(lines) + "\n"
+
+
+
+    
+    def _render_json(self, final_stats=None):
+        """Render the buffered events as a JSON document."""
+        events = []
+        for event in self.events:
+            if event['type'] == 'text':
+                events.append(event)
+            else:
+                table = event['table']
+                if hasattr(table, 'to_frame'):
+                    table = table.to_frame()
+                events.append({
+                    'type': 'table',
+                    'title': event['title'],
+                    'data': table.to_dict(orient='split')
+                })
+        
+        report = {
+            'title': self.report_title,
+            'file_name': self.file_name,
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'final_stats': final_stats or {},
+            'events': events
+        }
+        return json.dumps(report, indent=2, default=str)
 
 
 
@@ -139,9 +252,18 @@ class OUTPUT_MANAGER:
         """
         Finalize the report with summary information.
         
+        Writes the buffered events to the markdown and JSON report files,
+        each in a single write.
+        
         Args:
             final_stats (dict, optional): Dictionary of final statistics to include
         """
+        try:
+            self.report_file.write_text(self._render_markdown(final_stats), encoding='utf-8')
+            self.report_json_file.write_text(self._render_json(final_stats), encoding='utf-8')
+        except Exception as e:
+            print(f"Error writing to report: {e}")
+        
         print("\n" + "=" * 80)
         print(f"Output directory: {self.output_dir.absolute()}")
         
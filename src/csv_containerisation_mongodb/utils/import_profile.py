@@ -0,0 +1,89 @@
+"""
+Import-Time Benchmark
+
+Measures the import cost of a module with ``python -X importtime`` in a
+fresh interpreter, so startup regressions of the pipeline entry point
+can be caught.
+
+Usage:
+    python -m csv_containerisation_mongodb.utils.import_profile
+    python -m csv_containerisation_mongodb.utils.import_profile --budget-ms 1500 --top 15
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+
+ENTRY_POINT = 'csv_containerisation_mongodb.main.main'
+SRC_DIR = Path(__file__).resolve().parents[2]
+
+
+def measure_import_time(module=ENTRY_POINT, python=sys.executable):
+    """
+    Import a module in a fresh interpreter and parse the -X importtime report.
+
+    Args:
+        module: Dotted module name to import
+        python: Interpreter to run
+
+    Returns:
+        dict: 'total_ms' (sum of self times) and 'modules' mapping each
+        imported module to its (self_us, cumulative_us)
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get('PYTHONPATH')]))
+
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, env=env
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+
+    total_us = sum(self_us for self_us, _ in modules.values())
+    return {'total_ms': total_us / 1000, 'modules': modules}
+
+
+def main(argv=None):
+    """
+    Print the import profile and fail if it exceeds the budget.
+
+    Returns:
+        int: Exit code (0 within budget, 1 otherwise)
+    """
+    parser = argparse.ArgumentParser(description="Measure module import time")
+    parser.add_argument('--module', default=ENTRY_POINT)
+    parser.add_argument('--top', type=int, default=10, help="Number of slowest modules to show")
+    parser.add_argument('--budget-ms', type=float, default=None, help="Fail above this total import time")
+    args = parser.parse_args(argv)
+
+    profile = measure_import_time(args.module)
+    slowest = sorted(profile['modules'].items(), key=lambda item: item[1][0], reverse=True)
+
+    print(f"Import time for {args.module}: {profile['total_ms']:.1f} ms "
+          f"({len(profile['modules'])} modules)")
+    print(f"{'Module':<50} {'Self (ms)':>10} {'Cumulative (ms)':>16}")
+    print("-" * 78)
+    for name, (self_us, cumulative_us) in slowest[:args.top]:
+        print(f"{name:<50} {self_us / 1000:>10.1f} {cumulative_us / 1000:>16.1f}")
+
+    if args.budget_ms is not None and profile['total_ms'] > args.budget_ms:
+        print(f"[FAIL] Import time {profile['total_ms']:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
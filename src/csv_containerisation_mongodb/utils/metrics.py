@@ -0,0 +1,230 @@
+"""
+Metrics Module
+
+Live pipeline metrics in the Prometheus text exposition format, served on a
+local HTTP port (/metrics) and/or periodically written to a file (for the
+node_exporter textfile collector or any log shipper).
+
+Pipeline code records into the module-level METRICS registry:
+    METRICS.inc('documents_inserted_total', len(batch))
+    METRICS.observe('insert_batch_seconds', elapsed)
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from bisect import bisect_left
+from pathlib import Path
+import os
+import threading
+import time
+
+
+# name -> (type, help)
+METRIC_DEFINITIONS = {
+    'rows_read_total': ('counter', 'Raw CSV rows read'),
+    'rows_cleaned_total': ('counter', 'Rows remaining after cleaning'),
+    'documents_built_total': ('counter', 'MongoDB documents built from rows'),
+    'documents_inserted_total': ('counter', 'Documents inserted into MongoDB'),
+    'documents_rejected_total': ('counter', 'Rows sent to the dead-letter queue'),
+    'insert_batch_seconds': ('histogram', 'insert_many round-trip latency per batch'),
+    'stage_running': ('gauge', 'Whether a pipeline stage is currently running'),
+    'stage_duration_seconds': ('gauge', 'Duration of the last run of a pipeline stage'),
+    'last_progress_timestamp_seconds': ('gauge', 'Unix time of the last counter update'),
+    'process_resident_memory_bytes': ('gauge', 'Resident memory of the pipeline process'),
+}
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def resident_memory_bytes():
+    """Return the current RSS (Linux), or the peak RSS elsewhere."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and histograms."""
+
+    def __init__(self, namespace='healthcare'):
+        """
+        Initialize the registry.
+
+        Args:
+            namespace: Prefix of every exported metric name
+        """
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._values = {}
+        self._histograms = {}
+
+    @staticmethod
+    def _check(name, kind):
+        if METRIC_DEFINITIONS.get(name, (None,))[0] != kind:
+            raise ValueError(f"'{name}' is not a declared {kind}")
+
+    def inc(self, name, amount=1, **labels):
+        """Increase a counter."""
+        self._check(name, 'counter')
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+            self._values[('last_progress_timestamp_seconds', ())] = time.time()
+
+    def set(self, name, value, **labels):
+        """Set a gauge."""
+        self._check(name, 'gauge')
+        with self._lock:
+            self._values[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name, value, **labels):
+        """Record a histogram observation."""
+        self._check(name, 'histogram')
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.setdefault(key, [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0])
+            histogram[0][bisect_left(LATENCY_BUCKETS, value)] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def get(self, name, **labels):
+        """Return the current value of a counter or gauge (0 if unset)."""
+        with self._lock:
+            return self._values.get((name, tuple(sorted(labels.items()))), 0)
+
+    def reset(self):
+        """Clear every recorded value."""
+        with self._lock:
+            self._values.clear()
+            self._histograms.clear()
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: Exposition text
+        """
+        self.set('process_resident_memory_bytes', resident_memory_bytes())
+        with self._lock:
+            values = dict(self._values)
+            histograms = {
+                key: (list(buckets), total, count) for key, (buckets, total, count) in self._histograms.items()
+            }
+
+        lines = []
+        for name, (kind, help_text) in METRIC_DEFINITIONS.items():
+            full_name = f"{self.namespace}_{name}"
+            series = [(labels, value) for (metric, labels), value in values.items() if metric == name]
+            series_histograms = [(labels, data) for (metric, labels), data in histograms.items() if metric == name]
+            if not series and not series_histograms:
+                continue
+
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for labels, value in series:
+                lines.append(f"{full_name}{_format_labels(labels)} {value}")
+            for labels, (buckets, total, count) in series_histograms:
+                cumulative = 0
+                for bound, bucket_count in zip(LATENCY_BUCKETS + ('+Inf',), buckets):
+                    cumulative += bucket_count
+                    lines.append(f"{full_name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{full_name}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{full_name}_count{_format_labels(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+class MetricsExporter:
+    """Publishes a registry over HTTP and/or to a periodically rewritten file."""
+
+    def __init__(self, registry=METRICS, port=0, path=None, interval=5.0, host='127.0.0.1'):
+        """
+        Initialize the exporter.
+
+        Args:
+            registry: MetricsRegistry to publish
+            port: HTTP port serving /metrics (0 disables the server)
+            path: File rewritten every interval (None disables the file)
+            interval: Seconds between file rewrites
+            host: Interface the HTTP server binds to
+        """
+        self.registry = registry
+        self.port = port
+        self.path = Path(path) if path else None
+        self.interval = interval
+        self.host = host
+        self._server = None
+        self._stop_event = threading.Event()
+        self._writer = None
+
+    def _handler(self):
+        from http.server import BaseHTTPRequestHandler
+
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def write(self):
+        """Atomically rewrite the metrics file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        temp_path.write_text(self.registry.render(), encoding='utf-8')
+        os.replace(temp_path, self.path)
+
+    def _write_loop(self):
+        while not self._stop_event.wait(self.interval):
+            self.write()
+
+    def start(self):
+        """Start the HTTP server and/or the file writer."""
+        if self.port:
+            from http.server import ThreadingHTTPServer
+            self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+            print(f"Metrics served on http://{self.host}:{self._server.server_port}/metrics")
+        if self.path is not None:
+            self.write()
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+            print(f"Metrics written to {self.path} every {self.interval:g}s")
+        return self
+
+    def stop(self):
+        """Stop publishing, writing the metrics file one last time."""
+        self._stop_event.set()
+        if self._writer is not None:
+            self._writer.join()
+            self.write()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
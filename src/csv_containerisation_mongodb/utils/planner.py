@@ -0,0 +1,319 @@
+"""
+Execution Planner Module
+
+Chooses how a run executes from the resources it actually has. Before the
+raw data is loaded, the planner reads the container's cgroup memory and CPU
+limits, stats the input file and parses a sample of rows to measure their
+size in pandas, as Python documents and as BSON. From these it picks:
+
+- in-memory: documents for every row are built, then inserted (small inputs);
+- chunked:   rows are transformed and inserted slice by slice, so only one
+             slice of documents is held at a time;
+- parallel:  as chunked, with slices inserted by background writers while the
+             next slice is transformed;
+
+together with the slice size, the number of insert writers and stage
+workers, and the insert batch size and memory ceiling. The plan is printed
+with its estimated peak memory and runtime before the run starts.
+
+Usage:
+    plan = ResourcePlanner().plan(Path('data/raw/healthcare.csv'))
+    plan.report()
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+import io
+import os
+import time
+import tracemalloc
+
+import pandas as pd
+
+from csv_containerisation_mongodb.data.load_data import COMPRESSIONS, decompressing_reader
+from csv_containerisation_mongodb.utils.metrics import resident_memory_bytes
+
+
+EXECUTION_STRATEGIES = ('in-memory', 'chunked', 'parallel')
+
+# Share of the memory limit the run may plan to use; the rest is headroom
+# for the interpreter, the driver and estimation error
+MEMORY_FRACTION = 0.7
+
+# Inputs up to this many rows are built in one go when they fit in memory
+SMALL_INPUT_ROWS = 100_000
+
+# Cleaning holds the raw frame and a cleaned copy at the same time
+CLEANING_COPIES = 2
+
+MIN_CHUNK_ROWS = 5_000
+MAX_CHUNK_ROWS = 500_000
+MAX_INSERT_WORKERS = 4
+
+# Conservative insert rate used for the runtime estimate (documents per second)
+INSERT_DOCS_PER_SECOND = 20_000
+
+
+def _read_limit(path):
+    """Return the integer in a cgroup file, or None when absent or unlimited."""
+    try:
+        value = Path(path).read_text().split()[0]
+    except (OSError, IndexError):
+        return None
+    if value == 'max' or not value.lstrip('-').isdigit():
+        return None
+    value = int(value)
+    # cgroup v1 reports "unlimited" as a huge page-aligned number
+    return value if 0 < value < 1 << 60 else None
+
+
+def container_limits():
+    """
+    Return the memory and CPU available to the process.
+
+    cgroup v2 limits are read first, then cgroup v1, then the host totals.
+
+    Returns:
+        tuple: (memory bytes, CPU count as a float)
+    """
+    memory = _read_limit('/sys/fs/cgroup/memory.max') or _read_limit('/sys/fs/cgroup/memory/memory.limit_in_bytes')
+    if memory is None:
+        try:
+            memory = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+        except (ValueError, OSError, AttributeError):
+            memory = 4 * 1024**3
+
+    cpus = float(len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1)
+    try:
+        quota, period = Path('/sys/fs/cgroup/cpu.max').read_text().split()[:2]
+        if quota != 'max':
+            cpus = min(cpus, int(quota) / int(period))
+    except (OSError, ValueError):
+        quota = _read_limit('/sys/fs/cgroup/cpu/cpu.cfs_quota_us')
+        period = _read_limit('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+        if quota and period:
+            cpus = min(cpus, quota / period)
+
+    return memory, max(cpus, 1.0)
+
+
+@dataclass
+class ExecutionPlan:
+    """Strategy and sizing chosen for one input file."""
+    strategy: str
+    input_path: Path
+    input_bytes: int
+    estimated_rows: int
+    memory_limit: int
+    cpus: float
+    pandas_bytes_per_row: float
+    document_bytes_per_row: float
+    bson_bytes_per_row: float
+    chunk_rows: int = None
+    insert_workers: int = 0
+    stage_workers: int = 1
+    insert_batch_size: int = 5000
+    batch_memory_mb: int = 64
+    estimated_peak_bytes: int = 0
+    estimated_seconds: float = 0.0
+
+    @property
+    def streams(self) -> bool:
+        return self.chunk_rows is not None
+
+    def report(self):
+        """Print the plan."""
+        mb = 1024**2
+        print("\n[EXECUTION PLAN]")
+        print(f"- Input: {self.input_path.name} ({self.input_bytes / mb:,.1f} MB, "
+              f"~{self.estimated_rows:,} rows)")
+        print(f"- Resources: {self.memory_limit / mb:,.0f} MB memory limit, {self.cpus:g} CPUs")
+        print(f"- Row size: {self.pandas_bytes_per_row:,.0f} B in pandas, "
+              f"{self.document_bytes_per_row:,.0f} B as a document, {self.bson_bytes_per_row:,.0f} B as BSON")
+        if self.streams:
+            print(f"- Strategy: {self.strategy} - chunks of {self.chunk_rows:,} rows, "
+                  f"{self.insert_workers} background insert writer(s)")
+        else:
+            print(f"- Strategy: {self.strategy}")
+        print(f"- Insert batches: {self.insert_batch_size:,} documents, {self.batch_memory_mb} MB ceiling; "
+              f"{self.stage_workers} stage worker(s)")
+        print(f"- Estimated peak memory: {self.estimated_peak_bytes / mb:,.0f} MB "
+              f"({self.estimated_peak_bytes / self.memory_limit:.0%} of the limit)")
+        print(f"- Estimated runtime: {self.estimated_seconds:,.0f}s")
+        if self.estimated_peak_bytes > self.memory_limit:
+            print("WARNING: The estimated peak exceeds the memory limit; the run may be killed")
+
+
+class ResourcePlanner:
+    """Builds an ExecutionPlan from the container limits and a sample of the input."""
+
+    def __init__(self, memory_limit=None, cpus=None, sample_rows=5000, insert_batch_size=5000,
+                 batch_memory_mb=64, stage_workers=4):
+        """
+        Initialize the planner.
+
+        Args:
+            memory_limit: Memory limit in bytes (detected from cgroups when None)
+            cpus: CPU limit (detected from cgroups when None)
+            sample_rows: Rows parsed to measure row sizes and rates
+            insert_batch_size: Configured insert batch size (upper bound)
+            batch_memory_mb: Configured batch memory ceiling (upper bound)
+            stage_workers: Configured stage workers (upper bound)
+        """
+        detected_memory, detected_cpus = container_limits()
+        self.memory_limit = memory_limit or detected_memory
+        self.cpus = cpus or detected_cpus
+        self.sample_rows = sample_rows
+        self.insert_batch_size = insert_batch_size
+        self.batch_memory_mb = batch_memory_mb
+        self.stage_workers = stage_workers
+
+    def sample(self, input_path):
+        """
+        Parse the first rows of the input and measure them.
+
+        Args:
+            input_path: CSV file, optionally compressed
+
+        Returns:
+            dict: Estimated total rows, bytes per row (csv, pandas, document,
+                bson) and seconds per row (parse, build)
+        """
+        compression = COMPRESSIONS.get(Path(input_path).suffix)
+        with open(input_path, 'rb') as raw:
+            stream = raw if compression is None else decompressing_reader(raw, compression)
+            header = stream.readline()
+            lines = []
+            for _ in range(self.sample_rows):
+                line = stream.readline()
+                if not line:
+                    break
+                lines.append(line)
+            # Input bytes consumed by the sample, compressed or not
+            consumed = raw.tell()
+            exhausted = not stream.read(1)
+        csv_bytes = sum(len(line) for line in lines) or 1
+
+        start = time.perf_counter()
+        df = pd.read_csv(io.BytesIO(header + b''.join(lines)))
+        parse_seconds = time.perf_counter() - start
+        rows = max(len(df), 1)
+        if exhausted:
+            total_rows = len(df)
+        else:
+            total_rows = int(Path(input_path).stat().st_size / max(consumed, 1) * len(lines))
+
+        start = time.perf_counter()
+        df.to_dict('records')
+        build_seconds = time.perf_counter() - start
+
+        # Measured separately: tracing slows allocations down
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        records = df.to_dict('records')
+        document_bytes = tracemalloc.get_traced_memory()[0] - before
+        if not tracing:
+            tracemalloc.stop()
+
+        try:
+            import bson
+            bson_bytes = sum(len(bson.encode({str(key): value for key, value in record.items()}))
+                             for record in records[:1000]) / max(min(len(records), 1000), 1)
+        except Exception:
+            bson_bytes = csv_bytes / rows * 1.5
+
+        return {
+            'rows': total_rows,
+            'csv': csv_bytes / rows,
+            'pandas': df.memory_usage(deep=True).sum() / rows,
+            'document': max(document_bytes, 1) / rows,
+            'bson': bson_bytes,
+            'parse_seconds': parse_seconds / rows,
+            'build_seconds': build_seconds / rows,
+        }
+
+    def plan(self, input_path, strategy='auto'):
+        """
+        Choose the execution strategy and sizes for an input file.
+
+        Args:
+            input_path: Raw CSV file
+            strategy: 'auto' or one of EXECUTION_STRATEGIES to force it
+
+        Returns:
+            ExecutionPlan: The chosen plan
+        """
+        if strategy != 'auto' and strategy not in EXECUTION_STRATEGIES:
+            raise ValueError(f"Unknown execution strategy: {strategy} (expected 'auto' or one of "
+                             f"{EXECUTION_STRATEGIES})")
+
+        input_path = Path(input_path)
+        input_bytes = input_path.stat().st_size
+        measured = self.sample(input_path)
+        rows = measured['rows']
+
+        budget = max(self.memory_limit * MEMORY_FRACTION - resident_memory_bytes(), 64 * 1024**2)
+        frame_bytes = rows * measured['pandas']
+        cleaning_peak = CLEANING_COPIES * frame_bytes
+        all_documents = rows * measured['document']
+
+        batch_memory_mb = max(1, min(self.batch_memory_mb, int(budget / 8 / 1024**2)))
+        batch_size = max(500, min(self.insert_batch_size, int(batch_memory_mb * 1024**2 / measured['bson'])))
+
+        if strategy == 'auto':
+            fits = frame_bytes + all_documents <= budget
+            if fits and rows <= SMALL_INPUT_ROWS:
+                strategy = 'in-memory'
+            elif self.cpus >= 2:
+                strategy = 'parallel'
+            else:
+                strategy = 'in-memory' if fits else 'chunked'
+
+        insert_workers = 0
+        chunk_rows = None
+        if strategy != 'in-memory':
+            if strategy == 'parallel':
+                insert_workers = max(1, min(MAX_INSERT_WORKERS, int(self.cpus) - 1))
+            # Room for the documents of the slice being built plus the slices being inserted
+            room = max(budget - frame_bytes - batch_memory_mb * 1024**2 * max(insert_workers, 1), 0)
+            chunk_rows = int(room / (measured['document'] * (insert_workers + 1)))
+            while insert_workers > 1 and chunk_rows < MIN_CHUNK_ROWS:
+                insert_workers -= 1
+                chunk_rows = int(room / (measured['document'] * (insert_workers + 1)))
+            chunk_rows = max(MIN_CHUNK_ROWS, min(MAX_CHUNK_ROWS, chunk_rows, max(rows, MIN_CHUNK_ROWS)))
+            documents_peak = chunk_rows * measured['document'] * (insert_workers + 1)
+        else:
+            documents_peak = all_documents
+
+        migration_peak = frame_bytes + documents_peak + batch_memory_mb * 1024**2 * max(insert_workers, 1)
+        peak = resident_memory_bytes() + max(cleaning_peak, migration_peak)
+
+        build_seconds = rows * (measured['parse_seconds'] * 2 + measured['build_seconds'])
+        insert_seconds = rows / INSERT_DOCS_PER_SECOND
+        if insert_workers:
+            seconds = max(build_seconds, insert_seconds / insert_workers)
+        else:
+            seconds = build_seconds + insert_seconds
+
+        return ExecutionPlan(
+            strategy=strategy,
+            input_path=input_path,
+            input_bytes=input_bytes,
+            estimated_rows=rows,
+            memory_limit=self.memory_limit,
+            cpus=self.cpus,
+            pandas_bytes_per_row=measured['pandas'],
+            document_bytes_per_row=measured['document'],
+            bson_bytes_per_row=measured['bson'],
+            chunk_rows=chunk_rows,
+            insert_workers=insert_workers,
+            stage_workers=max(1, min(self.stage_workers, max(2, int(self.cpus * 2)))),
+            insert_batch_size=batch_size,
+            batch_memory_mb=batch_memory_mb,
+            estimated_peak_bytes=int(peak),
+            estimated_seconds=seconds
+        )
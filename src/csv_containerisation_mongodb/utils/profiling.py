@@ -0,0 +1,227 @@
+"""
+Profiling Module
+
+Opt-in profiling of pipeline stages and selected class methods. Each
+profiled call writes into outputs/profiles/<run-id>/:
+
+- <label>.pstats       cProfile statistics (load with pstats / snakeviz)
+- <label>.collapsed    sampled stacks in collapsed format (flamegraph.pl, speedscope)
+- <label>.alloc.txt    top allocations (tracemalloc snapshot diff)
+
+cProfile can only be active for one call at a time, so concurrently running
+stages fall back to the sampling profiler alone. Calls made inside an
+already profiled block on the same thread are covered by the outer profile
+and are not profiled again.
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+import cProfile
+import importlib
+import re
+import sys
+import threading
+import tracemalloc
+
+
+# Class names accepted in method targets ('LoadDb.dbloader')
+PROFILABLE_CLASSES = {
+    'LoadDb': 'csv_containerisation_mongodb.migration.migration',
+    'FILE_CLEANING': 'csv_containerisation_mongodb.data.cleaning',
+}
+
+
+class StackSampler(threading.Thread):
+    """Samples the call stack of one thread at a fixed interval."""
+
+    def __init__(self, thread_id, interval=0.005):
+        """
+        Initialize the sampler.
+
+        Args:
+            thread_id: Identifier of the thread to sample
+            interval: Seconds between samples
+        """
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        """Stop sampling and wait for the thread to finish."""
+        self._stop_event.set()
+        self.join()
+
+    def write(self, path):
+        """Write the samples in collapsed-stack format."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """Collects per-label profiles for one pipeline run."""
+
+    def __init__(self, output_dir, run_id=None, interval=0.005, top_allocations=25):
+        """
+        Initialize the profiler.
+
+        Args:
+            output_dir: Base directory (outputs/profiles)
+            run_id: Run directory name (defaults to a timestamp)
+            interval: Sampling interval in seconds
+            top_allocations: Allocation sites listed per report
+        """
+        self.run_id = run_id or datetime.now().strftime('%Y%m%d-%H%M%S')
+        self.output_dir = Path(output_dir) / self.run_id
+        self.interval = interval
+        self.top_allocations = top_allocations
+        self._cprofile_lock = threading.Lock()
+        self._tracemalloc_lock = threading.Lock()
+        self._tracemalloc_users = 0
+        self._started_tracemalloc = False
+        self._labels = Counter()
+        self._active = threading.local()
+
+    def _path(self, label, suffix):
+        safe = re.sub(r'[^A-Za-z0-9_.-]', '_', label)
+        return self.output_dir / f"{safe}{suffix}"
+
+    def _start_tracemalloc(self):
+        with self._tracemalloc_lock:
+            if self._tracemalloc_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                self._started_tracemalloc = True
+            self._tracemalloc_users += 1
+            return tracemalloc.take_snapshot(), self._tracemalloc_users > 1
+
+    def _stop_tracemalloc(self):
+        with self._tracemalloc_lock:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            self._tracemalloc_users -= 1
+            overlapped = self._tracemalloc_users > 0
+            if self._tracemalloc_users == 0 and self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+            return snapshot, peak, overlapped
+
+    def _unique_label(self, label):
+        """Suffix repeated labels (methods called several times per run)."""
+        self._labels[label] += 1
+        count = self._labels[label]
+        return label if count == 1 else f"{label}.{count}"
+
+    @contextmanager
+    def profile(self, label):
+        """
+        Profile the enclosed block.
+
+        Args:
+            label: Output file name stem
+        """
+        label = self._unique_label(label)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        profiler = cProfile.Profile() if self._cprofile_lock.acquire(blocking=False) else None
+        before, overlapped = self._start_tracemalloc()
+        sampler.start()
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiling tool is active (e.g. a debugger)
+                self._cprofile_lock.release()
+                profiler = None
+
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self._cprofile_lock.release()
+                profiler.dump_stats(self._path(label, '.pstats'))
+            sampler.stop()
+            sampler.write(self._path(label, '.collapsed'))
+            after, peak, still_running = self._stop_tracemalloc()
+            self._write_allocations(label, before, after, peak, concurrent=overlapped or still_running)
+
+    def _write_allocations(self, label, before, after, peak, concurrent):
+        """Write the largest allocation differences of a profiled block."""
+        stats = after.compare_to(before, 'lineno')
+        with open(self._path(label, '.alloc.txt'), 'w', encoding='utf-8') as f:
+            f.write(f"Top {self.top_allocations} allocation sites for {label}\n")
+            f.write(f"Peak traced memory: {peak / 1024**2:.1f} MB\n")
+            if concurrent:
+                f.write("Note: other profiled work ran concurrently; its allocations are included\n")
+            f.write("\n")
+            for stat in stats[:self.top_allocations]:
+                f.write(f"{stat}\n")
+
+    def wrap(self, label, func):
+        """
+        Return a callable running func under profile(label).
+
+        Args:
+            label: Output file name stem
+            func: Callable to profile
+        """
+        @wraps(func)
+        def profiled(*args, **kwargs):
+            if getattr(self._active, 'depth', 0):
+                return func(*args, **kwargs)
+            self._active.depth = 1
+            try:
+                with self.profile(label):
+                    return func(*args, **kwargs)
+            finally:
+                self._active.depth = 0
+        return profiled
+
+    @contextmanager
+    def instrument(self, targets):
+        """
+        Profile class methods for the duration of the block.
+
+        Args:
+            targets: Names such as 'LoadDb.dbloader' or 'FILE_CLEANING.quality_check'
+        """
+        patched = []
+        try:
+            for target in targets:
+                class_name, _, method_name = target.partition('.')
+                if class_name not in PROFILABLE_CLASSES or not method_name:
+                    raise ValueError(f"Cannot profile '{target}' (expected one of "
+                                     f"{list(PROFILABLE_CLASSES)} followed by .<method>)")
+                cls = getattr(importlib.import_module(PROFILABLE_CLASSES[class_name]), class_name)
+                original = getattr(cls, method_name)
+                setattr(cls, method_name, self.wrap(target, original))
+                patched.append((cls, method_name, original))
+            yield
+        finally:
+            for cls, method_name, original in reversed(patched):
+                setattr(cls, method_name, original)
+
+    def report(self):
+        """Print where the profiles were written."""
+        if self.output_dir.exists():
+            files = sorted(self.output_dir.iterdir())
+            print(f"\nProfiles written to {self.output_dir} ({len(files)} files)")
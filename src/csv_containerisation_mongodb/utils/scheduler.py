@@ -0,0 +1,153 @@
+"""
+Stage Scheduler Module
+
+Runs pipeline stages as a dependency graph: a stage starts as soon as every
+stage it depends on has succeeded, so independent stages run concurrently
+on a thread pool. A failed stage only skips the stages that depend on it.
+Stage timings and the critical path (the chain of dependent stages that
+bounds the wall time) are reported at the end.
+
+Usage:
+    scheduler = StageScheduler(max_workers=4)
+    scheduler.add('clean', clean)
+    scheduler.add('connect', connect)
+    scheduler.add('migrate', migrate, after=('clean', 'connect'))
+    ok = scheduler.run()
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+import time
+
+
+@dataclass
+class Stage:
+    """One unit of pipeline work and the stages it waits for."""
+    name: str
+    func: object
+    after: tuple = ()
+    status: str = 'pending'
+    started: float = None
+    finished: float = None
+    error: str = None
+
+    @property
+    def duration(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+class StageScheduler:
+    """Thread-pool scheduler for a DAG of stages."""
+
+    def __init__(self, max_workers=4):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_workers: Maximum number of stages running at once
+        """
+        self.max_workers = max(1, max_workers)
+        self.stages = {}
+        self.start_time = None
+        self.wall_time = 0.0
+
+    def add(self, name, func, after=()):
+        """
+        Register a stage.
+
+        Args:
+            name: Unique stage name
+            func: Callable returning False (or raising) on failure
+            after: Names of the stages that must succeed first
+        """
+        missing = [dependency for dependency in after if dependency not in self.stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stages: {missing}")
+        self.stages[name] = Stage(name, func, tuple(after))
+
+    def _execute(self, stage):
+        stage.started = time.perf_counter()
+        try:
+            ok = stage.func() is not False
+        except Exception as e:
+            stage.error = str(e)
+            ok = False
+        stage.finished = time.perf_counter()
+        return ok
+
+    def run(self) -> bool:
+        """
+        Run every stage, starting each one as soon as its dependencies succeed.
+
+        A failed stage skips the stages depending on it, directly or
+        transitively; independent stages still run.
+
+        Returns:
+            bool: True if every stage succeeded
+        """
+        start = self.start_time = time.perf_counter()
+        pending = dict(self.stages)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                # Stages are registered after their dependencies, so one pass in order
+                # propagates skips down the graph
+                for stage in list(pending.values()):
+                    if any(self.stages[dependency].status in ('failed', 'skipped') for dependency in stage.after):
+                        stage.status = 'skipped'
+                        del pending[stage.name]
+
+                ready = [
+                    stage for stage in pending.values()
+                    if all(self.stages[dependency].status == 'done' for dependency in stage.after)
+                ]
+                for stage in ready[:self.max_workers - len(running)]:
+                    del pending[stage.name]
+                    stage.status = 'running'
+                    running[executor.submit(self._execute, stage)] = stage
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    stage.status = 'done' if future.result() else 'failed'
+
+        self.wall_time = time.perf_counter() - start
+        return all(stage.status == 'done' for stage in self.stages.values())
+
+    def critical_path(self):
+        """
+        Return the chain of dependent stages with the longest total duration.
+
+        Returns:
+            tuple: (list of stage names, total seconds)
+        """
+        longest = {}
+        for name, stage in self.stages.items():
+            previous = max(stage.after, key=lambda dependency: longest[dependency][1], default=None)
+            path, seconds = longest[previous] if previous is not None else ([], 0.0)
+            longest[name] = (path + [name], seconds + stage.duration)
+        return max(longest.values(), key=lambda entry: entry[1], default=([], 0.0))
+
+    def report(self):
+        """Print per-stage timings, the critical path and the wall time."""
+        print("\n[STAGE SCHEDULE]")
+        for stage in self.stages.values():
+            offset = stage.started - self.start_time if stage.started is not None else 0.0
+            detail = f" - {stage.error}" if stage.error else ""
+            print(f"- {stage.name:<22} {stage.status:<8} start +{offset:6.2f}s  {stage.duration:7.2f}s{detail}")
+
+        path, seconds = self.critical_path()
+        total = sum(stage.duration for stage in self.stages.values())
+        slowest = max(self.stages.values(), key=lambda stage: stage.duration, default=None)
+        print(f"- Critical path: {' -> '.join(path)} ({seconds:.2f}s)")
+        if slowest is not None:
+            print(f"- Slowest stage: {slowest.name} ({slowest.duration:.2f}s)")
+        print(f"- Wall time: {self.wall_time:.2f}s for {total:.2f}s of stage work")
@@ -0,0 +1,220 @@
+"""
+Stage Cache Module
+
+Content-addressed cache for pipeline stage outputs. Entries are keyed by a
+fingerprint of the input file, the pipeline configuration and the package
+source code, and are evicted least-recently-used first once the cache
+grows past its size budget.
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from pathlib import Path
+import hashlib
+import json
+import shutil
+import time
+
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent
+
+
+class StageCache:
+    """
+    Stores and restores the files produced by pipeline stages.
+
+    Layout:
+        <cache_dir>/fingerprints.json      (path, size, mtime) -> content hash
+        <cache_dir>/<key>/<stage>/...      cached stage files + meta.json
+    """
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024**2):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding cache entries
+            max_bytes: Total size budget before LRU eviction
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._fingerprints_file = self.cache_dir / 'fingerprints.json'
+        self._code_version = None
+
+    def _load_fingerprints(self):
+        """Load the memoized content hashes."""
+        try:
+            return json.loads(self._fingerprints_file.read_text(encoding='utf-8'))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def content_hash(self, file_path):
+        """
+        Return the SHA-256 of a file, reusing the stored hash when size and mtime are unchanged.
+
+        Args:
+            file_path: File to hash
+
+        Returns:
+            str: Hex digest of the file content
+        """
+        file_path = Path(file_path).resolve()
+        stat = file_path.stat()
+        stamp = f"{stat.st_size}:{stat.st_mtime_ns}"
+
+        fingerprints = self._load_fingerprints()
+        cached = fingerprints.get(str(file_path))
+        if cached and cached['stamp'] == stamp:
+            return cached['sha256']
+
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+
+        fingerprints[str(file_path)] = {'stamp': stamp, 'sha256': digest.hexdigest()}
+        self._fingerprints_file.write_text(json.dumps(fingerprints, indent=2), encoding='utf-8')
+        return digest.hexdigest()
+
+    def code_version(self):
+        """Return a hash of the package source so code changes invalidate the cache."""
+        if self._code_version is None:
+            digest = hashlib.sha256()
+            for source in sorted(PACKAGE_DIR.rglob('*.py')):
+                digest.update(source.relative_to(PACKAGE_DIR).as_posix().encode())
+                digest.update(source.read_bytes())
+            self._code_version = digest.hexdigest()
+        return self._code_version
+
+    def key(self, file_path, config):
+        """
+        Build the cache key for an input file and configuration.
+
+        Args:
+            file_path: Input file
+            config: JSON-serialisable pipeline configuration
+
+        Returns:
+            str: Cache key
+        """
+        stat = Path(file_path).stat()
+        payload = json.dumps({
+            'content': self.content_hash(file_path),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'config': config,
+            'code': self.code_version(),
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def _entry_dir(self, key, stage):
+        return self.cache_dir / key / stage
+
+    def get(self, key, stage):
+        """
+        Look up a stage entry and mark it as recently used.
+
+        Args:
+            key: Cache key
+            stage: Stage name
+
+        Returns:
+            dict: Entry metadata (with 'path') or None on a miss
+        """
+        entry = self._entry_dir(key, stage)
+        meta_file = entry / 'meta.json'
+        if not meta_file.exists():
+            return None
+
+        meta = json.loads(meta_file.read_text(encoding='utf-8'))
+        meta['last_used'] = time.time()
+        meta_file.write_text(json.dumps(meta, indent=2), encoding='utf-8')
+        meta['path'] = entry
+        return meta
+
+    def put(self, key, stage, files=None, data=None):
+        """
+        Store a stage's output files and metadata.
+
+        Args:
+            key: Cache key
+            stage: Stage name
+            files: Mapping of logical name -> file to copy into the cache
+            data: JSON-serialisable metadata recorded with the entry
+
+        Returns:
+            Path: Entry directory
+        """
+        entry = self._entry_dir(key, stage)
+        if entry.exists():
+            shutil.rmtree(entry)
+        entry.mkdir(parents=True)
+
+        stored = {}
+        for name, source in (files or {}).items():
+            source = Path(source)
+            if source.exists():
+                shutil.copy2(source, entry / source.name)
+                stored[name] = source.name
+
+        meta = {'stage': stage, 'files': stored, 'data': data or {}, 'last_used': time.time()}
+        (entry / 'meta.json').write_text(json.dumps(meta, indent=2, default=str), encoding='utf-8')
+
+        self.evict()
+        return entry
+
+    def restore(self, meta, name, destination):
+        """
+        Copy a cached file back to its working location.
+
+        Args:
+            meta: Entry returned by get()
+            name: Logical file name used in put()
+            destination: Target path
+
+        Returns:
+            bool: True if the file was restored
+        """
+        stored = meta['files'].get(name)
+        if stored is None:
+            return False
+        shutil.copy2(meta['path'] / stored, destination)
+        return True
+
+    def _entries(self):
+        """Return (last_used, size, path) for every cache entry."""
+        entries = []
+        for meta_file in self.cache_dir.glob('*/*/meta.json'):
+            entry = meta_file.parent
+            try:
+                last_used = json.loads(meta_file.read_text(encoding='utf-8')).get('last_used', 0)
+            except json.JSONDecodeError:
+                last_used = 0
+            size = sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+            entries.append((last_used, size, entry))
+        return entries
+
+    def evict(self):
+        """
+        Remove least-recently-used entries until the cache fits its budget.
+
+        Returns:
+            int: Number of entries evicted
+        """
+        entries = sorted(self._entries(), key=lambda e: e[0])
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            if not any(entry.parent.iterdir()):
+                entry.parent.rmdir()
+            total -= size
+            evicted += 1
+
+        if evicted:
+            print(f"[CACHE] Evicted {evicted} entries ({total / 1024**2:.2f} MB retained)")
+        return evicted
@@ -0,0 +1,103 @@
+"""
+Folder Watcher Module
+
+Polls a directory for new or changed files so a long-running pipeline
+can ingest them as they arrive.
+
+Author: hhdonglo - OpenClassrooms (DataSoluTech)
+"""
+
+from pathlib import Path
+import time
+
+
+class FolderWatcher:
+    """
+    Polling watcher reporting files that are new or changed and stable.
+
+    A file is only reported once its size and modification time have been
+    identical over two consecutive polls, so partially copied files are
+    never handed to the pipeline.
+    """
+
+    def __init__(self, watch_dir, callback, interval=2.0, patterns=('*.csv',)):
+        """
+        Initialize the watcher.
+
+        Args:
+            watch_dir: Directory to watch
+            callback: Callable receiving the Path of each ready file
+            interval: Seconds between polls
+            patterns: Glob patterns of files to watch
+        """
+        self.watch_dir = Path(watch_dir)
+        self.callback = callback
+        self.interval = interval
+        self.patterns = patterns
+        self._pending = {}
+        self._processed = {}
+
+    def _signature(self, file_path):
+        """Return the (size, mtime) signature of a file."""
+        stat = file_path.stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    def poll(self):
+        """
+        Scan the directory once.
+
+        Returns:
+            list: Paths that are new or changed and have stopped growing
+        """
+        ready = []
+        seen = set()
+
+        for pattern in self.patterns:
+            for file_path in sorted(self.watch_dir.glob(pattern)):
+                if not file_path.is_file():
+                    continue
+                seen.add(file_path)
+
+                try:
+                    signature = self._signature(file_path)
+                except FileNotFoundError:
+                    continue
+
+                if self._processed.get(file_path) == signature:
+                    continue
+
+                if self._pending.get(file_path) == signature:
+                    ready.append(file_path)
+                    del self._pending[file_path]
+                else:
+                    self._pending[file_path] = signature
+
+        for file_path in list(self._pending):
+            if file_path not in seen:
+                del self._pending[file_path]
+
+        return ready
+
+    def run(self, max_cycles=None):
+        """
+        Poll until interrupted, handing ready files to the callback.
+
+        Args:
+            max_cycles: Stop after this many polls (None runs forever)
+        """
+        print(f"[WATCH] Watching {self.watch_dir.absolute()} every {self.interval}s")
+
+        cycles = 0
+        while max_cycles is None or cycles < max_cycles:
+            for file_path in self.poll():
+                try:
+                    signature = self._signature(file_path)
+                except FileNotFoundError:
+                    continue
+
+                if not self.callback(file_path):
+                    print(f"WARNING: {file_path.name} failed, will retry when it changes")
+                self._processed[file_path] = signature
+
+            cycles += 1
+            time.sleep(self.interval)